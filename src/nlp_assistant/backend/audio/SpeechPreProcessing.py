@@ -1,11 +1,12 @@
 import dotenv
-import spacy
 import os
 import torch
 from faster_whisper import WhisperModel
 from spacy.matcher import PhraseMatcher
 from spacy.tokens import Span
 
+from nlp_assistant.backend.core.SpacyModelRegistry import spacy_models
+
 
 class SpeechPreProcessing:
     def __init__(self) -> None:
@@ -28,10 +29,8 @@ class SpeechPreProcessing:
                 self.model = WhisperModel("turbo", device="cpu", compute_type="int8")
 
         # Satzextraktion initialisieren
-        try:
-            self.nlp = spacy.load("de_core_news_sm")
-        except OSError:
-            raise OSError("SpaCy Modell nicht gefunden.")
+        # Geteiltes Modell aus der Registry (auch vom IntentRecognizer genutzt)
+        self.nlp = spacy_models.get("de_core_news_sm")
 
         self.matcher = PhraseMatcher(self.nlp.vocab, attr="LOWER")
 
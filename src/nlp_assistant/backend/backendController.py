@@ -3,8 +3,13 @@ import random
 
 from dotenv import load_dotenv
 
+from nlp_assistant.backend.connection.DeviceIndex import DeviceIndex
+from nlp_assistant.backend.connection.DeviceListSnapshotCache import DeviceListSnapshotCache
 from nlp_assistant.backend.connection.HomeAssistantController import HomeAssistantController
+from nlp_assistant.backend.connection.HomeAssistantDispatchQueue import HomeAssistantDispatchQueue
+from nlp_assistant.backend.connection.HomeAssistantDeviceRegistry import HomeAssistantDeviceRegistry
 from nlp_assistant.backend.connection.HomeAssistantRestManager import HomeAssistantRestManager
+from nlp_assistant.backend.core.CommandAnalysis import CommandAnalysis
 from nlp_assistant.backend.core.IntentRecognizer import IntentRecognizer
 from nlp_assistant.backend.core.deviceMatcher import DeviceMatcher
 from nlp_assistant.backend.audio.TextToSpeech import TextToSpeech
@@ -20,39 +25,84 @@ class backendController:
         HA_URL: str = os.getenv("HA_URL")
         
         # Initialisierung der HomeAssistant Verbindung
+        # /api/states wird gestreamt, damit nur Lichter und Schalter im Speicher landen
         self.ha_manager = HomeAssistantRestManager(
             ha_bearer_token=token, 
-            ha_base_url=HA_URL
+            ha_base_url=HA_URL,
+            stream_states=True
         )
 
         # Initialisierung des HomeAssistant Controllers
-        self.ha_controller = HomeAssistantController(ha_manager=self.ha_manager)
+        # Die Geräteliste kommt sofort aus dem Snapshot und wird bei Bedarf im Hintergrund aktualisiert
+        snapshot_cache: DeviceListSnapshotCache = DeviceListSnapshotCache(
+            ha_base_url=HA_URL,
+            path=os.getenv("HA_DEVICE_SNAPSHOT_PATH"),
+            ttl=float(os.getenv("HA_DEVICE_SNAPSHOT_TTL", "3600"))
+        )
+        # Service-Calls laufen über eine Warteschlange im Hintergrund, die Sprachausgabe wartet nicht auf HA
+        # (HA_DISPATCH_WORKERS=0 sendet wie bisher synchron)
+        dispatch_workers: int = int(os.getenv("HA_DISPATCH_WORKERS", "4"))
+        dispatch_queue: HomeAssistantDispatchQueue | None = HomeAssistantDispatchQueue(
+            ha_manager=self.ha_manager,
+            workers=dispatch_workers,
+            coalesce_window=float(os.getenv("HA_COALESCE_WINDOW_MS", "50")) / 1000
+        ) if dispatch_workers > 0 else None
+        self.ha_controller = HomeAssistantController(ha_manager=self.ha_manager, snapshot_cache=snapshot_cache,
+                                                     dispatch_queue=dispatch_queue)
         
-        # Initialisierung des Intent Recognizers
-        self.intent_recognizer = IntentRecognizer()
+        # Initialisierung des Intent Recognizers (ein nötiges Training läuft im Hintergrund)
+        self.intent_recognizer = IntentRecognizer(background_training=True)
     
         # Initialisierung des Device Matchers
-        self.deviceMatcher = DeviceMatcher()
-        self.deviceList = self.ha_controller.get_device_list()
-
-        with open("src/nlp_assistant/data/deviceList.json", "r", encoding="utf-8") as f:
-            import json
-            self.deviceList = json.load(f)
+        # DEVICE_MATCHER_LOW_MEMORY=1: Vektortabelle per mmap statt de_core_news_lg (mehrere Worker pro Host)
+        self.deviceMatcher = DeviceMatcher(lowMemory=os.getenv("DEVICE_MATCHER_LOW_MEMORY", "0") == "1")
+        # Geräteindex (Name/entity_id/Domain) des Controllers übernehmen und Vektor-Index einmalig aufbauen
+        self.deviceIndex: DeviceIndex = self.ha_controller.device_index
+        self.deviceList = list(self.deviceIndex.devices)
+        self.deviceMatcher.setDeviceList(self.deviceIndex)
+
+        # HA_LIVE_REGISTRY=1: Geräteliste live über die WebSocket-API aktuell halten (eigener Thread)
+        self.device_registry: HomeAssistantDeviceRegistry | None = None
+        if os.getenv("HA_LIVE_REGISTRY", "0") == "1":
+            self.device_registry = HomeAssistantDeviceRegistry(ha_base_url=HA_URL, ha_bearer_token=token)
+            self.device_registry.start()
 
         self.textToSpeechModule: TextToSpeech = TextToSpeech()
 
         print("--- Initialization complete! ---")
 
 
+    def refresh_device_list(self) -> None:
+        """
+        Übernimmt die aktuelle Geräteliste der Live-Registry (nur nach Änderungen ein neues Listenobjekt)
+        bzw. das Ergebnis einer Aktualisierung des Snapshots im Hintergrund.
+        """
+        if self.device_registry is not None and self.device_registry.synced.is_set():
+            devices: list = self.device_registry.get_device_list()
+            if devices is not self.deviceList:
+                self.deviceList = devices
+                self.ha_controller.device_list = devices
+        elif self.device_registry is None:
+            self.ha_controller.refresh_if_stale()
+
+        if self.ha_controller.device_index is not self.deviceIndex:
+            self.deviceIndex = self.ha_controller.device_index
+
     def process_command(self, user_input: str) -> dict:
         print(f"Processing command: {user_input}")
 
+        self.refresh_device_list()
+
+        # Gemeinsame Analyse des Befehls: jede Pipeline läuft pro Befehl nur einmal
+        analysis: CommandAnalysis = CommandAnalysis(user_input, intentRecognizer=self.intent_recognizer,
+                                                    deviceMatcher=self.deviceMatcher, deviceList=self.deviceIndex)
+
         # Intent Erkennung
-        intent = self.intent_recognizer.predict(user_input)[0]
+        intent = analysis.intent()[0]
 
         match intent:
             case "turn_on":
-                execution_data = ha_command(self, intent=intent, user_input=user_input)
+                execution_data = ha_command(self, intent=intent, user_input=user_input, analysis=analysis)
 
                 anschalten = [
                     f"Schalte {execution_data.get("device_name").get('name')} an.",
@@ -73,7 +123,7 @@ class backendController:
                 }
 
             case "turn_off":
-                execution_data = ha_command(self, intent=intent, user_input=user_input)
+                execution_data = ha_command(self, intent=intent, user_input=user_input, analysis=analysis)
 
                 ausschalten = [
                     f"Schalte {execution_data.get("device_name").get('name')} aus.",
@@ -94,7 +144,7 @@ class backendController:
                 }
 
             case "toggle":
-                execution_data = ha_command(self, intent=intent, user_input=user_input)
+                execution_data = ha_command(self, intent=intent, user_input=user_input, analysis=analysis)
 
                 umschalten = [
                     f"Schalte {execution_data.get("device_name").get('name')} um.",
@@ -133,11 +183,23 @@ class backendController:
                     "audio_synth_success": True
                 }
 
-def ha_command(self, user_input: str, intent: str) -> dict:
-    # Extraktion des DeviceName und Abgleich mit der Geräteliste des HomeAssistant
-    raw_device_name: str = self.deviceMatcher.extractDeviceNamesFromCommands(user_input)
-    device_name: dict = self.deviceMatcher.findBestDeviceMatch(targetDeviceName=raw_device_name,
-                                                               deviceList=self.deviceList)
+def ha_command(self, user_input: str, intent: str, analysis: CommandAnalysis | None = None) -> dict:
+    if analysis is None:
+        analysis = CommandAnalysis(user_input, intentRecognizer=self.intent_recognizer,
+                                   deviceMatcher=self.deviceMatcher, deviceList=self.deviceIndex)
+
+    # Extraktion des DeviceName und Abgleich mit der Geräteliste des HomeAssistant (Parse aus der Analyse)
+    raw_device_name: str = analysis.rawDeviceName()
+
+    # Gruppenbefehl ("alle Lichter im Wohnzimmer aus"): alle passenden Geräte gemeinsam schalten.
+    # Mit Ortsangabe werden nur Geräte dieses Orts geschaltet, auch wenn es nur eines oder keines ist.
+    if analysis.isGroupCommand():
+        devices: list[dict] = analysis.devices()
+        if len(devices) > 1 or analysis.locationQualifiers():
+            return ha_group_command(self, intent=intent, raw_device_name=raw_device_name, devices=devices,
+                                    analysis=analysis)
+
+    device_name: dict = analysis.device()
 
     # Aktion erstellen und an HomeAssistant senden
     action_input: dict = {
@@ -155,8 +217,35 @@ def ha_command(self, user_input: str, intent: str) -> dict:
         "intent": intent,
         "raw_device_name": raw_device_name,
         "device_name": device_name,
-        "action_input": action_input
+        "action_input": action_input,
+        "timings": analysis.timings
+    }
+
+    return result_dict
+    ...
+
+
+def ha_group_command(self, intent: str, raw_device_name: str, devices: list[dict], analysis: CommandAnalysis) -> dict:
+    # Eine Aktion pro Gerät; der Manager fasst sie zu einem Service-Call pro domain.service zusammen
+    action_input: list[dict] = [
+        {"domain": f"{device["type"]}", "service": f"{intent}", "entity_id": device["entity_id"]}
+        if device.get("entity_id") else
+        {"domain": f"{device["type"]}", "service": f"{intent}", "name": f"{device["name"]}"}
+        for device in devices
+    ]
+
+    # Aktionen an HomeAssistant senden (ein Round-Trip pro Gruppe)
+    if action_input:
+        self.ha_controller.post_actions(action_input)
+
+    result_dict: dict = {
+        "intent": intent,
+        "raw_device_name": raw_device_name,
+        # Zusammengefasster Name für die Sprachausgabe, die einzelnen Geräte stehen in "devices"
+        "device_name": {"name": ", ".join(device["name"] for device in devices) or "kein passendes Gerät"},
+        "devices": devices,
+        "action_input": action_input,
+        "timings": analysis.timings
     }
 
     return result_dict
-    ...
\ No newline at end of file
@@ -0,0 +1,93 @@
+import re
+from typing import Iterator
+
+_WHITESPACE_PATTERN: re.Pattern = re.compile(r"\s+")
+
+
+class DeviceIndex:
+    """
+    Unveränderlicher Index über eine Geräteliste mit O(1)-Zugriff nach Name, normalisiertem Name,
+    entity_id und Domain.
+
+    Doppelte Namen werden deterministisch aufgelöst: es gewinnt das Gerät mit der kleinsten entity_id,
+    unabhängig von der Reihenfolge der Liste. Alle Kandidaten bleiben über find_all erreichbar.
+    Der Index verhält sich wie eine Liste (Iteration, len, Indexzugriff) und kann überall dort
+    übergeben werden, wo bisher die Geräteliste erwartet wurde.
+    """
+
+    def __init__(self, devices: list[dict]) -> None:
+        """
+        Baut alle Lookup-Tabellen in einem Durchlauf auf.
+
+        Args:
+            devices (list[dict]): Die Geräteliste ('name', 'entity_id', 'type').
+        """
+        self.devices: tuple[dict, ...] = tuple(devices)
+        self.by_entity_id: dict[str, dict] = {}
+        self.by_domain: dict[str, list[dict]] = {}
+        self._by_name: dict[str, list[dict]] = {}
+        self._by_normalized_name: dict[str, list[dict]] = {}
+
+        for device in self.devices:
+            entity_id: str | None = device.get("entity_id")
+            if entity_id:
+                self.by_entity_id.setdefault(entity_id, device)
+
+            domain: str | None = device.get("type") or (entity_id.split(".")[0] if entity_id else None)
+            if domain:
+                self.by_domain.setdefault(domain, []).append(device)
+
+            name: str | None = device.get("name")
+            if name:
+                self._by_name.setdefault(name, []).append(device)
+                self._by_normalized_name.setdefault(self.normalize(name), []).append(device)
+
+        # Kandidaten sortieren, damit der erste Eintrag nicht von der Listenreihenfolge abhängt
+        for candidates in (*self._by_name.values(), *self._by_normalized_name.values()):
+            candidates.sort(key=lambda device: device.get("entity_id") or "")
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        """Normalisiert einen Gerätenamen (Kleinschreibung, '-'/'_' als Leerzeichen, einfache Leerzeichen)."""
+        return _WHITESPACE_PATTERN.sub(" ", name.lower().replace("-", " ").replace("_", " ")).strip()
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.devices)
+
+    def __getitem__(self, position: int) -> dict:
+        return self.devices[position]
+
+    def get(self, entity_id: str) -> dict | None:
+        """Gerät zur entity_id oder None."""
+        return self.by_entity_id.get(entity_id)
+
+    def by_name(self, name: str) -> dict | None:
+        """Gerät mit exakt diesem Namen oder None (bei Duplikaten das mit der kleinsten entity_id)."""
+        candidates: list[dict] | None = self._by_name.get(name)
+        return candidates[0] if candidates else None
+
+    def by_normalized_name(self, name: str) -> dict | None:
+        """Gerät, dessen normalisierter Name übereinstimmt, oder None."""
+        candidates: list[dict] | None = self._by_normalized_name.get(self.normalize(name))
+        return candidates[0] if candidates else None
+
+    def find(self, name: str) -> dict | None:
+        """Sucht zuerst nach dem exakten, dann nach dem normalisierten Namen."""
+        device: dict | None = self.by_name(name)
+        return device if device is not None else self.by_normalized_name(name)
+
+    def find_all(self, name: str) -> list[dict]:
+        """Alle Geräte mit diesem (normalisierten) Namen, sortiert nach entity_id."""
+        return list(self._by_normalized_name.get(self.normalize(name), []))
+
+    def domain(self, domain: str) -> list[dict]:
+        """Alle Geräte einer Domain (z.B. 'light') in Listenreihenfolge."""
+        return list(self.by_domain.get(domain, []))
+
+    def resolve_entity_id(self, name: str) -> str | None:
+        """Löst einen Gerätenamen zur entity_id auf."""
+        device: dict | None = self.find(name)
+        return device.get("entity_id") if device is not None else None
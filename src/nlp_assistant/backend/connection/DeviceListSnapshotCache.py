@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import time
+
+from nlp_assistant.backend.core.cacheDirectory import cache_dir
+
+SNAPSHOT_FILE_NAME: str = "deviceListSnapshot.json"
+
+
+def default_snapshot_path() -> str:
+    """Pfad des Snapshots im Cache-Verzeichnis (siehe cache_dir), wenn kein Pfad übergeben wird."""
+    return cache_dir(SNAPSHOT_FILE_NAME)
+
+
+class DeviceListSnapshotCache:
+    """
+    Speichert die aufbereitete Geräteliste mit Zeitstempel auf der Festplatte.
+
+    Beim Start kann die Liste sofort aus dem Snapshot geladen werden, statt auf /api/services und
+    /api/states zu warten. Ein Snapshot gilt nur für die HomeAssistant Instanz, von der er stammt,
+    und ist nach ttl Sekunden veraltet (er wird dann weiterhin geliefert, sollte aber aktualisiert werden).
+    """
+
+    def __init__(self, ha_base_url: str, path: str | None = None, ttl: float = 3600.0) -> None:
+        """
+        Args:
+            ha_base_url (str): Basis-URL der HomeAssistant Instanz (Snapshots anderer Instanzen werden ignoriert).
+            path (str | None): Pfad der Snapshot-Datei, None für default_snapshot_path().
+            ttl (float): So lange (Sekunden) gilt ein Snapshot als aktuell.
+        """
+        self.ha_base_url: str = ha_base_url
+        self.path: str = path or default_snapshot_path()
+        self.ttl: float = ttl
+
+    def load(self) -> tuple[list, float] | None:
+        """
+        Lädt den Snapshot.
+
+        Returns:
+            tuple[list, float] | None: Geräteliste und Zeitpunkt der Speicherung (Unix-Zeit)
+            oder None, wenn kein passender Snapshot vorhanden ist.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot: dict = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Snapshot '{self.path}' konnte nicht gelesen werden: {e}")
+            return None
+
+        if not isinstance(snapshot, dict) or snapshot.get("ha_base_url") != self.ha_base_url:
+            return None
+
+        devices = snapshot.get("devices")
+        saved_at = snapshot.get("saved_at")
+        if not isinstance(devices, list) or not isinstance(saved_at, (int, float)):
+            return None
+
+        return devices, float(saved_at)
+
+    def save(self, devices: list) -> None:
+        """
+        Schreibt die Geräteliste atomar (temporäre Datei + os.replace), ein gleichzeitiger Leser
+        sieht also immer einen vollständigen Snapshot.
+        """
+        snapshot: dict = {"ha_base_url": self.ha_base_url, "saved_at": time.time(), "devices": devices}
+        directory: str = os.path.dirname(self.path) or "."
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".deviceListSnapshot", suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            print(f"Snapshot '{self.path}' konnte nicht geschrieben werden: {e}")
+
+    def is_fresh(self, saved_at: float) -> bool:
+        """True, wenn ein zum Zeitpunkt saved_at gespeicherter Snapshot jünger als die TTL ist."""
+        return time.time() - saved_at < self.ttl
@@ -0,0 +1,141 @@
+import json
+
+from nlp_assistant.backend.connection.DeviceIndex import DeviceIndex
+
+
+class HomeAssistantApiBase():
+    """
+    Gemeinsame Grundlage des synchronen und des asynchronen HomeAssistant-Clients:
+    Header, Dummy-Geräteliste, Aufbereitung von Aktionen und Aufbau der Geräteliste aus den API-Antworten.
+    """
+    supported_devices: list = ["light", "switch"]
+
+    ha_base_url: str
+    headers: dict
+    dummy_file_path: str
+
+    def __init__(self, ha_base_url: str, ha_bearer_token: str, dummy_file_path: str = "src/nlp_assistant/data/deviceList.json"):
+        self.ha_base_url = ha_base_url
+        self.dummy_file_path = dummy_file_path
+        self.headers = {
+            "Authorization": f"Bearer {ha_bearer_token}",
+            "content-type": "application/json",
+        }
+
+    def _prepare_action(self, action_data: dict, device_list: DeviceIndex | list) -> tuple[str, str, dict] | None:
+        """
+        Zerlegt action_data in Domain, Service und Payload und löst einen Gerätenamen zur entity_id auf.
+
+        Returns:
+            tuple[str, str, dict] | None: Domain, Service und Payload oder None bei ungültigen Daten.
+        """
+        # Kopie erstellen, damit Originaldaten im BackendController nicht verändert werden
+        payload: dict = action_data.copy()
+
+        try:
+            domain: str = payload.pop("domain")
+            service: str = payload.pop("service")
+        except KeyError:
+            print("Action_data muss 'domain' und 'service' enthalten")
+            return None
+
+        target_name: str | None = payload.pop("name", None)
+        target_id: str | None = payload.get("entity_id", None)
+
+        if target_name and not target_id:
+            found_id: str | None = self._resolve_entity_id(target_name, device_list)
+
+            if found_id:
+                payload["entity_id"] = found_id
+                print(f"Name '{target_name}' aufgelöst zu ID '{found_id}'")
+            else:
+                print(f"Kein Gerät mit Namen '{target_name}' in der Geräteliste gefunden")
+                return None
+
+        elif not target_id:
+            print("Action_data muss 'entity_id' oder 'name' enthalten")
+            return None
+
+        return domain, service, payload
+
+    @staticmethod
+    def _resolve_entity_id(target_name: str, device_list: DeviceIndex | list) -> str | None:
+        """
+        Löst einen Gerätenamen zur entity_id auf. Mit einem DeviceIndex in O(1), eine rohe Liste wird dafür
+        einmalig indiziert. Doppelte Namen werden deterministisch (kleinste entity_id) aufgelöst.
+        """
+        if not hasattr(device_list, "resolve_entity_id"):
+            device_list = DeviceIndex(device_list)
+        return device_list.resolve_entity_id(target_name)
+
+    def _load_dummy_device_list(self) -> list:
+        """Lädt die Dummy-Geräteliste (ohne Verbindung zu HomeAssistant)."""
+        try:
+            with open(self.dummy_file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            print(f"Dummy-Datei '{self.dummy_file_path}' nicht gefunden.")
+            return []
+        except json.JSONDecodeError:
+            print(f"Fehler beim Lesen der JSON Datei '{self.dummy_file_path}'.")
+            return []
+
+    def _build_service_map(self, services_data: list) -> dict:
+        """Ordnet jeder unterstützten Domain ihre Services zu (Antwort von /api/services)."""
+        service_map: dict = {}
+        for domain_item in services_data:
+            domain_name: str = domain_item.get("domain")
+            if domain_name in self.supported_devices:
+                service_map[domain_name] = list(domain_item.get("services"))
+        return service_map
+
+    def _is_supported_state(self, entity) -> bool:
+        """True für States aus /api/states, deren Domain unterstützt wird (Vorfilter beim Streaming)."""
+        return isinstance(entity, dict) and str(entity.get("entity_id", "")).split('.')[0] in self.supported_devices
+
+    def _device_from_state(self, entity: dict, service_map: dict) -> dict | None:
+        """Wandelt einen State aus /api/states in einen Geräteeintrag um (None für nicht unterstützte Domains)."""
+        entity_id: str = entity.get("entity_id")
+        domain: str = entity_id.split('.')[0]
+
+        if domain not in self.supported_devices:
+            return None
+
+        attributes: dict = entity.get("attributes", {})
+
+        device_dict: dict = {
+            "name": attributes.get("friendly_name", entity_id),
+            "entity_id": entity_id,
+            "type": domain,
+            "actions": service_map[domain],
+            "capabilities": {}
+        }
+
+        if domain == "light":
+            supported_modes: list = attributes.get("supported_color_modes", [])
+
+            if any(mode in supported_modes for mode in
+                   ['brightness', 'color_temp', 'hs', 'xy', 'rgb', 'rgbw', 'rgbww']):
+                device_dict["capabilities"]["can_set_brightness"] = True
+
+                if 'color_temp' in supported_modes:
+                    device_dict["capabilities"]["can_set_color_temp"] = True
+                    device_dict["capabilities"]["min_temp_kelvin"] = attributes.get('min_color_temp_kelvin')
+                    device_dict["capabilities"]["max_temp_kelvin"] = attributes.get('max_color_temp_kelvin')
+
+                if any(mode in supported_modes for mode in ['hs', 'xy', 'rgb', 'rgbw', 'rgbww']):
+                    device_dict["capabilities"]["can_set_color"] = True
+
+        return device_dict
+
+    def _build_device_list(self, services_data: list, states_data: list) -> list:
+        """Baut die Geräteliste aus den Antworten von /api/services und /api/states."""
+        service_map: dict = self._build_service_map(services_data)
+
+        final_device_list: list = []
+        for entity in states_data:
+            device_dict: dict | None = self._device_from_state(entity, service_map)
+            if device_dict is not None:
+                final_device_list.append(device_dict)
+
+        return final_device_list
@@ -0,0 +1,159 @@
+import asyncio
+import time
+
+import aiohttp
+
+from nlp_assistant.backend.connection.DeviceIndex import DeviceIndex
+from nlp_assistant.backend.connection.HomeAssistantApiBase import HomeAssistantApiBase
+from nlp_assistant.backend.connection.JsonArrayStream import JsonArrayStream
+
+
+class HomeAssistantAsyncClient(HomeAssistantApiBase):
+    """
+    Asynchroner HomeAssistant-Client mit derselben Oberfläche wie HomeAssistantRestManager
+    (get_device_list, post_action, check_connection).
+
+    Alle Aufrufe teilen sich eine aiohttp.ClientSession mit Verbindungspool, sodass viele Service-Calls
+    gleichzeitig unterwegs sein können. Die Session wird beim ersten Aufruf in der laufenden Event-Loop erstellt.
+    """
+
+    def __init__(self, ha_base_url: str, ha_bearer_token: str, dummy_file_path: str = "src/nlp_assistant/data/deviceList.json",
+                 pool_size: int = 100, connect_timeout: float = 2.0, read_timeout: float = 10.0,
+                 health_ttl: float = 30.0, stream_states: bool = False, stream_chunk_size: int = 1 << 16):
+        """
+        Args:
+            ha_base_url (str): Basis-URL der HomeAssistant Instanz.
+            ha_bearer_token (str): Long-Lived Access Token.
+            dummy_file_path (str): Geräteliste, die ohne Verbindung geladen wird.
+            pool_size (int): Maximale Anzahl gleichzeitiger Verbindungen im Pool.
+            connect_timeout (float): Timeout für den Verbindungsaufbau in Sekunden.
+            read_timeout (float): Timeout für die Antwort in Sekunden.
+            health_ttl (float): So lange (Sekunden) gilt der zuletzt beobachtete Verbindungsstatus.
+            stream_states (bool): /api/states stückweise lesen und nur States unterstützter Domains behalten.
+            stream_chunk_size (int): Größe der gelesenen Stücke in Bytes beim Streaming.
+        """
+        super().__init__(ha_base_url=ha_base_url, ha_bearer_token=ha_bearer_token, dummy_file_path=dummy_file_path)
+        self.pool_size: int = pool_size
+        self.timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.health_ttl: float = health_ttl
+        self.stream_states: bool = stream_states
+        self.stream_chunk_size: int = stream_chunk_size
+
+        self._session: aiohttp.ClientSession | None = None
+        self._healthy: bool = False
+        self._health_checked_at: float | None = None
+
+    async def __aenter__(self) -> "HomeAssistantAsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Gibt die gemeinsame Session zurück und erstellt sie beim ersten Aufruf."""
+        if self._session is None or self._session.closed:
+            connector: aiohttp.TCPConnector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """Schließt die Session und alle Verbindungen des Pools."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _set_health(self, healthy: bool) -> None:
+        self._healthy = healthy
+        self._health_checked_at = time.monotonic()
+
+    async def check_connection(self) -> bool:
+        """
+        Gibt den Verbindungsstatus zurück. Innerhalb von health_ttl wird der zuletzt beobachtete Status
+        verwendet, erst danach wird GET /api/ erneut aufgerufen.
+        """
+        if self._health_checked_at is not None and time.monotonic() - self._health_checked_at < self.health_ttl:
+            return self._healthy
+
+        try:
+            async with self._get_session().get(f"{self.ha_base_url}/api/") as response:
+                healthy: bool = response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            healthy = False
+
+        self._set_health(healthy)
+        return healthy
+
+    async def _get_json(self, path: str):
+        async with self._get_session().get(f"{self.ha_base_url}{path}") as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _get_states_streaming(self) -> list:
+        """Liest /api/states stückweise und behält nur States unterstützter Domains."""
+        parser: JsonArrayStream = JsonArrayStream()
+        states: list = []
+
+        async with self._get_session().get(f"{self.ha_base_url}/api/states") as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(self.stream_chunk_size):
+                states.extend(entity for entity in parser.feed(chunk) if self._is_supported_state(entity))
+
+        states.extend(entity for entity in parser.close() if self._is_supported_state(entity))
+        return states
+
+    async def get_device_list(self) -> list:
+        """
+        Lädt die Geräteliste; /api/services und /api/states werden gleichzeitig abgefragt.
+        """
+        if not await self.check_connection():
+            print("Verbindung zu HA fehlgeschlagen. Lade Dummy-Liste.")
+            return self._load_dummy_device_list()
+
+        try:
+            states_request = self._get_states_streaming() if self.stream_states else self._get_json("/api/states")
+            services_data, states_data = await asyncio.gather(self._get_json("/api/services"), states_request)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self._set_health(False)
+            print(f"Fehler beim Laden der Geräteliste: {e}. Lade Dummy-Liste.")
+            return self._load_dummy_device_list()
+
+        return self._build_device_list(services_data, states_data)
+
+    async def post_action(self, action_data: dict, device_list: DeviceIndex | list) -> dict | None:
+        """
+        Führt eine Aktion aus (wie HomeAssistantRestManager.post_action). Mehrere Aufrufe können
+        z.B. mit asyncio.gather gleichzeitig laufen.
+        """
+        if not await self.check_connection():
+            print(f"[SIMULATION] Verbindung fehlgeschlagen. Simuliere Aktion: {action_data}")
+            return {"success": True, "simulation": True}
+
+        prepared: tuple[str, str, dict] | None = self._prepare_action(action_data, device_list)
+        if prepared is None:
+            return None
+
+        domain, service, payload = prepared
+        return await self._call_service(domain, service, payload)
+
+    async def _call_service(self, domain: str, service: str, payload: dict) -> dict | list | None:
+        """Sendet einen Service-Call an HomeAssistant und gibt die Antwort zurück (None bei Fehlern)."""
+        action_url: str = f"{self.ha_base_url}/api/services/{domain}/{service}"
+
+        try:
+            async with self._get_session().post(action_url, json=payload) as response:
+                self._set_health(True)
+                response.raise_for_status()
+                result = await response.json()
+
+            print(f"Aktion '{domain}.{service}' auf '{payload.get('entity_id')}' erfolgreich ausgeführt")
+            return result
+
+        except aiohttp.ClientResponseError as e:
+            print(f"HTTP Fehler beim Aufruf von {action_url}: {e}")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            self._set_health(False)
+            print(f"Fehler bei der Anfrage: {e}")
+        except aiohttp.ClientError as e:
+            print(f"Fehler bei der Anfrage: {e}")
+
+        return None
@@ -1,17 +1,119 @@
+import threading
+import time
+from concurrent.futures import Future
+
 from nlp_assistant.backend.connection import HomeAssistantRestManager
+from nlp_assistant.backend.connection.DeviceIndex import DeviceIndex
+from nlp_assistant.backend.connection.DeviceListSnapshotCache import DeviceListSnapshotCache
+from nlp_assistant.backend.connection.HomeAssistantDispatchQueue import HomeAssistantDispatchQueue
 
 class HomeAssistantController:
 
     ha_manager: HomeAssistantRestManager
-    device_list: list
+    device_index: DeviceIndex
 
-    def __init__(self, ha_manager: HomeAssistantRestManager):
+    def __init__(self, ha_manager: HomeAssistantRestManager, snapshot_cache: DeviceListSnapshotCache | None = None,
+                 dispatch_queue: HomeAssistantDispatchQueue | None = None):
+        """
+        Args:
+            ha_manager (HomeAssistantRestManager): Verbindung zu HomeAssistant.
+            snapshot_cache (DeviceListSnapshotCache | None): Gespeicherte Geräteliste für einen schnellen Start.
+                Ist ein Snapshot vorhanden, wird er sofort verwendet und (falls veraltet) im Hintergrund aktualisiert.
+            dispatch_queue (HomeAssistantDispatchQueue | None): Warteschlange für Service-Calls. Ist sie gesetzt,
+                geben post_action und post_actions sofort Handles zurück, statt auf HomeAssistant zu warten.
+        """
         self.ha_manager = ha_manager
-        self.device_list = ha_manager.get_device_list()
+        self.snapshot_cache = snapshot_cache
+        self.dispatch_queue = dispatch_queue
+        self.device_list_updated_at: float | None = None
+        self._refresh_lock: threading.Lock = threading.Lock()
+        self._refresh_thread: threading.Thread | None = None
+
+        snapshot: tuple[list, float] | None = snapshot_cache.load() if snapshot_cache is not None else None
+
+        if snapshot_cache is None:
+            self.device_list = ha_manager.get_device_list()
+        elif snapshot is None:
+            # Noch kein Snapshot: einmal synchron laden, ohne Verbindung die Dummy-Liste verwenden
+            if not self.refresh_device_list():
+                self.device_list = ha_manager._load_dummy_device_list()
+        else:
+            self.device_list, self.device_list_updated_at = snapshot
+            self.refresh_if_stale()
         pass
 
-    def post_action (self, action: dict) -> dict | None:
-        return self.ha_manager.post_action(action_data=action, device_list=self.device_list)
+    @property
+    def device_list(self) -> list:
+        return list(self.device_index.devices)
+
+    @device_list.setter
+    def device_list(self, device_list: list) -> None:
+        # Index einmal pro Geräteliste aufbauen, danach O(1)-Auflösung in post_action
+        self.device_index = DeviceIndex(device_list)
+
+    def refresh_device_list(self) -> bool:
+        """
+        Lädt die Geräteliste genau einmal von HomeAssistant, übernimmt sie und speichert den Snapshot.
+        Ist HomeAssistant nicht erreichbar, bleibt die bisherige Liste erhalten.
+
+        Returns:
+            bool: True, wenn die Liste aktualisiert wurde.
+        """
+        with self._refresh_lock:
+            try:
+                devices: list = self.ha_manager.get_device_list(fallback=False)
+            except ConnectionError as e:
+                print(f"Geräteliste konnte nicht aktualisiert werden: {e}")
+                return False
+
+            self.device_list = devices
+            self.device_list_updated_at = time.time()
+            if self.snapshot_cache is not None:
+                self.snapshot_cache.save(devices)
+            return True
+
+    def refresh_in_background(self) -> threading.Thread:
+        """Startet refresh_device_list in einem Daemon-Thread (läuft bereits einer, wird dieser zurückgegeben)."""
+        if self._refresh_thread is None or not self._refresh_thread.is_alive():
+            self._refresh_thread = threading.Thread(target=self.refresh_device_list, name="ha-device-list-refresh",
+                                                    daemon=True)
+            self._refresh_thread.start()
+        return self._refresh_thread
+
+    def refresh_if_stale(self) -> bool:
+        """
+        Startet eine Aktualisierung im Hintergrund, wenn die Liste älter als die TTL des Snapshots ist.
+
+        Returns:
+            bool: True, wenn eine Aktualisierung gestartet wurde (oder bereits läuft).
+        """
+        if self.snapshot_cache is None:
+            return False
+        if self.device_list_updated_at is not None and self.snapshot_cache.is_fresh(self.device_list_updated_at):
+            return False
+
+        self.refresh_in_background()
+        return True
+
+    def post_action (self, action: dict) -> dict | None | Future:
+        if self.dispatch_queue is not None:
+            return self.dispatch_queue.submit(action_data=action, device_list=self.device_index)
+        return self.ha_manager.post_action(action_data=action, device_list=self.device_index)
+
+    def post_actions (self, actions: list[dict]) -> list[dict] | list[Future]:
+        if self.dispatch_queue is not None:
+            # Die Warteschlange fasst Aktionen mit gleichem domain.service selbst zusammen
+            return [self.dispatch_queue.submit(action_data=action, device_list=self.device_index) for action in actions]
+        return self.ha_manager.post_actions(actions=actions, device_list=self.device_index)
+
+    def dispatch_stats (self) -> dict | None:
+        """Warteschlangentiefe und Latenzen der Dispatch-Warteschlange (None ohne Warteschlange)."""
+        return self.dispatch_queue.stats() if self.dispatch_queue is not None else None
+
+    def close (self) -> None:
+        """Sendet noch offene Aktionen und beendet die Dispatch-Warteschlange."""
+        if self.dispatch_queue is not None:
+            self.dispatch_queue.stop()
 
     def get_device_list (self) -> list:
         return self.ha_manager.get_device_list()
@@ -0,0 +1,252 @@
+import asyncio
+import threading
+from typing import Callable
+
+import aiohttp
+
+from nlp_assistant.backend.connection.HomeAssistantApiBase import HomeAssistantApiBase
+
+
+class HomeAssistantDeviceRegistry(HomeAssistantApiBase):
+    """
+    Live-Abbild der HomeAssistant-Geräte über die WebSocket-API.
+
+    Nach der Authentifizierung werden einmalig alle States und Services geladen, danach werden
+    'state_changed'- und 'entity_registry_updated'-Events inkrementell auf den Geräteindex angewendet.
+    Jede Änderung an einem Geräteeintrag (neu, umbenannt, entfernt, andere Fähigkeiten) erhöht version,
+    reine Zustandswechsel (an/aus) nicht. Abhängige Caches können so über die Version invalidieren.
+    Bei Verbindungsabbrüchen wird mit wachsender Wartezeit neu verbunden und vollständig synchronisiert.
+    """
+
+    def __init__(self, ha_base_url: str, ha_bearer_token: str, dummy_file_path: str = "src/nlp_assistant/data/deviceList.json",
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 60.0):
+        """
+        Args:
+            ha_base_url (str): Basis-URL der HomeAssistant Instanz (http/https, wird zu ws/wss).
+            ha_bearer_token (str): Long-Lived Access Token.
+            dummy_file_path (str): Geräteliste, die bis zur ersten Synchronisierung verwendet werden kann.
+            reconnect_delay (float): Wartezeit vor dem ersten Neuverbinden in Sekunden (verdoppelt sich je Versuch).
+            max_reconnect_delay (float): Obergrenze der Wartezeit in Sekunden.
+        """
+        super().__init__(ha_base_url=ha_base_url, ha_bearer_token=ha_bearer_token, dummy_file_path=dummy_file_path)
+        self.ha_bearer_token: str = ha_bearer_token
+        self.websocket_url: str = ha_base_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1).rstrip("/") \
+            + "/api/websocket"
+        self.reconnect_delay: float = reconnect_delay
+        self.max_reconnect_delay: float = max_reconnect_delay
+
+        self.version: int = 0
+        self.synced: threading.Event = threading.Event()
+        self._devices: dict[str, dict] = {}
+        self._service_map: dict[str, list] = {}
+        self._snapshot: list[dict] = []
+        self._snapshot_version: int = -1
+        self._listeners: list[Callable[[int], None]] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._message_id: int = 0
+        self._stop: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    # --- Lesender Zugriff (thread-safe) ---
+
+    def get_device_list(self) -> list:
+        """
+        Gibt die aktuelle Geräteliste zurück. Die Liste wird nur nach einer Änderung neu aufgebaut,
+        zwischen zwei Änderungen wird dasselbe Listenobjekt zurückgegeben.
+        """
+        with self._lock:
+            if self._snapshot_version != self.version:
+                self._snapshot = list(self._devices.values())
+                self._snapshot_version = self.version
+            return self._snapshot
+
+    def add_listener(self, callback: Callable[[int], None]) -> None:
+        """Registriert einen Callback, der nach jeder Änderung mit der neuen Version aufgerufen wird."""
+        self._listeners.append(callback)
+
+    # --- Anwenden von Änderungen ---
+
+    def _bump(self) -> None:
+        """Erhöht die Version (Aufruf mit gehaltenem Lock)."""
+        self.version += 1
+
+    def _notify(self, version: int) -> None:
+        for callback in self._listeners:
+            try:
+                callback(version)
+            except Exception as e:
+                print(f"Fehler im Listener der Geräteregistry: {e}")
+
+    def apply_snapshot(self, states: list, services: dict) -> None:
+        """
+        Ersetzt den Index durch eine vollständige Synchronisierung (Antworten von get_states / get_services).
+        """
+        service_map: dict[str, list] = {domain: list(domain_services)
+                                        for domain, domain_services in services.items()
+                                        if domain in self.supported_devices}
+        devices: dict[str, dict] = {}
+        for state in states:
+            device: dict | None = self._device_from_state(state, service_map)
+            if device is not None:
+                devices[device["entity_id"]] = device
+
+        with self._lock:
+            self._service_map = service_map
+            changed: bool = devices != self._devices
+            self._devices = devices
+            if changed:
+                self._bump()
+            version: int = self.version
+
+        self.synced.set()
+        if changed:
+            self._notify(version)
+
+    def apply_event(self, event: dict) -> bool:
+        """
+        Wendet ein einzelnes Event auf den Index an.
+
+        Args:
+            event (dict): Das 'event'-Objekt einer WebSocket-Nachricht.
+
+        Returns:
+            bool: True, wenn sich die Geräteliste geändert hat.
+        """
+        event_type: str | None = event.get("event_type")
+        data: dict = event.get("data", {})
+        changed: bool = False
+
+        with self._lock:
+            if event_type == "state_changed":
+                entity_id: str = data.get("entity_id", "")
+                new_state: dict | None = data.get("new_state")
+
+                if new_state is None:
+                    changed = self._devices.pop(entity_id, None) is not None
+                elif entity_id.split(".")[0] in self._service_map:
+                    device: dict | None = self._device_from_state(new_state, self._service_map)
+                    if device is not None and self._devices.get(entity_id) != device:
+                        self._devices[entity_id] = device
+                        changed = True
+
+            elif event_type == "entity_registry_updated":
+                action: str | None = data.get("action")
+                entity_id: str = data.get("entity_id", "")
+                old_entity_id: str | None = data.get("old_entity_id")
+
+                if action == "remove":
+                    changed = self._devices.pop(entity_id, None) is not None
+                elif action == "update" and old_entity_id and old_entity_id in self._devices:
+                    # Umbenannte entity_id: Eintrag übernehmen, der neue State folgt als state_changed
+                    device = dict(self._devices.pop(old_entity_id), entity_id=entity_id)
+                    if entity_id.split(".")[0] in self.supported_devices:
+                        self._devices[entity_id] = device
+                    changed = True
+
+            if changed:
+                self._bump()
+            version: int = self.version
+
+        if changed:
+            self._notify(version)
+        return changed
+
+    # --- WebSocket ---
+
+    def _next_id(self) -> int:
+        self._message_id += 1
+        return self._message_id
+
+    async def _request(self, ws: aiohttp.ClientWebSocketResponse, message: dict, pending: dict) -> asyncio.Future:
+        """Sendet eine Nachricht mit neuer ID und gibt ein Future für das zugehörige Ergebnis zurück."""
+        message_id: int = self._next_id()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        pending[message_id] = future
+        await ws.send_json({"id": message_id, **message})
+        return future
+
+    async def _session(self, http: aiohttp.ClientSession) -> None:
+        """Eine WebSocket-Sitzung: Authentifizierung, Abonnements, Synchronisierung, Events bis zum Abbruch."""
+        async with http.ws_connect(self.websocket_url, heartbeat=30) as ws:
+            message: dict = await ws.receive_json()
+            if message.get("type") == "auth_required":
+                await ws.send_json({"type": "auth", "access_token": self.ha_bearer_token})
+                message = await ws.receive_json()
+            if message.get("type") != "auth_ok":
+                raise PermissionError(f"Authentifizierung fehlgeschlagen: {message}")
+
+            self._message_id = 0
+            pending: dict[int, asyncio.Future] = {}
+
+            # Erst abonnieren, dann synchronisieren: so geht zwischen Snapshot und Events nichts verloren
+            await self._request(ws, {"type": "subscribe_events", "event_type": "state_changed"}, pending)
+            await self._request(ws, {"type": "subscribe_events", "event_type": "entity_registry_updated"}, pending)
+            states_future: asyncio.Future = await self._request(ws, {"type": "get_states"}, pending)
+            services_future: asyncio.Future = await self._request(ws, {"type": "get_services"}, pending)
+            buffered_events: list[dict] | None = []
+
+            async for raw in ws:
+                if raw.type != aiohttp.WSMsgType.TEXT:
+                    break
+
+                message = raw.json()
+                if message.get("type") == "result":
+                    future: asyncio.Future | None = pending.pop(message.get("id"), None)
+                    if future is not None and not future.done():
+                        future.set_result(message.get("result") if message.get("success") else None)
+
+                    if buffered_events is not None and states_future.done() and services_future.done():
+                        self.apply_snapshot(states_future.result() or [], services_future.result() or {})
+                        for event in buffered_events:
+                            self.apply_event(event)
+                        buffered_events = None
+
+                elif message.get("type") == "event":
+                    if buffered_events is not None:
+                        buffered_events.append(message.get("event", {}))
+                    else:
+                        self.apply_event(message.get("event", {}))
+
+    async def run(self) -> None:
+        """
+        Hält die Verbindung aufrecht, bis stop() aufgerufen wird (verbindet nach Fehlern neu).
+        """
+        self._stop = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        delay: float = self.reconnect_delay
+
+        async with aiohttp.ClientSession() as http:
+            while not self._stop.is_set():
+                session_task: asyncio.Task = asyncio.create_task(self._session(http))
+                stop_task: asyncio.Task = asyncio.create_task(self._stop.wait())
+                await asyncio.wait({session_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+
+                if self._stop.is_set():
+                    session_task.cancel()
+                    await asyncio.gather(session_task, return_exceptions=True)
+                    break
+
+                stop_task.cancel()
+                try:
+                    session_task.result()
+                    delay = self.reconnect_delay
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError, PermissionError, ValueError) as e:
+                    print(f"WebSocket-Verbindung zu HA fehlgeschlagen: {e}. Neuer Versuch in {delay:.0f}s.")
+
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def start(self) -> threading.Thread:
+        """Startet run() in einem eigenen Daemon-Thread mit eigener Event-Loop."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="ha-device-registry", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Beendet run() (auch aus einem anderen Thread)."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
@@ -0,0 +1,306 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import requests
+
+from nlp_assistant.backend.connection import HomeAssistantRestManager
+from nlp_assistant.backend.connection.DeviceIndex import DeviceIndex
+
+
+def percentile(sorted_samples: list[float], fraction: float) -> float | None:
+    """Perzentil (nächster Rang) einer aufsteigend sortierten Liste, None für eine leere Liste."""
+    if not sorted_samples:
+        return None
+    return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
+
+
+class _Batch:
+    """Ein (ggf. zusammengefasster) Service-Call mit allen Handles der enthaltenen Aktionen."""
+
+    def __init__(self, sequence: int, domain: str, service: str, data: dict, deadline: float) -> None:
+        self.sequence: int = sequence
+        self.domain: str = domain
+        self.service: str = service
+        self.data: dict = data
+        self.deadline: float = deadline
+        self.entity_ids: list[str] = []
+        self.handles: list[tuple[Future, float]] = []
+        self.dependencies: list["_Batch"] = []
+        self.finished: threading.Event = threading.Event()
+
+
+class HomeAssistantDispatchQueue:
+    """
+    Hintergrund-Warteschlange für Service-Calls mit einem Pool von Worker-Threads.
+
+    submit() löst den Gerätenamen auf und gibt sofort ein Handle (concurrent.futures.Future) zurück.
+    Aktionen mit gleicher Domain, gleichem Service und gleichen Zusatzdaten, die innerhalb von
+    coalesce_window eintreffen, werden zu einem Aufruf mit einer entity_id-Liste zusammengefasst.
+    Vorübergehende Fehler (Verbindung, Timeout, HTTP 429/5xx) werden mit wachsender Wartezeit wiederholt.
+
+    Aktionen auf dasselbe Gerät werden in der Reihenfolge von submit() ausgeführt: ein Aufruf wartet,
+    bis alle früheren Aufrufe mit einem gemeinsamen Gerät abgeschlossen sind, und ein Gerät wird nie
+    zweimal in denselben Aufruf aufgenommen (z.B. zweimal toggle bleibt zweimal toggle).
+    """
+
+    def __init__(self, ha_manager: HomeAssistantRestManager, workers: int = 4, coalesce_window: float = 0.05,
+                 retries: int = 3, backoff: float = 0.2, max_backoff: float = 5.0, latency_samples: int = 1000) -> None:
+        """
+        Args:
+            ha_manager (HomeAssistantRestManager): Verbindung zu HomeAssistant.
+            workers (int): Anzahl der Worker-Threads (gleichzeitige Service-Calls).
+            coalesce_window (float): So lange (Sekunden) nach der ersten Aktion werden weitere zusammengefasst.
+            retries (int): Wiederholungen bei vorübergehenden Fehlern.
+            backoff (float): Wartezeit vor der ersten Wiederholung in Sekunden (verdoppelt sich je Versuch).
+            max_backoff (float): Obergrenze der Wartezeit in Sekunden.
+            latency_samples (int): Anzahl der letzten Latenzen für die Statistik.
+        """
+        self.ha_manager = ha_manager
+        self.coalesce_window: float = coalesce_window
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+
+        self._sequence = itertools.count()
+        self._open_batches: dict[tuple[str, str, str], _Batch] = {}
+        self._last_batch_for_entity: dict[str, _Batch] = {}
+        self._ready: queue.Queue = queue.Queue()
+        self._condition: threading.Condition = threading.Condition()
+        self._stopped: bool = False
+
+        self._stats_lock: threading.Lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=latency_samples)
+        self._counters: dict[str, int] = {"submitted": 0, "calls": 0, "coalesced": 0, "retries": 0, "failures": 0,
+                                          "pending": 0, "in_flight": 0}
+
+        self._timer: threading.Thread = threading.Thread(target=self._run_timer, name="ha-dispatch-timer", daemon=True)
+        self._timer.start()
+        self._workers: list[threading.Thread] = [
+            threading.Thread(target=self._run_worker, name=f"ha-dispatch-{number}", daemon=True)
+            for number in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    # --- Einreihen ---
+
+    def submit(self, action_data: dict, device_list: DeviceIndex | list) -> Future:
+        """
+        Reiht eine Aktion ein (Format wie bei HomeAssistantRestManager.post_action).
+
+        Returns:
+            Future: Handle, dessen Ergebnis die Antwort von HomeAssistant ist ('domain', 'service',
+            'entity_id' des gesendeten Aufrufs und 'response'); None, wenn die Aktion ungültig war.
+        """
+        handle: Future = Future()
+        prepared: tuple[str, str, dict] | None = self.ha_manager._prepare_action(action_data, device_list)
+        if prepared is None:
+            handle.set_result(None)
+            return handle
+
+        domain, service, payload = prepared
+        target_id: str | list = payload.pop("entity_id")
+        entity_ids: list[str] = list(dict.fromkeys(target_id if isinstance(target_id, list) else [target_id]))
+        key: tuple[str, str, str] = (domain, service, json.dumps(payload, sort_keys=True))
+
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Die Dispatch-Warteschlange wurde beendet.")
+
+            now: float = time.monotonic()
+            batch: _Batch | None = self._open_batches.get(key)
+
+            # Ein Gerät darf nicht zweimal in einen Aufruf und nicht vor einem späteren Aufruf ausgeführt werden
+            if batch is not None and any(
+                    entity_id in batch.entity_ids or self._last_batch_for_entity.get(entity_id, batch).sequence > batch.sequence
+                    for entity_id in entity_ids):
+                self._flush_until(batch.sequence)
+                batch = None
+
+            if batch is None:
+                batch = _Batch(next(self._sequence), domain, service, payload, deadline=now + self.coalesce_window)
+                self._open_batches[key] = batch
+                self._condition.notify()
+            else:
+                with self._stats_lock:
+                    self._counters["coalesced"] += 1
+
+            for entity_id in entity_ids:
+                previous: _Batch | None = self._last_batch_for_entity.get(entity_id)
+                if previous is not None and previous is not batch and not previous.finished.is_set() \
+                        and previous not in batch.dependencies:
+                    batch.dependencies.append(previous)
+                self._last_batch_for_entity[entity_id] = batch
+                batch.entity_ids.append(entity_id)
+            batch.handles.append((handle, now))
+
+            with self._stats_lock:
+                self._counters["submitted"] += 1
+                self._counters["pending"] += 1
+
+        return handle
+
+    def _flush_until(self, sequence: int) -> None:
+        """Gibt alle offenen Aufrufe bis einschließlich sequence in Reihenfolge frei (Aufruf mit gehaltenem Lock)."""
+        for key, batch in sorted(self._open_batches.items(), key=lambda item: item[1].sequence):
+            if batch.sequence > sequence:
+                break
+            del self._open_batches[key]
+            self._ready.put(batch)
+
+    def _run_timer(self) -> None:
+        """Gibt offene Aufrufe nach Ablauf ihres Zeitfensters an die Worker."""
+        with self._condition:
+            while not (self._stopped and not self._open_batches):
+                if not self._open_batches:
+                    self._condition.wait()
+                    continue
+
+                next_deadline: float = min(batch.deadline for batch in self._open_batches.values())
+                remaining: float = next_deadline - time.monotonic()
+                if remaining > 0 and not self._stopped:
+                    self._condition.wait(timeout=remaining)
+                    continue
+
+                if self._stopped:
+                    self._flush_until(float("inf"))
+                else:
+                    # Fristen steigen mit der Reihenfolge, alle fälligen Aufrufe sind also ein Präfix
+                    due: list[int] = [batch.sequence for batch in self._open_batches.values()
+                                      if batch.deadline <= time.monotonic()]
+                    self._flush_until(max(due))
+
+    # --- Ausführen ---
+
+    def _run_worker(self) -> None:
+        while True:
+            batch: _Batch | None = self._ready.get()
+            if batch is None:
+                return
+
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                # Ein unerwarteter Fehler darf weder den Worker beenden noch Handles ewig offen lassen
+                print(f"Fehler beim Senden von {batch.domain}.{batch.service}: {e}")
+                batch.finished.set()
+                for handle, _ in batch.handles:
+                    if not handle.done():
+                        handle.set_exception(e)
+
+    def _dispatch(self, batch: _Batch) -> None:
+        for dependency in batch.dependencies:
+            dependency.finished.wait()
+
+        with self._stats_lock:
+            self._counters["pending"] -= len(batch.handles)
+            self._counters["in_flight"] += 1
+
+        entity_id: str | list[str] = batch.entity_ids if len(batch.entity_ids) > 1 else batch.entity_ids[0]
+        payload: dict = {**batch.data, "entity_id": entity_id}
+        response: dict | list | None = None
+        failed: bool = False
+
+        if not self.ha_manager._check_connection():
+            print(f"[SIMULATION] Verbindung fehlgeschlagen. Simuliere Aktion: {batch.domain}.{batch.service} "
+                  f"auf {entity_id}")
+            response = {"success": True, "simulation": True}
+        else:
+            response, failed = self._send_with_retries(batch.domain, batch.service, payload)
+
+        finished_at: float = time.monotonic()
+        with self._stats_lock:
+            self._counters["in_flight"] -= 1
+            self._counters["calls"] += 1
+            self._counters["failures"] += int(failed)
+            self._latencies.extend(finished_at - submitted_at for _, submitted_at in batch.handles)
+
+        with self._condition:
+            batch.finished.set()
+            # Erledigte Aufrufe nicht länger als letzten Aufruf eines Geräts merken
+            for device in batch.entity_ids:
+                if self._last_batch_for_entity.get(device) is batch:
+                    del self._last_batch_for_entity[device]
+
+        result: dict = {"domain": batch.domain, "service": batch.service, "entity_id": entity_id, "response": response}
+        for handle, _ in batch.handles:
+            handle.set_result(result)
+
+    @staticmethod
+    def _is_transient(error: requests.exceptions.RequestException) -> bool:
+        """Verbindungsfehler, Timeouts sowie HTTP 429 und 5xx gelten als vorübergehend."""
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        response = getattr(error, "response", None)
+        return response is not None and (response.status_code == 429 or response.status_code >= 500)
+
+    def _send_with_retries(self, domain: str, service: str, payload: dict) -> tuple[dict | list | None, bool]:
+        """
+        Sendet den Aufruf und wiederholt ihn bei vorübergehenden Fehlern.
+
+        Returns:
+            tuple[dict | list | None, bool]: Antwort (None bei Fehlern) und ob der Aufruf endgültig fehlschlug.
+        """
+        delay: float = self.backoff
+
+        for attempt in range(self.retries + 1):
+            try:
+                return self.ha_manager._send_service(domain, service, payload), False
+            except requests.exceptions.RequestException as e:
+                if attempt == self.retries or not self._is_transient(e):
+                    print(f"Aufruf von {domain}.{service} fehlgeschlagen: {e}")
+                    return None, True
+
+                with self._stats_lock:
+                    self._counters["retries"] += 1
+                print(f"Aufruf von {domain}.{service} fehlgeschlagen: {e}. Neuer Versuch in {delay:.1f}s.")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+
+        return None, True
+
+    # --- Statistik und Beenden ---
+
+    def stats(self) -> dict:
+        """
+        Gibt Warteschlangentiefe und Latenzen zurück.
+
+        Returns:
+            dict: 'queue_depth' (noch nicht gesendete Aktionen), 'in_flight' (laufende Aufrufe), Zähler für
+            eingereihte Aktionen, gesendete Aufrufe, zusammengefasste Aktionen, Wiederholungen und Fehler
+            sowie 'latency_ms' (p50/p95/p99/max von submit() bis zur Antwort über die letzten Aktionen).
+        """
+        with self._stats_lock:
+            counters: dict[str, int] = dict(self._counters)
+            latencies: list[float] = sorted(latency * 1000 for latency in self._latencies)
+
+        return {
+            "queue_depth": counters["pending"],
+            "in_flight": counters["in_flight"],
+            "submitted": counters["submitted"],
+            "calls": counters["calls"],
+            "coalesced": counters["coalesced"],
+            "retries": counters["retries"],
+            "failures": counters["failures"],
+            "latency_ms": {"p50": percentile(latencies, 0.5), "p95": percentile(latencies, 0.95),
+                           "p99": percentile(latencies, 0.99), "max": latencies[-1] if latencies else None},
+        }
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Sendet alle offenen Aktionen sofort und beendet die Worker, sobald die Warteschlange leer ist."""
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify_all()
+
+        self._timer.join(timeout)
+        for _ in self._workers:
+            self._ready.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
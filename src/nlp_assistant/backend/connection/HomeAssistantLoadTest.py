@@ -0,0 +1,170 @@
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from nlp_assistant.backend.connection.HomeAssistantController import HomeAssistantController
+from nlp_assistant.backend.connection.HomeAssistantDispatchQueue import HomeAssistantDispatchQueue, percentile
+from nlp_assistant.backend.connection.HomeAssistantRestManager import HomeAssistantRestManager
+from nlp_assistant.backend.connection.HomeAssistantStandIn import HomeAssistantStandIn
+
+SCENARIOS: tuple[str, ...] = ("manager", "controller", "queue", "device_list")
+
+
+def run_load(operation: Callable[[int], Any], requests: int, concurrency: int,
+             is_error: Callable[[Any], bool] | None = None) -> dict:
+    """
+    Führt operation requests-mal mit concurrency parallelen Threads aus und misst jede Ausführung.
+
+    Args:
+        operation (Callable[[int], Any]): Erhält die laufende Nummer. Gibt sie ein Future zurück,
+            zählt die Zeit bis zu dessen Ergebnis.
+        requests (int): Anzahl der Ausführungen.
+        concurrency (int): Anzahl gleichzeitiger Ausführungen.
+        is_error (Callable[[Any], bool] | None): Bewertet ein Ergebnis als Fehler (Exceptions zählen immer).
+
+    Returns:
+        dict: Anzahl, Fehler, Dauer, Durchsatz und 'latency_ms' (p50/p95/p99/max).
+    """
+    latencies: list[float] = []
+    errors: int = 0
+    lock: threading.Lock = threading.Lock()
+
+    def measured(number: int) -> None:
+        nonlocal errors
+        started: float = time.perf_counter()
+        try:
+            result: Any = operation(number)
+            if isinstance(result, Future):
+                result = result.result()
+            failed: bool = is_error(result) if is_error is not None else False
+        except Exception:
+            failed = True
+        elapsed: float = time.perf_counter() - started
+
+        with lock:
+            latencies.append(elapsed)
+            errors += int(failed)
+
+    started: float = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(measured, range(requests)))
+    duration: float = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "duration_s": duration,
+        "throughput_rps": requests / duration if duration > 0 else None,
+        "latency_ms": {name: value * 1000 if value is not None else None for name, value in (
+            ("p50", percentile(latencies, 0.5)), ("p95", percentile(latencies, 0.95)),
+            ("p99", percentile(latencies, 0.99)), ("max", latencies[-1] if latencies else None))},
+    }
+
+
+def run_scenario(scenario: str, base_url: str, token: str = "token", requests: int = 500, concurrency: int = 16,
+                 seed: int = 0, **options) -> dict:
+    """
+    Misst ein Szenario gegen eine HomeAssistant Instanz (z.B. den lokalen HomeAssistantStandIn).
+
+    Args:
+        scenario (str): 'manager' (post_action des Managers), 'controller' (post_action des Controllers, synchron),
+            'queue' (Controller mit HomeAssistantDispatchQueue, gemessen bis zum Ergebnis des Handles)
+            oder 'device_list' (get_device_list).
+        base_url (str): Basis-URL der Instanz.
+        token (str): Long-Lived Access Token.
+        requests (int): Anzahl der Aufrufe.
+        concurrency (int): Anzahl gleichzeitiger Aufrufe.
+        seed (int): Startwert für die Auswahl der Geräte.
+        **options: Weitere Argumente für HomeAssistantRestManager (z.B. pool_size, stream_states).
+    """
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unbekanntes Szenario '{scenario}', erlaubt: {', '.join(SCENARIOS)}")
+
+    manager: HomeAssistantRestManager = HomeAssistantRestManager(ha_base_url=base_url, ha_bearer_token=token,
+                                                                 dummy_file_path="", **options)
+    if scenario == "device_list":
+        try:
+            return run_load(lambda _: manager.get_device_list(fallback=False), requests, concurrency)
+        finally:
+            manager.close()
+
+    dispatch_queue: HomeAssistantDispatchQueue | None = \
+        HomeAssistantDispatchQueue(manager, workers=concurrency) if scenario == "queue" else None
+    controller: HomeAssistantController = HomeAssistantController(manager, dispatch_queue=dispatch_queue)
+    devices: list[dict] = controller.device_list
+    if not devices:
+        raise ConnectionError(f"Keine Geräte von {base_url} geladen.")
+
+    generator: random.Random = random.Random(seed)
+    actions: list[dict] = [{"domain": device["type"], "service": generator.choice(["turn_on", "turn_off", "toggle"]),
+                            "name": device["name"]} for device in generator.choices(devices, k=requests)]
+
+    def is_error(result: Any) -> bool:
+        if scenario in ("controller", "manager"):
+            return result is None
+        return result is None or result.get("response") is None
+
+    if scenario == "manager":
+        operation: Callable[[int], Any] = lambda number: manager.post_action(actions[number], controller.device_index)
+    else:
+        operation = lambda number: controller.post_action(actions[number])
+
+    try:
+        report: dict = run_load(operation, requests, concurrency, is_error=is_error)
+        if dispatch_queue is not None:
+            report["dispatch"] = dispatch_queue.stats()
+        return report
+    finally:
+        controller.close()
+        manager.close()
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description="Lasttest des HomeAssistant-Clients gegen einen lokalen HomeAssistant-Ersatz.")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="manager")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--entities", type=int, default=1000, help="Anzahl der Entitäten in /api/states")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Verzögerung jeder Antwort des Servers")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil der Fehlerantworten (0-1)")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--url", default=None, help="Statt des lokalen Ersatzes eine echte Instanz verwenden")
+    parser.add_argument("--token", default="token")
+    args = parser.parse_args()
+
+    stand_in: HomeAssistantStandIn | None = None
+    base_url: str | None = args.url
+    if base_url is None:
+        stand_in = HomeAssistantStandIn(entity_count=args.entities, latency=args.latency_ms / 1000,
+                                        jitter=args.jitter_ms / 1000, error_rate=args.error_rate,
+                                        error_status=args.error_status)
+        base_url = stand_in.start()
+
+    try:
+        report: dict = run_scenario(args.scenario, base_url, token=args.token, requests=args.requests,
+                                    concurrency=args.concurrency, pool_size=args.pool_size)
+    finally:
+        if stand_in is not None:
+            stand_in.stop()
+
+    latency: dict = report["latency_ms"]
+    print(f"Szenario: {args.scenario}, {report['requests']} Aufrufe, {report['concurrency']} parallel, "
+          f"{report['errors']} Fehler")
+    print(f"Dauer: {report['duration_s']:.2f}s, Durchsatz: {report['throughput_rps']:.1f}/s")
+    print(f"Latenz: p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms, "
+          f"max {latency['max']:.1f} ms")
+    if "dispatch" in report:
+        print(f"Dispatch: {report['dispatch']['calls']} Service-Calls, {report['dispatch']['coalesced']} zusammengefasst, "
+              f"{report['dispatch']['retries']} Wiederholungen")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,137 +1,238 @@
 import json
-import requests
-
-
-class HomeAssistantRestManager():
-    supported_devices: list = ["light", "switch"]
-
-    ha_base_url: str
-    headers: dict
-    dummy_file_path: str
+import threading
+import time
 
-    def __init__(self, ha_base_url: str, ha_bearer_token: str, dummy_file_path: str = "src/nlp_assistant/data/deviceList.json"):
-        self.ha_base_url = ha_base_url
-        self.dummy_file_path = dummy_file_path
-        self.headers = {
-            "Authorization": f"Bearer {ha_bearer_token}",
-            "content-type": "application/json",
-        }
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from nlp_assistant.backend.connection.DeviceIndex import DeviceIndex
+from nlp_assistant.backend.connection.HomeAssistantApiBase import HomeAssistantApiBase
+from nlp_assistant.backend.connection.JsonArrayStream import JsonArrayStream
+
+
+class HomeAssistantRestManager(HomeAssistantApiBase):
+    session: requests.Session
+
+    def __init__(self, ha_base_url: str, ha_bearer_token: str, dummy_file_path: str = "src/nlp_assistant/data/deviceList.json",
+                 pool_size: int = 10, connect_timeout: float = 2.0, read_timeout: float = 10.0, retries: int = 2,
+                 health_ttl: float = 30.0, stream_states: bool = False, stream_chunk_size: int = 1 << 16):
+        """
+        Args:
+            ha_base_url (str): Basis-URL der HomeAssistant Instanz.
+            ha_bearer_token (str): Long-Lived Access Token.
+            dummy_file_path (str): Geräteliste, die ohne Verbindung geladen wird.
+            pool_size (int): Anzahl offener Keep-Alive Verbindungen im Pool der Session.
+            connect_timeout (float): Timeout für den Verbindungsaufbau in Sekunden.
+            read_timeout (float): Timeout für die Antwort in Sekunden.
+            retries (int): Wiederholungen bei Verbindungsfehlern (GET zusätzlich bei 502/503/504).
+            health_ttl (float): So lange (Sekunden) gilt der zuletzt beobachtete Verbindungsstatus, bevor erneut geprüft wird.
+            stream_states (bool): /api/states stückweise lesen und nur States unterstützter Domains behalten,
+                statt die ganze Antwort auf einmal zu dekodieren (für Instanzen mit sehr vielen Entitäten).
+            stream_chunk_size (int): Größe der gelesenen Stücke in Bytes beim Streaming.
+        """
+        super().__init__(ha_base_url=ha_base_url, ha_bearer_token=ha_bearer_token, dummy_file_path=dummy_file_path)
+        self.timeout: tuple[float, float] = (connect_timeout, read_timeout)
+        self.health_ttl: float = health_ttl
+        self.stream_states: bool = stream_states
+        self.stream_chunk_size: int = stream_chunk_size
+
+        # Eine Session mit Verbindungspool für alle Aufrufe (Keep-Alive statt neuem TCP/TLS-Handshake pro Aufruf).
+        # POST wird nur bei Verbindungsfehlern wiederholt (Anfrage kam nie an), da z.B. toggle nicht idempotent ist.
+        retry: Retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=0.2,
+                             status_forcelist=(502, 503, 504), allowed_methods=frozenset({"GET"}),
+                             raise_on_status=False)
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Zwischengespeicherter Verbindungsstatus (wird auch von jedem echten Aufruf aktualisiert)
+        self._healthy: bool = False
+        self._health_checked_at: float | None = None
+        self._health_lock: threading.Lock = threading.Lock()
+
+    def _set_health(self, healthy: bool) -> None:
+        with self._health_lock:
+            self._healthy = healthy
+            self._health_checked_at = time.monotonic()
 
     def _check_connection(self) -> bool:
+        """
+        Gibt den Verbindungsstatus zurück. Innerhalb von health_ttl wird der zuletzt beobachtete Status
+        verwendet, erst danach wird GET /api/ erneut aufgerufen. Schlägt ein Aufruf wegen der Verbindung fehl,
+        gilt HomeAssistant bis zum Ablauf der TTL als nicht erreichbar (Circuit Breaker).
+        """
+        with self._health_lock:
+            if self._health_checked_at is not None and time.monotonic() - self._health_checked_at < self.health_ttl:
+                return self._healthy
+
         try:
-            response = requests.get(f"{self.ha_base_url}/api/", headers=self.headers, timeout=2)
-            return response.status_code == 200
+            response = self.session.get(f"{self.ha_base_url}/api/", timeout=self.timeout)
+            healthy: bool = response.status_code == 200
         except requests.RequestException:
-            return False
+            healthy = False
+
+        self._set_health(healthy)
+        return healthy
 
-    def post_action(self, action_data: dict, device_list: list) -> dict | None:
+    def close(self) -> None:
+        """Schließt alle Verbindungen des Pools."""
+        self.session.close()
+
+    def post_action(self, action_data: dict, device_list: DeviceIndex | list) -> dict | None:
         if not self._check_connection():
             print(f"[SIMULATION] Verbindung fehlgeschlagen. Simuliere Aktion: {action_data}")
             return {"success": True, "simulation": True}
 
-        # Kopie erstellen, damit Originaldaten im BackendController nicht verändert werden
-        payload: dict = action_data.copy()
-
-        try:
-            domain: str = payload.pop("domain")
-            service: str = payload.pop("service")
-        except KeyError:
-            print("Action_data muss 'domain' und 'service' enthalten")
+        prepared: tuple[str, str, dict] | None = self._prepare_action(action_data, device_list)
+        if prepared is None:
             return None
 
-        target_name: str | None = payload.pop("name", None)
-        target_id: str | None = payload.get("entity_id", None)
-
-        if target_name and not target_id:
-            found_id: str | None = None
-            for device in device_list:
-                if device.get("name") == target_name:
-                    found_id = device.get("entity_id")
-
-            if found_id:
-                payload["entity_id"] = found_id
-                print(f"Name '{target_name}' aufgelöst zu ID '{found_id}'")
+        domain, service, payload = prepared
+        return self._call_service(domain, service, payload)
+
+    def post_actions(self, actions: list[dict], device_list: DeviceIndex | list) -> list[dict]:
+        """
+        Führt mehrere Aktionen mit möglichst wenigen Service-Calls aus.
+        Aktionen mit gleicher Domain, gleichem Service und gleichen Zusatzdaten werden zu einem Aufruf
+        mit einer entity_id-Liste zusammengefasst (ein Round-Trip pro Gruppe statt pro Gerät).
+
+        Args:
+            actions (list[dict]): Aktionen wie bei post_action ('domain', 'service' und 'name' oder 'entity_id').
+            device_list (list): Geräteliste zur Auflösung der Namen.
+
+        Returns:
+            list[dict]: Pro Gruppe 'domain', 'service', 'entity_id' (Liste) und 'response' (None bei Fehlern).
+        """
+        groups: dict[tuple[str, str, str], dict] = {}
+
+        for action in actions:
+            payload: dict = action.copy()
+            domain: str | None = payload.pop("domain", None)
+            service: str | None = payload.pop("service", None)
+            if not domain or not service:
+                print(f"Aktion ohne 'domain' oder 'service' übersprungen: {action}")
+                continue
+
+            target_name: str | None = payload.pop("name", None)
+            target_id: str | list | None = payload.pop("entity_id", None)
+            if not target_id and target_name:
+                target_id = self._resolve_entity_id(target_name, device_list)
+            if not target_id:
+                print(f"Kein Gerät für Aktion gefunden: {action}")
+                continue
+
+            # Zusatzdaten (z.B. brightness) gehören zum Gruppenschlüssel
+            key: tuple[str, str, str] = (domain, service, json.dumps(payload, sort_keys=True))
+            group: dict = groups.setdefault(key, {"domain": domain, "service": service, "data": payload, "entity_id": []})
+            for entity_id in (target_id if isinstance(target_id, list) else [target_id]):
+                if entity_id not in group["entity_id"]:
+                    group["entity_id"].append(entity_id)
+
+        if not groups:
+            return []
+
+        connected: bool = self._check_connection()
+        results: list[dict] = []
+
+        for group in groups.values():
+            if not connected:
+                print(f"[SIMULATION] Verbindung fehlgeschlagen. Simuliere Aktion: {group['domain']}.{group['service']} "
+                      f"auf {group['entity_id']}")
+                response: dict | None = {"success": True, "simulation": True}
             else:
-                print(f"Kein Gerät mit Namen '{target_name}' in der Geräteliste gefunden")
-                return None
+                response = self._call_service(group["domain"], group["service"],
+                                              {**group["data"], "entity_id": group["entity_id"]})
 
-        elif not target_id:
-            print("Action_data muss 'entity_id' oder 'name' enthalten")
-            return None
+            results.append({"domain": group["domain"], "service": group["service"],
+                            "entity_id": group["entity_id"], "response": response})
 
-        action_url: str = f"{self.ha_base_url}/api/services/{domain}/{service}"
+        return results
 
+    def _call_service(self, domain: str, service: str, payload: dict) -> dict | None:
+        """Sendet einen Service-Call an HomeAssistant und gibt die Antwort zurück (None bei Fehlern)."""
         try:
-            response: requests.Response = requests.post(action_url, headers=self.headers, json=payload)
-            response.raise_for_status()
-
-            print(f"Aktion '{domain}.{service}' auf '{payload.get('entity_id')}' erfolgreich ausgeführt")
-            return response.json()
+            return self._send_service(domain, service, payload)
 
         except requests.exceptions.HTTPError as e:
-            print(f"HTTP Fehler beim Aufruf von {action_url}: {e}")
+            # Die Meldung von raise_for_status enthält bereits die aufgerufene URL
+            print(f"HTTP Fehler beim Aufruf von {domain}.{service}: {e}")
         except requests.exceptions.RequestException as e:
             print(f"Fehler bei der Anfrage: {e}")
 
         return None
 
-    def get_device_list(self) -> list:
+    def _send_service(self, domain: str, service: str, payload: dict) -> dict:
+        """
+        Sendet einen Service-Call an HomeAssistant und gibt die Antwort zurück.
+
+        Raises:
+            requests.exceptions.RequestException: Bei Verbindungs- und HTTP-Fehlern (z.B. für Wiederholungen).
+        """
+        action_url: str = f"{self.ha_base_url}/api/services/{domain}/{service}"
+
+        try:
+            response: requests.Response = self.session.post(action_url, json=payload, timeout=self.timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self._set_health(False)
+            raise
+
+        self._set_health(True)
+        response.raise_for_status()
+
+        print(f"Aktion '{domain}.{service}' auf '{payload.get('entity_id')}' erfolgreich ausgeführt")
+        return response.json()
+
+    def get_device_list(self, fallback: bool = True) -> list:
+        """
+        Lädt die Geräteliste aus /api/services und /api/states.
+
+        Args:
+            fallback (bool): Ohne Verbindung die Dummy-Liste liefern. Mit False wird stattdessen
+                ConnectionError ausgelöst, z.B. damit keine Dummy-Liste als Snapshot gespeichert wird.
+        """
         if not self._check_connection():
+            if not fallback:
+                raise ConnectionError("HomeAssistant ist nicht erreichbar.")
             print("Verbindung zu HA fehlgeschlagen. Lade Dummy-Liste.")
-            try:
-                with open(self.dummy_file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except FileNotFoundError:
-                print(f"Dummy-Datei '{self.dummy_file_path}' nicht gefunden.")
-                return []
-            except json.JSONDecodeError:
-                print(f"Fehler beim Lesen der JSON Datei '{self.dummy_file_path}'.")
-                return []
-
-        services_response: requests.Response = requests.get(f"{self.ha_base_url}/api/services", headers=self.headers)
-        services_data: list = services_response.json()
-
-        states_response: requests.Response = requests.get(f"{self.ha_base_url}/api/states", headers=self.headers)
-        states_data: list = states_response.json()
-
-        service_map: dict = {}
-        for domain_item in services_data:
-            domain_name: str = domain_item.get("domain")
-            if domain_name in self.supported_devices:
-                service_map[domain_name] = list(domain_item.get("services"))
-
-        final_device_list: list = []
-        for entity in states_data:
-
-            entity_id: str = entity.get("entity_id")
-            domain: str = entity_id.split('.')[0]
-
-            if domain in self.supported_devices:
-                attributes: dict = entity.get("attributes", {})
-
-                device_dict: dict = {
-                    "name": attributes.get("friendly_name", entity_id),
-                    "entity_id": entity_id,
-                    "type": domain,
-                    "actions": service_map[domain],
-                    "capabilities": {}
-                }
-
-                if domain == "light":
-                    supported_modes: list = attributes.get("supported_color_modes", [])
-
-                    if any(mode in supported_modes for mode in
-                           ['brightness', 'color_temp', 'hs', 'xy', 'rgb', 'rgbw', 'rgbww']):
-                        device_dict["capabilities"]["can_set_brightness"] = True
-
-                        if 'color_temp' in supported_modes:
-                            device_dict["capabilities"]["can_set_color_temp"] = True
-                            device_dict["capabilities"]["min_temp_kelvin"] = attributes.get('min_color_temp_kelvin')
-                            device_dict["capabilities"]["max_temp_kelvin"] = attributes.get('max_color_temp_kelvin')
-
-                        if any(mode in supported_modes for mode in ['hs', 'xy', 'rgb', 'rgbw', 'rgbww']):
-                            device_dict["capabilities"]["can_set_color"] = True
-
-                final_device_list.append(device_dict)
-
-        return final_device_list
\ No newline at end of file
+            return self._load_dummy_device_list()
+
+        try:
+            services_response: requests.Response = self.session.get(f"{self.ha_base_url}/api/services", timeout=self.timeout)
+            services_response.raise_for_status()
+            services_data: list = services_response.json()
+
+            states_data: list = self._get_states_streaming() if self.stream_states else self._get_states()
+        except (requests.RequestException, ValueError) as e:
+            if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                self._set_health(False)
+            if not fallback:
+                raise ConnectionError(f"Geräteliste konnte nicht geladen werden: {e}") from e
+            print(f"Fehler beim Laden der Geräteliste: {e}. Lade Dummy-Liste.")
+            return self._load_dummy_device_list()
+
+        return self._build_device_list(services_data, states_data)
+
+    def _get_states(self) -> list:
+        """Lädt /api/states vollständig."""
+        states_response: requests.Response = self.session.get(f"{self.ha_base_url}/api/states", timeout=self.timeout)
+        states_response.raise_for_status()
+        return states_response.json()
+
+    def _get_states_streaming(self) -> list:
+        """
+        Liest /api/states stückweise und behält nur States unterstützter Domains. Der Speicherbedarf hängt
+        damit von der Anzahl relevanter Entitäten ab, nicht von der Größe der ganzen Antwort.
+        """
+        parser: JsonArrayStream = JsonArrayStream()
+        states: list = []
+
+        with self.session.get(f"{self.ha_base_url}/api/states", timeout=self.timeout, stream=True) as states_response:
+            states_response.raise_for_status()
+            for chunk in states_response.iter_content(chunk_size=self.stream_chunk_size):
+                states.extend(entity for entity in parser.feed(chunk) if self._is_supported_state(entity))
+
+        states.extend(entity for entity in parser.close() if self._is_supported_state(entity))
+        return states
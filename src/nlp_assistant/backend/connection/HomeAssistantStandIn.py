@@ -0,0 +1,218 @@
+import asyncio
+import random
+import threading
+
+from aiohttp import web
+
+_SERVICES: dict[str, list[str]] = {
+    "light": ["turn_on", "turn_off", "toggle"],
+    "switch": ["turn_on", "turn_off", "toggle"],
+    "sensor": [],
+}
+
+
+class HomeAssistantStandIn:
+    """
+    Lokaler HomeAssistant-Ersatz für Tests und Lastmessungen über den echten HTTP-Pfad.
+
+    Bedient /api/, /api/services, /api/states (mit entity_count generierten Entitäten) und
+    /api/services/{domain}/{service}. Latenz und Fehler lassen sich einstellen, auch während der Server läuft:
+    latency (+ zufälliger jitter) pro Anfrage, error_rate als Anteil zufälliger Fehlerantworten und
+    fail_next() für eine feste Anzahl Fehler. Der Server läuft mit start() in einem eigenen Thread
+    (für den synchronen HomeAssistantRestManager) oder mit start_async() in der laufenden Event-Loop.
+    """
+
+    def __init__(self, entity_count: int = 100, supported_ratio: float = 0.2, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 500, token: str | None = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 0) -> None:
+        """
+        Args:
+            entity_count (int): Anzahl der Entitäten in /api/states.
+            supported_ratio (float): Anteil der Lichter und Schalter, der Rest sind Sensoren.
+            latency (float): Verzögerung jeder Antwort in Sekunden.
+            jitter (float): Zusätzliche zufällige Verzögerung zwischen 0 und jitter Sekunden.
+            error_rate (float): Anteil der Anfragen (außer /api/), die mit error_status beantwortet werden.
+            error_status (int): HTTP-Status der eingestreuten Fehler.
+            token (str | None): Erwarteter Bearer-Token, None akzeptiert jeden.
+            host (str): Adresse, an die der Server gebunden wird.
+            port (int): Port, 0 wählt einen freien Port.
+            seed (int): Startwert für die generierten Entitäten und die Fehlerauswahl.
+        """
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.error_status: int = error_status
+        self.token: str | None = token
+        self.host: str = host
+        self.port: int = port
+
+        self.states: dict[str, dict] = self.generate_states(entity_count, supported_ratio, seed)
+        self.service_calls: list[tuple[str, str, dict]] = []
+        self.request_counts: dict[str, int] = {}
+
+        self._random: random.Random = random.Random(seed)
+        self._forced_errors: list[int] = []
+        self._runner: web.AppRunner | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    @staticmethod
+    def generate_states(entity_count: int, supported_ratio: float = 0.2, seed: int = 0) -> dict[str, dict]:
+        """Erzeugt States wie /api/states: Lichter (teils dimmbar/farbig), Schalter und Sensoren."""
+        generator: random.Random = random.Random(seed)
+        states: dict[str, dict] = {}
+
+        for number in range(entity_count):
+            if generator.random() < supported_ratio:
+                domain: str = generator.choice(["light", "switch"])
+            else:
+                domain = "sensor"
+
+            entity_id: str = f"{domain}.{domain}_{number}"
+            attributes: dict = {"friendly_name": f"{domain.capitalize()} {number}"}
+            if domain == "light":
+                attributes["supported_color_modes"] = generator.choice([["onoff"], ["brightness"], ["color_temp", "hs"]])
+                attributes["min_color_temp_kelvin"] = 2000
+                attributes["max_color_temp_kelvin"] = 6535
+            elif domain == "sensor":
+                attributes["unit_of_measurement"] = "°C"
+                attributes["device_class"] = "temperature"
+
+            states[entity_id] = {
+                "entity_id": entity_id,
+                "state": "off" if domain != "sensor" else f"{generator.uniform(15, 25):.1f}",
+                "attributes": attributes,
+                "last_changed": "2025-01-01T00:00:00+00:00",
+                "last_updated": "2025-01-01T00:00:00+00:00",
+            }
+
+        return states
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def fail_next(self, count: int = 1, status: int | None = None) -> None:
+        """Beantwortet die nächsten count Anfragen (außer /api/) mit einem Fehler."""
+        self._forced_errors.extend([status or self.error_status] * count)
+
+    # --- Anfragen ---
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        resource = request.match_info.route.resource
+        path: str = resource.canonical if resource is not None else request.path
+        self.request_counts[path] = self.request_counts.get(path, 0) + 1
+
+        if self.token is not None and request.headers.get("Authorization") != f"Bearer {self.token}":
+            return web.json_response({"message": "Unauthorized"}, status=401)
+
+        delay: float = self.latency + (self._random.uniform(0, self.jitter) if self.jitter > 0 else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if request.path != "/api/":
+            if self._forced_errors:
+                return web.json_response({"message": "Injected error"}, status=self._forced_errors.pop(0))
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                return web.json_response({"message": "Injected error"}, status=self.error_status)
+
+        return await handler(request)
+
+    async def _api(self, request: web.Request) -> web.Response:
+        return web.json_response({"message": "API running."})
+
+    async def _services(self, request: web.Request) -> web.Response:
+        return web.json_response([{"domain": domain, "services": {service: {} for service in services}}
+                                  for domain, services in _SERVICES.items()])
+
+    async def _states(self, request: web.Request) -> web.Response:
+        return web.json_response(list(self.states.values()))
+
+    async def _call_service(self, request: web.Request) -> web.Response:
+        domain: str = request.match_info["domain"]
+        service: str = request.match_info["service"]
+        payload: dict = await request.json() if request.can_read_body else {}
+        self.service_calls.append((domain, service, payload))
+
+        if service not in _SERVICES.get(domain, []):
+            return web.json_response({"message": f"Service {domain}.{service} not found."}, status=400)
+
+        entity_ids = payload.get("entity_id", [])
+        changed: list[dict] = []
+        for entity_id in entity_ids if isinstance(entity_ids, list) else [entity_ids]:
+            state: dict | None = self.states.get(entity_id)
+            if state is None:
+                continue
+            if service == "toggle":
+                state["state"] = "off" if state["state"] == "on" else "on"
+            else:
+                state["state"] = "on" if service == "turn_on" else "off"
+            changed.append(state)
+
+        return web.json_response(changed)
+
+    def _application(self) -> web.Application:
+        app: web.Application = web.Application(middlewares=[self._middleware])
+        app.add_routes([web.get("/api/", self._api),
+                        web.get("/api/services", self._services),
+                        web.get("/api/states", self._states),
+                        web.post("/api/services/{domain}/{service}", self._call_service)])
+        return app
+
+    # --- Starten und Beenden ---
+
+    async def start_async(self) -> str:
+        """Startet den Server in der laufenden Event-Loop und gibt die Basis-URL zurück."""
+        self._runner = web.AppRunner(self._application(), access_log=None)
+        await self._runner.setup()
+        site: web.TCPSite = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.base_url
+
+    async def stop_async(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start(self) -> str:
+        """Startet den Server in einem eigenen Daemon-Thread und gibt die Basis-URL zurück."""
+        self._loop = asyncio.new_event_loop()
+        started: threading.Event = threading.Event()
+        errors: list[BaseException] = []
+
+        def run() -> None:
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._loop.run_until_complete(self.start_async())
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.stop_async())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="ha-stand-in", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self.base_url
+
+    def stop(self) -> None:
+        """Beendet den mit start() gestarteten Server."""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+            self._loop = None
+
+    def __enter__(self) -> "HomeAssistantStandIn":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
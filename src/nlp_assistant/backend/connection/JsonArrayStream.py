@@ -0,0 +1,124 @@
+import codecs
+import json
+from typing import Any
+
+_WHITESPACE: str = " \t\n\r"
+
+
+class JsonArrayStream:
+    """
+    Inkrementeller Parser für ein JSON-Array (z.B. die Antwort von /api/states).
+
+    Die Antwort wird stückweise mit feed() übergeben, jedes vollständig empfangene Element wird sofort
+    zurückgegeben. Im Speicher liegen damit nur der noch nicht verarbeitete Rest der Antwort und die
+    Elemente, die der Aufrufer behält, nicht das ganze Array. Die Elemente selbst werden mit dem
+    C-Decoder von json dekodiert.
+    """
+
+    def __init__(self, compact_threshold: int = 1 << 16) -> None:
+        """
+        Args:
+            compact_threshold (int): Ab so vielen verarbeiteten Zeichen wird der Puffer gekürzt.
+        """
+        self.compact_threshold: int = compact_threshold
+        self._decoder: json.JSONDecoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer: str = ""
+        self._position: int = 0
+        self._started: bool = False
+        self._finished: bool = False
+        self._expect_value: bool = True
+        self._item_count: int = 0
+
+    def feed(self, data: bytes | str) -> list[Any]:
+        """
+        Übergibt den nächsten Teil der Antwort.
+
+        Args:
+            data (bytes | str): Nächster Teil der Antwort (Bytes werden als UTF-8 dekodiert).
+
+        Returns:
+            list[Any]: Die Elemente, die mit diesem Teil vollständig geworden sind.
+        """
+        text: str = self._text_decoder.decode(data) if isinstance(data, bytes) else data
+        if self._position >= self.compact_threshold:
+            # Bereits verarbeiteten Anfang verwerfen
+            self._buffer = self._buffer[self._position:]
+            self._position = 0
+        self._buffer += text
+        return self._drain(final=False)
+
+    def close(self) -> list[Any]:
+        """
+        Beendet die Eingabe und gibt die restlichen Elemente zurück.
+
+        Raises:
+            ValueError: Wenn die Antwort kein vollständiges JSON-Array war.
+        """
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        items: list[Any] = self._drain(final=True)
+        if not self._finished:
+            raise ValueError("Unvollständiges JSON-Array.")
+        if self._buffer[self._position:].strip(_WHITESPACE):
+            raise ValueError("Unerwartete Daten nach dem JSON-Array.")
+        return items
+
+    def _skip_whitespace(self) -> None:
+        while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+            self._position += 1
+
+    def _drain(self, final: bool) -> list[Any]:
+        """Dekodiert alle vollständig im Puffer liegenden Elemente."""
+        items: list[Any] = []
+        buffer: str = self._buffer
+
+        if not self._started:
+            self._skip_whitespace()
+            if self._position >= len(buffer):
+                return items
+            if buffer[self._position] != "[":
+                raise ValueError("Die Antwort ist kein JSON-Array.")
+            self._position += 1
+            self._started = True
+
+        while not self._finished:
+            self._skip_whitespace()
+            if self._position >= len(buffer):
+                break
+
+            character: str = buffer[self._position]
+            if character == "]":
+                if self._expect_value and self._item_count > 0:
+                    raise ValueError("Unerwartetes ']' nach ',' im JSON-Array.")
+                self._position += 1
+                self._finished = True
+                break
+            if character == ",":
+                if self._expect_value:
+                    raise ValueError("Unerwartetes ',' im JSON-Array.")
+                self._position += 1
+                self._expect_value = True
+                continue
+            if not self._expect_value:
+                raise ValueError("Fehlendes ',' im JSON-Array.")
+
+            try:
+                item, end = self._decoder.raw_decode(buffer, self._position)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError("Unvollständiges Element im JSON-Array.")
+                # Element ist noch nicht vollständig empfangen
+                break
+
+            # Zahlen können am Pufferende abgeschnitten sein (z.B. "12" von "123" oder "-1" von "-1.5"),
+            # sie gelten erst mit einem folgenden Trennzeichen als vollständig
+            if not final and not isinstance(item, (dict, list, str)) \
+                    and (end == len(buffer) or buffer[end] not in _WHITESPACE + ",]"):
+                break
+
+            items.append(item)
+            self._position = end
+            self._expect_value = False
+            self._item_count += 1
+
+        return items
@@ -0,0 +1,73 @@
+import time
+from typing import Any, Callable
+
+import spacy
+
+
+class CommandAnalysis:
+    """
+    Analyse eines einzelnen Befehls, die von allen Verarbeitungsschritten gemeinsam genutzt wird.
+
+    Jede Pipeline läuft pro Befehl höchstens einmal: die Intent-Tokens (de_core_news_sm auf dem
+    kleingeschriebenen Text), der Parse für die Geräteextraktion (Modell des DeviceMatchers) und der
+    Geräteabgleich. Die Ergebnisse werden beim ersten Zugriff berechnet und danach wiederverwendet.
+    Die Dauer jedes Schritts steht in timings (Sekunden).
+    """
+
+    def __init__(self, text: str, intentRecognizer, deviceMatcher, deviceList: list | None = None) -> None:
+        """
+        Args:
+            text (str): Der Befehl.
+            intentRecognizer: Der IntentRecognizer des Backends.
+            deviceMatcher: Der DeviceMatcher des Backends.
+            deviceList (list | None): Geräteliste für den Abgleich, None verwendet die im DeviceMatcher gesetzte Liste.
+        """
+        self.text: str = text
+        self.intentRecognizer = intentRecognizer
+        self.deviceMatcher = deviceMatcher
+        self.deviceList: list | None = deviceList
+        self.timings: dict[str, float] = {}
+        self._results: dict[str, Any] = {}
+
+    def _stage(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Berechnet einen Schritt beim ersten Aufruf und misst dessen Dauer."""
+        if name not in self._results:
+            start: float = time.perf_counter()
+            self._results[name] = compute()
+            self.timings[name] = time.perf_counter() - start
+        return self._results[name]
+
+    def intentTokens(self) -> list[str]:
+        """Tokens des Befehls für den IntentRecognizer."""
+        return self._stage("intent_tokens", lambda: self.intentRecognizer.tokenize(self.text))
+
+    def intent(self) -> tuple[str | None, float]:
+        """Erkannter Intent und dessen Score."""
+        return self._stage("intent", lambda: self.intentRecognizer.predict(self.text, tokens=self.intentTokens()))
+
+    def deviceDoc(self) -> spacy.tokens.Doc:
+        """Parse des Befehls mit dem Modell des DeviceMatchers."""
+        return self._stage("device_doc", lambda: self.deviceMatcher.parse(self.text))
+
+    def rawDeviceName(self) -> str:
+        """Aus dem Befehl extrahierter Gerätename."""
+        return self._stage("raw_device_name",
+                           lambda: self.deviceMatcher.extractDeviceNamesFromCommands(self.text, doc=self.deviceDoc()))
+
+    def device(self) -> dict | None:
+        """Bestes passendes Gerät zum extrahierten Gerätenamen."""
+        return self._stage("device", lambda: self.deviceMatcher.findBestDeviceMatch(targetDeviceName=self.rawDeviceName(),
+                                                                                   deviceList=self.deviceList))
+
+    def isGroupCommand(self) -> bool:
+        """True, wenn der Befehl mehrere Geräte adressiert ("alle Lichter ...")."""
+        return self._stage("group_command", lambda: self.deviceMatcher.isGroupCommand(self.deviceDoc()))
+
+    def locationQualifiers(self) -> list[str]:
+        """Ortsangaben des Befehls ("im Wohnzimmer" -> ["wohnzimmer"])."""
+        return self._stage("location_qualifiers", lambda: self.deviceMatcher.extractLocationQualifiers(self.deviceDoc()))
+
+    def devices(self) -> list[dict]:
+        """Alle zum extrahierten Gerätenamen passenden Geräte (für Gruppenbefehle), eingeschränkt auf die Ortsangaben."""
+        return self._stage("devices", lambda: self.deviceMatcher.findDeviceMatches(
+            self.rawDeviceName(), deviceList=self.deviceList, qualifiers=self.locationQualifiers()))
@@ -0,0 +1,104 @@
+import numpy as np
+
+
+class DeviceVectorIndex:
+    """
+    Hält die Wortvektoren aller (bereinigten) Gerätenamen als eine normalisierte Matrix.
+
+    Eine Anfrage wird mit einem einzigen Matrix-Vektor-Produkt gegen alle Geräte bewertet,
+    das Ergebnis entspricht der Cosinus-Ähnlichkeit von spaCy (Doc.similarity).
+    """
+
+    def __init__(self, devices: list[dict], names: list[str], vectors: np.ndarray) -> None:
+        """
+        Baut den Index für die übergebenen Geräte auf.
+
+        Args:
+            devices (list[dict]): Die Geräte in der Reihenfolge der Matrixzeilen.
+            names (list[str]): Die bereinigten Gerätenamen (eine Zeile pro Gerät).
+            vectors (np.ndarray): Die Wortvektoren der Gerätenamen, Form (Anzahl Geräte, Dimension).
+        """
+        if len(devices) != len(names) or len(names) != len(vectors):
+            raise ValueError("Geräte, Namen und Vektoren müssen die gleiche Länge haben.")
+
+        self.devices: list[dict] = list(devices)
+        self.names: tuple[str, ...] = tuple(names)
+
+        matrix: np.ndarray = np.asarray(vectors, dtype=np.float32)
+        norms: np.ndarray = np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        # Namen ohne Vektor (Norm 0) bleiben Nullzeilen und erreichen damit immer Ähnlichkeit 0
+        self.matrix: np.ndarray = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def similarities(self, query_vector: np.ndarray) -> np.ndarray:
+        """
+        Berechnet die Cosinus-Ähnlichkeit des Anfragevektors zu allen Geräten.
+
+        Args:
+            query_vector (np.ndarray): Der Wortvektor des gesuchten Gerätenamens.
+
+        Returns:
+            np.ndarray: Eine Ähnlichkeit pro Gerät (0 für Vektoren ohne Länge).
+        """
+        query: np.ndarray = np.asarray(query_vector, dtype=np.float32)
+        norm: float = float(np.linalg.norm(query))
+
+        if norm == 0.0 or len(self.devices) == 0:
+            return np.zeros(len(self.devices), dtype=np.float32)
+
+        return self.matrix @ (query / norm)
+
+    def top_k(self, query_vector: np.ndarray, k: int = 1) -> list[tuple[dict, float]]:
+        """
+        Gibt die k ähnlichsten Geräte zurück, das beste zuerst.
+
+        Bei gleicher Ähnlichkeit gewinnt das Gerät, das in der Geräteliste zuerst steht.
+
+        Args:
+            query_vector (np.ndarray): Der Wortvektor des gesuchten Gerätenamens.
+            k (int): Anzahl der zurückgegebenen Geräte.
+
+        Returns:
+            list[tuple[dict, float]]: Paare aus Gerät und Ähnlichkeit.
+        """
+        scores: np.ndarray = self.similarities(query_vector)
+        k = min(k, len(scores))
+
+        if k <= 0:
+            return []
+
+        if k < len(scores):
+            # Nur Kandidaten ab der k-besten Ähnlichkeit vollständig sortieren (inkl. Gleichstände)
+            kth_score: float = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            candidates: np.ndarray = np.flatnonzero(scores >= kth_score)
+        else:
+            candidates = np.arange(len(scores))
+
+        # Sortierung nach Ähnlichkeit absteigend, bei Gleichstand nach Position in der Liste
+        ranked: np.ndarray = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+
+        return [(self.devices[index], float(scores[index])) for index in ranked]
+
+    def above_threshold(self, query_vector: np.ndarray, threshold: float, k: int | None = None) -> list[tuple[dict, float]]:
+        """
+        Gibt alle Geräte mit einer Ähnlichkeit von mindestens threshold zurück, das beste zuerst.
+
+        Args:
+            query_vector (np.ndarray): Der Wortvektor des gesuchten Gerätenamens.
+            threshold (float): Mindestähnlichkeit.
+            k (int | None): Höchstens so viele Geräte zurückgeben, None für alle.
+
+        Returns:
+            list[tuple[dict, float]]: Paare aus Gerät und Ähnlichkeit.
+        """
+        scores: np.ndarray = self.similarities(query_vector)
+        candidates: np.ndarray = np.flatnonzero(scores >= threshold)
+        ranked: np.ndarray = candidates[np.lexsort((candidates, -scores[candidates]))]
+
+        if k is not None:
+            ranked = ranked[:k]
+
+        return [(self.devices[index], float(scores[index])) for index in ranked]
@@ -0,0 +1,166 @@
+from collections import Counter
+
+# Länge der Zeichen-N-Gramme für den invertierten Index
+NGRAM_SIZE: int = 3
+
+
+def _ngrams(s: str, n: int = NGRAM_SIZE) -> Counter:
+    """Zerlegt einen String in seine (mehrfach vorkommenden) Zeichen-N-Gramme."""
+    return Counter(s[i:i + n] for i in range(len(s) - n + 1))
+
+
+def similarity_ratio(distance: int, max_len: int) -> float:
+    """Normalisierte Levenshtein-Ähnlichkeit, wie sie der DeviceMatcher verwendet."""
+    return 1.0 - (distance / max_len)
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Levenshtein-Distanz (Einfügen, Löschen, Ersetzen mit Kosten 1) mit oberer Schranke.
+
+    Es wird nur das Band |i - j| <= max_distance berechnet. Sobald eine ganze Zeile die Schranke
+    überschreitet, bricht die Berechnung ab.
+
+    Args:
+        a (str): Erster String.
+        b (str): Zweiter String.
+        max_distance (int): Größte Distanz, die noch exakt berechnet werden muss.
+
+    Returns:
+        int: Die Distanz oder max_distance + 1, falls sie größer als max_distance ist.
+    """
+    if max_distance < 0:
+        return 0 if a == b else max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+
+    too_far: int = max_distance + 1
+    previous: list[int] = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+
+    for i in range(1, len(a) + 1):
+        start: int = max(1, i - max_distance)
+        end: int = min(len(b), i + max_distance)
+        current: list[int] = [too_far] * (len(b) + 1)
+        current[0] = i if i <= max_distance else too_far
+        row_min: int = current[0]
+        char_a: str = a[i - 1]
+
+        for j in range(start, end + 1):
+            cost: int = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost <= max_distance else too_far
+            if cost < row_min:
+                row_min = cost
+
+        # Früher Abbruch: keine Zelle der Zeile liegt mehr innerhalb der Schranke
+        if row_min > max_distance:
+            return too_far
+
+        previous = current
+
+    return previous[len(b)]
+
+
+class FuzzyNameIndex:
+    """
+    Invertierter Zeichen-Trigramm-Index über die (bereinigten) Gerätenamen.
+
+    Aus der Anzahl gemeinsamer Trigramme und dem Längenunterschied ergibt sich für jeden Namen eine
+    obere Schranke der Levenshtein-Ähnlichkeit. Die Namen werden in absteigender Reihenfolge dieser
+    Schranke geprüft, die Suche endet, sobald keine Schranke das bisher beste Ergebnis mehr erreichen kann.
+    Das Ergebnis ist identisch mit einem vollständigen Durchlauf über alle Namen.
+    """
+
+    def __init__(self, names: list[str]) -> None:
+        """
+        Baut den Index auf.
+
+        Args:
+            names (list[str]): Die bereinigten Gerätenamen.
+        """
+        self.names: tuple[str, ...] = tuple(names)
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+
+        for position, name in enumerate(self.names):
+            for gram, count in _ngrams(name).items():
+                self.postings.setdefault(gram, []).append((position, count))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _upper_bounds(self, query: str) -> list[float]:
+        """
+        Obere Schranke der Ähnlichkeit für jeden Namen.
+
+        Eine Edit-Operation zerstört höchstens NGRAM_SIZE Trigramme, daher gilt für die Distanz d:
+        gemeinsame Trigramme >= (max_len - NGRAM_SIZE + 1) - NGRAM_SIZE * d.
+        """
+        shared: list[int] = [0] * len(self.names)
+        for gram, query_count in _ngrams(query).items():
+            for position, count in self.postings.get(gram, ()):
+                shared[position] += min(query_count, count)
+
+        bounds: list[float] = []
+        for position, name in enumerate(self.names):
+            max_len: int = max(len(name), len(query))
+            missing: int = (max_len - NGRAM_SIZE + 1) - shared[position]
+            min_distance: int = max(abs(len(name) - len(query)), -(-missing // NGRAM_SIZE), 0)
+            bounds.append(similarity_ratio(min_distance, max_len) if max_len else 1.0)
+
+        return bounds
+
+    def best_match(self, query: str, min_ratio: float = 0.0) -> tuple[int, float] | None:
+        """
+        Findet den Namen mit der höchsten normalisierten Levenshtein-Ähnlichkeit.
+
+        Bei gleicher Ähnlichkeit gewinnt der Name, der in der Liste zuerst steht.
+
+        Args:
+            query (str): Der bereinigte, gesuchte Name.
+            min_ratio (float): Namen mit geringerer Ähnlichkeit werden nicht berücksichtigt.
+
+        Returns:
+            tuple[int, float] | None: Position und Ähnlichkeit des besten Namens oder None.
+        """
+        if not query or not self.names:
+            return None
+
+        bounds: list[float] = self._upper_bounds(query)
+        best_position: int | None = None
+        best_ratio: float = min_ratio
+
+        for position in sorted(range(len(self.names)), key=lambda p: (-bounds[p], p)):
+            if bounds[position] < best_ratio:
+                break
+            if best_position is not None and bounds[position] == best_ratio and position > best_position:
+                continue
+
+            name: str = self.names[position]
+            max_len: int = max(len(name), len(query))
+
+            # Größte Distanz, die noch mindestens die beste Ähnlichkeit erreicht
+            max_distance: int = int((1.0 - best_ratio) * max_len)
+            while max_distance < max_len and similarity_ratio(max_distance + 1, max_len) >= best_ratio:
+                max_distance += 1
+            while max_distance >= 0 and similarity_ratio(max_distance, max_len) < best_ratio:
+                max_distance -= 1
+
+            distance: int = bounded_edit_distance(name, query, max_distance)
+            if distance > max_distance:
+                continue
+
+            ratio: float = similarity_ratio(distance, max_len)
+            if best_position is None or ratio > best_ratio or position < best_position:
+                best_position, best_ratio = position, ratio
+
+        if best_position is None:
+            return None
+
+        return best_position, best_ratio
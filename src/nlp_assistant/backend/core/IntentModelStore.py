@@ -0,0 +1,336 @@
+import json
+import os
+import shutil
+from typing import Optional
+import joblib
+import numpy as np
+import scipy.sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Model artifact formats: single joblib pickle (legacy) or versioned directory of .npy files
+MODEL_FORMATS: tuple[str, ...] = ("joblib", "npy")
+NPY_FORMAT_VERSION: int = 1
+
+# Delta directory: one file of new rows per add_examples call, the examples of all saved rows in one file
+DELTA_FILE_PREFIX: str = "delta_"
+ADDED_EXAMPLES_FILE: str = "added_examples.npz"
+
+# Keys of a model dict that are not scalar values
+_MODEL_KEYS: tuple[str, ...] = ("vectorizer", "tfidf_matrix", "labels", "lemma_lookup")
+
+# Keys of the npy meta.json describing the arrays and the vectorizer (everything else is a scalar model value)
+_NPY_META_KEYS: tuple[str, ...] = ("format_version", "labels", "shape", "ngram_range", "lowercase", "use_idf",
+                                   "smooth_idf", "sublinear_tf", "norm")
+
+
+class IntentModelStore:
+    """
+    Reads and writes the artifacts of a trained intent model: the model itself (joblib or npy), its
+    metadata, and the delta directory of examples added without a full training.
+
+    A model is passed around as a dict with the keys "vectorizer", "tfidf_matrix", "labels" and
+    "lemma_lookup" plus scalar values (threshold, fingerprint, ...) that are stored as they are.
+    """
+
+    def __init__(self, model_path: str, model_format: str = "joblib", mmap_mode: Optional[str] = "r",
+                 debug: bool = False):
+        """
+        Initializes the store.
+
+        Args:
+            model_path (str): Path of the model (a ".joblib" extension is dropped for the "npy" directory).
+            model_format (str): One of MODEL_FORMATS.
+            mmap_mode (Optional[str]): numpy mmap_mode used to open the "npy" format (None loads into memory).
+            debug (bool): If True, enables print statements.
+        """
+        if model_format not in MODEL_FORMATS:
+            raise ValueError(f"Unknown model format: {model_format}")
+
+        if model_format == "npy" and model_path.endswith(".joblib"):
+            model_path = os.path.splitext(model_path)[0]
+
+        self.model_path: str = model_path
+        self.model_format: str = model_format
+        self.mmap_mode: Optional[str] = mmap_mode
+        self.debug: bool = debug
+        self.delta_path: str = f"{model_path}.delta"
+        # Fingerprint etc. of a joblib model, so startup can decide about retraining without unpickling it
+        self.meta_path: str = f"{model_path}.meta.json"
+        # joblib model unpickled by metadata (models without metadata file), reused by load
+        self._artifact_cache: Optional[dict] = None
+
+    def exists(self) -> bool:
+        """
+        True if a model (file or directory) exists at model_path.
+        """
+        return os.path.exists(self.model_path)
+
+    def metadata(self) -> dict:
+        """
+        Reads the metadata of the model on disk without loading the model itself.
+
+        A joblib model is only unpickled if its metadata file is missing or does not belong to it
+        (older models); the loaded model is then kept for load.
+
+        Returns:
+            dict: fingerprint (None for models without one), lemma_lookup (False for models trained
+                before the "lookup" mode) and spacy_model (None if unknown).
+        """
+        if self.model_format == "npy":
+            with open(os.path.join(self.model_path, "meta.json"), "r", encoding="utf-8") as meta_file:
+                meta: dict = json.load(meta_file)
+            return {"fingerprint": meta.get("fingerprint"),
+                    "lemma_lookup": os.path.exists(os.path.join(self.model_path, "lemma_lookup.npz")),
+                    "spacy_model": meta.get("spacy_model")}
+
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            if meta.get("model_file") == self._model_file_signature():
+                return {"fingerprint": meta.get("fingerprint"), "lemma_lookup": meta.get("lemma_lookup", False),
+                        "spacy_model": meta.get("spacy_model")}
+        except (OSError, ValueError):
+            pass
+
+        data: dict = joblib.load(self.model_path)
+        self._artifact_cache = data
+        return {"fingerprint": data.get("fingerprint"), "lemma_lookup": data.get("lemma_lookup") is not None,
+                "spacy_model": data.get("spacy_model")}
+
+    def _model_file_signature(self) -> list[int]:
+        """
+        Size and modification time of the joblib model, used to detect a metadata file of another model.
+        """
+        stat: os.stat_result = os.stat(self.model_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def save(self, model: dict) -> None:
+        """
+        Saves a model and removes the delta rows (they are part of the saved matrix).
+        """
+        if self.debug:
+            print(f"* Saving Model to {self.model_path}")
+
+        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+        self._artifact_cache = None
+
+        if self.model_format == "npy":
+            self._save_npy(model)
+        else:
+            joblib.dump(model, self.model_path)
+
+            meta: dict = {
+                "model_file": self._model_file_signature(),
+                "fingerprint": model.get("fingerprint"),
+                "lemma_lookup": model["lemma_lookup"] is not None,
+                "spacy_model": model.get("spacy_model")
+            }
+            with open(self.meta_path, "w", encoding="utf-8") as meta_file:
+                json.dump(meta, meta_file, indent=2)
+
+        self.clear_delta()
+
+        if self.debug:
+            print(f"--> Model Saved Successfully")
+
+    def load(self, vectorizer: TfidfVectorizer) -> dict:
+        """
+        Loads the model on disk (without the delta rows).
+
+        Args:
+            vectorizer (TfidfVectorizer): Unfitted vectorizer the "npy" format restores the vocabulary into
+                (a joblib model contains its own vectorizer).
+
+        Returns:
+            dict: The model.
+        """
+        if self.model_format == "npy":
+            return self._load_npy(vectorizer)
+
+        data: dict = self._artifact_cache if self._artifact_cache is not None else joblib.load(self.model_path)
+        self._artifact_cache = None
+        return data
+
+    def _save_npy(self, model: dict) -> None:
+        """
+        Writes the model as a directory of .npy files plus a meta.json.
+
+        The directory is written next to the target and swapped in afterwards, so processes that
+        still map the old files keep working.
+        """
+        tmp_path: str = f"{self.model_path}.tmp"
+        old_path: str = f"{self.model_path}.old"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        vectorizer: TfidfVectorizer = model["vectorizer"]
+        vocabulary: dict = vectorizer.vocabulary_
+        terms: list[str] = [""] * len(vocabulary)
+        for term, index in vocabulary.items():
+            terms[index] = term
+
+        label_names: list[str] = sorted(set(model["labels"]))
+        label_index: dict[str, int] = {label: code for code, label in enumerate(label_names)}
+        matrix = scipy.sparse.csr_matrix(model["tfidf_matrix"])
+        lemma_lookup: Optional[dict] = model["lemma_lookup"]
+
+        np.save(os.path.join(tmp_path, "vocabulary.npy"), np.array(terms, dtype=str))
+        np.save(os.path.join(tmp_path, "idf.npy"), np.asarray(vectorizer.idf_))
+        np.save(os.path.join(tmp_path, "matrix_data.npy"), matrix.data)
+        np.save(os.path.join(tmp_path, "matrix_indices.npy"), matrix.indices)
+        np.save(os.path.join(tmp_path, "matrix_indptr.npy"), matrix.indptr)
+        np.save(os.path.join(tmp_path, "label_codes.npy"),
+                np.array([label_index[label] for label in model["labels"]], dtype=np.int32))
+
+        if lemma_lookup is not None:
+            np.savez(os.path.join(tmp_path, "lemma_lookup.npz"),
+                     forms=np.array(list(lemma_lookup["lemmas"].keys()), dtype=str),
+                     lemmas=np.array(list(lemma_lookup["lemmas"].values()), dtype=str),
+                     ignored=np.array(lemma_lookup["ignored"], dtype=str))
+
+        meta: dict = {
+            "format_version": NPY_FORMAT_VERSION,
+            "labels": label_names,
+            "shape": list(matrix.shape),
+            "ngram_range": list(vectorizer.ngram_range),
+            "lowercase": vectorizer.lowercase,
+            "use_idf": vectorizer.use_idf,
+            "smooth_idf": vectorizer.smooth_idf,
+            "sublinear_tf": vectorizer.sublinear_tf,
+            "norm": vectorizer.norm,
+            **{key: value for key, value in model.items() if key not in _MODEL_KEYS}
+        }
+        with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as meta_file:
+            json.dump(meta, meta_file, ensure_ascii=False, indent=2)
+
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(self.model_path):
+            os.replace(self.model_path, old_path)
+        os.replace(tmp_path, self.model_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def _load_npy(self, vectorizer: TfidfVectorizer) -> dict:
+        """
+        Opens a model written by _save_npy, memory-mapping the arrays if mmap_mode is set.
+
+        Raises:
+            ValueError: If the artifact has an unsupported format version.
+        """
+        with open(os.path.join(self.model_path, "meta.json"), "r", encoding="utf-8") as meta_file:
+            meta: dict = json.load(meta_file)
+
+        if meta.get("format_version") != NPY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format version: {meta.get('format_version')}")
+
+        def load_array(name: str) -> np.ndarray:
+            return np.load(os.path.join(self.model_path, name), mmap_mode=self.mmap_mode, allow_pickle=False)
+
+        terms: np.ndarray = load_array("vocabulary.npy")
+        label_names: list[str] = meta["labels"]
+
+        # Vectorizer mit den gespeicherten Einstellungen und dem gelernten Vokabular wiederherstellen
+        vectorizer.set_params(ngram_range=tuple(meta["ngram_range"]), lowercase=meta["lowercase"],
+                              use_idf=meta["use_idf"], smooth_idf=meta["smooth_idf"],
+                              sublinear_tf=meta["sublinear_tf"], norm=meta["norm"])
+        vectorizer.vocabulary_ = {str(term): index for index, term in enumerate(terms)}
+        vectorizer.idf_ = load_array("idf.npy")
+
+        lemma_lookup: Optional[dict] = None
+        lookup_path: str = os.path.join(self.model_path, "lemma_lookup.npz")
+        if os.path.exists(lookup_path):
+            with np.load(lookup_path, allow_pickle=False) as lookup:
+                lemma_lookup = {
+                    "lemmas": dict(zip(lookup["forms"].tolist(), lookup["lemmas"].tolist())),
+                    "ignored": lookup["ignored"].tolist()
+                }
+
+        return {
+            "vectorizer": vectorizer,
+            "tfidf_matrix": scipy.sparse.csr_matrix(
+                (load_array("matrix_data.npy"), load_array("matrix_indices.npy"), load_array("matrix_indptr.npy")),
+                shape=tuple(meta["shape"]), copy=False
+            ),
+            "labels": [label_names[code] for code in load_array("label_codes.npy")],
+            "lemma_lookup": lemma_lookup,
+            **{key: value for key, value in meta.items() if key not in _NPY_META_KEYS}
+        }
+
+    # --- Delta ---
+
+    def save_delta(self, new_rows, sentences: list[str], labels: list[str]) -> None:
+        """
+        Writes the rows added by add_examples as a new file into the delta directory.
+        """
+        os.makedirs(self.delta_path, exist_ok=True)
+        sequence: int = len(self._delta_files())
+
+        np.savez(os.path.join(self.delta_path, f"{DELTA_FILE_PREFIX}{sequence:06d}.npz"),
+                 data=new_rows.data, indices=new_rows.indices, indptr=new_rows.indptr,
+                 shape=np.array(new_rows.shape), labels=np.array(labels, dtype=str),
+                 sentences=np.array(sentences, dtype=str))
+
+    def load_delta(self) -> tuple[list[scipy.sparse.csr_matrix], list[str]]:
+        """
+        Reads all rows stored in the delta directory (not yet part of the saved matrix).
+
+        Returns:
+            tuple: The row matrices in the order they were added and the label of every row.
+        """
+        rows: list[scipy.sparse.csr_matrix] = []
+        labels: list[str] = []
+
+        for name in self._delta_files():
+            with np.load(os.path.join(self.delta_path, name), allow_pickle=False) as delta:
+                rows.append(scipy.sparse.csr_matrix((delta["data"], delta["indices"], delta["indptr"]),
+                                                    shape=tuple(delta["shape"])))
+                labels.extend(delta["labels"].tolist())
+
+        return rows, labels
+
+    def _delta_files(self) -> list[str]:
+        """
+        Returns the names of the delta row files in the order they were written.
+        """
+        if not os.path.isdir(self.delta_path):
+            return []
+        return sorted(name for name in os.listdir(self.delta_path)
+                      if name.startswith(DELTA_FILE_PREFIX) and name.endswith(".npz"))
+
+    def stored_examples(self) -> tuple[list[str], list[str]]:
+        """
+        Returns the sentences and labels of every example added by add_examples, oldest first
+        (the ones already saved into the model as well as the pending delta rows).
+        """
+        sentences: list[str] = []
+        labels: list[str] = []
+
+        for name in [ADDED_EXAMPLES_FILE] + self._delta_files():
+            path: str = os.path.join(self.delta_path, name)
+            if not os.path.exists(path):
+                continue
+
+            with np.load(path, allow_pickle=False) as examples:
+                sentences.extend(examples["sentences"].tolist())
+                labels.extend(examples["labels"].tolist())
+
+        return sentences, labels
+
+    def clear_delta(self) -> None:
+        """
+        Removes the delta rows (after a full save they are part of the model).
+
+        Their sentences and labels are kept in one file, so every later training includes them again.
+        """
+        sentences, labels = self.stored_examples()
+
+        if not sentences:
+            shutil.rmtree(self.delta_path, ignore_errors=True)
+            return
+
+        # Write the examples before deleting the rows, an interrupted save must not lose them
+        tmp_path: str = os.path.join(self.delta_path, f"{ADDED_EXAMPLES_FILE}.tmp.npz")
+        np.savez(tmp_path, sentences=np.array(sentences, dtype=str), labels=np.array(labels, dtype=str))
+        os.replace(tmp_path, os.path.join(self.delta_path, ADDED_EXAMPLES_FILE))
+
+        for name in self._delta_files():
+            os.remove(os.path.join(self.delta_path, name))
@@ -1,40 +1,78 @@
 import csv
+import hashlib
+import json
 import os
-import joblib
+import re
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
 import numpy as np
-import spacy
+import scipy.sparse
 import sklearn.model_selection
 from typing import Iterator, Optional
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
 
-# Globaler NLP-Cache für die Tokenizer-Funktion (notwendig für joblib pickling)
-_nlp_model = None
+from nlp_assistant.backend.core.IntentModelStore import IntentModelStore
+from nlp_assistant.backend.core.IntentRecognizerConfig import IntentRecognizerConfig
+from nlp_assistant.backend.core.IntentScorer import IntentScorer
+from nlp_assistant.backend.core.IntentTokenizer import (INTENT_RELEVANT_POS, IntentTokenizer, build_lemma_lookup,
+                                                        pretokenized_vectorizer, spacy_model_version,
+                                                        tokens_from_analysis)
+# Models pickled before the tokenizer moved to IntentTokenizer reference the tokenizer functions here
+from nlp_assistant.backend.core.IntentTokenizer import _cached_spacy_tokenizer, _global_spacy_tokenizer  # noqa: F401
 
+# Regelbasierter Fallback, solange noch kein Modell geladen ist (Reihenfolge = Priorität)
+_FALLBACK_RULES: list[tuple[str, re.Pattern]] = [
+    ("toggle", re.compile(r"\b(um|umschalten|wechsle|invertiere|betätige|toggle)\b")),
+    ("turn_off", re.compile(r"\b(aus|ab|ausschalten|abschalten|deaktiviere|stopp\w*|beende|runter\w*)\b")),
+    ("turn_on", re.compile(r"\b(an|ein|einschalten|anschalten|aktiviere|starte|hoch\w*)\b")),
+]
 
-def _global_spacy_tokenizer(text: str) -> list[str]:
+# Scalar model fields stored in every artifact format: artifact key -> (attribute, default for older models)
+_SCALAR_ARTIFACT_FIELDS: dict[str, tuple[str, object]] = {
+    "threshold": ("threshold", 0.4),
+    "fingerprint": ("fingerprint", None),
+    "spacy_model": ("spacy_model_version", None),
+    "prenormalized": ("prenormalized", False),
+}
+
+# Every attribute making up the trained model, swapped as one unit when a background training finishes
+# (the tokenizer holds the lemma lookup table of the model)
+_MODEL_STATE_FIELDS: tuple[str, ...] = (
+    "vectorizer", "tfidf_matrix", "training_labels", "tokenizer", "scorer", "_examples_since_refresh", "is_trained",
+) + tuple(attribute for attribute, _ in _SCALAR_ARTIFACT_FIELDS.values())
+
+
+# Tokenisierter Korpus pro Worker-Prozess (wird einmal beim Start des Pools übergeben)
+_fold_corpus: tuple[list[list[str]], list[str], dict] | None = None
+
+
+def _init_fold_worker(token_lists: list[list[str]], labels: list[str], vectorizer_params: dict) -> None:
     """
-    Standalone tokenizer function to allow pickling of the TfidfVectorizer.
+    Stores the tokenized corpus once per worker process, so folds only receive their indices.
     """
-    global _nlp_model
-    if _nlp_model is None:
-        try:
-            _nlp_model = spacy.load("de_core_news_sm")
-        except OSError:
-            from spacy.cli import download
-            download("de_core_news_sm")
-            _nlp_model = spacy.load("de_core_news_sm")
+    global _fold_corpus
+    _fold_corpus = (token_lists, labels, vectorizer_params)
 
-    doc = _nlp_model(text)
-    tokens: list[str] = []
 
-    # Relevant POS tags for intent (verbs, adverbs, particles)
-    intent_relevant_pos = {'CCONJ', 'VERB', 'ADP', 'PROPN', 'AUX'}
+def _evaluate_fold(train_indices: list[int], test_indices: list[int]) -> float:
+    """
+    Fits a vectorizer on one cross-validation fold and returns its test accuracy.
+    """
+    token_lists, labels, vectorizer_params = _fold_corpus
+
+    vectorizer: TfidfVectorizer = pretokenized_vectorizer(vectorizer_params)
+    train_matrix = vectorizer.fit_transform([token_lists[i] for i in train_indices])
+    test_matrix = vectorizer.transform([token_lists[i] for i in test_indices])
 
-    for token in doc:
-        if token.pos_ in intent_relevant_pos:
-            tokens.append(token.lemma_.lower())
-    return tokens
+    best_indices = np.argmax(cosine_similarity(test_matrix, train_matrix), axis=1)
+    correct_predictions: int = sum(
+        1 for test_index, best_index in zip(test_indices, best_indices)
+        if labels[train_indices[best_index]] == labels[test_index]
+    )
+    return correct_predictions / len(test_indices) if len(test_indices) > 0 else 0.0
 
 
 class IntentRecognizer:
@@ -42,26 +80,35 @@ class IntentRecognizer:
     Intent recognition using TF-IDF and Cosine Similarity.
     """
 
-    def __init__(self, model_path: str = os.path.join('src', 'nlp_assistant', 'data', 'models', 'intent_model.joblib'),
-                 debug: bool = False,
-                 force_train: bool = False):
+    def __init__(self, config: Optional[IntentRecognizerConfig] = None, background_training: bool = False,
+                 **settings):
         """
         Initializes the recognizer.
 
         Args:
-            model_path (str): Path to save/load the trained model.
-            debug (bool): If True, enables print statements.
-            force_train (bool): If True, prevents loading an existing model to enforce retraining.
+            config (Optional[IntentRecognizerConfig]): The settings (tokenizer, model store, scoring and training).
+            background_training (bool): If True, a required (re)training runs in a background thread. Until it
+                is finished, predict is answered by the old model on disk or by a rule-based fallback.
+            **settings: Keyword arguments of IntentRecognizerConfig, used if no config is given.
         """
-        self.model_path: str = model_path
+        if config is None:
+            config = IntentRecognizerConfig(**settings)
+        elif settings:
+            raise ValueError("Pass either a config or settings, not both.")
+
+        self.config: IntentRecognizerConfig = config
+        self.store: IntentModelStore = config.create_store()
+        self.tokenizer: IntentTokenizer = config.create_tokenizer()
+        self.fingerprint: Optional[str] = None
+        self.spacy_model_version: Optional[str] = None
+        self.prenormalized: bool = False
+        self._examples_since_refresh: int = 0
         self.threshold: float = 0.4
-        self.debug: bool = debug
-        self.force_train: bool = force_train
 
         # --- Configure Vectorizer ---
         # Note: Uses global tokenizer function to support joblib serialization
         self.vectorizer: TfidfVectorizer = TfidfVectorizer(
-            tokenizer=_global_spacy_tokenizer,
+            tokenizer=self.tokenizer.tokenizer_function(),
             token_pattern=None,
             ngram_range=(1, 2),
             lowercase=True,
@@ -71,10 +118,267 @@ class IntentRecognizer:
 
         self.training_labels: list[str] = []
         self.tfidf_matrix = None
+        self.scorer: Optional[IntentScorer] = None
         self.is_trained: bool = False
+        self._pretokenized: Optional[TfidfVectorizer] = None
+        self._pretokenized_source: Optional[tuple] = None
+
+        # --- Readiness ---
+        self._model_lock: threading.RLock = threading.RLock()
+        self.ready_event: threading.Event = threading.Event()
+        self.training_future: Optional[Future] = None
+        self.training_duration: Optional[float] = None
+        self.training_error: Optional[BaseException] = None
 
         # Initial load attempt
-        self.load_model()
+        if background_training:
+            self.start_background_training()
+        else:
+            started: float = time.perf_counter()
+            if self.load_model():
+                self.training_duration = time.perf_counter() - started
+                self.ready_event.set()
+
+    def start_background_training(self) -> Future:
+        """
+        Loads the model, training it in a background thread if necessary.
+
+        If no training is needed, the model is loaded directly. Otherwise (or if the model fails to load) the
+        old model on disk (if readable) answers predictions, and a new model is trained in a daemon thread and
+        swapped in when done. The caller is never blocked by a training run.
+
+        Returns:
+            Future: Resolves to True once the new model is active (or to the training exception).
+        """
+        future: Future = Future()
+        self.training_future = future
+        self.training_error = None
+        self.ready_event.clear()
+
+        started: float = time.perf_counter()
+
+        if not self._needs_training():
+            # Load directly, a model that fails to load is retrained in the background like an outdated one
+            try:
+                with self._model_lock:
+                    self._load_artifact()
+                self.training_duration = time.perf_counter() - started
+                self.ready_event.set()
+                future.set_result(True)
+                return future
+            except Exception as e:
+                if self.config.debug:
+                    print(f"Error loading model: {e}")
+                    print("! Retraining in background due to load error...")
+
+        elif self.store.exists():
+            try:
+                with self._model_lock:
+                    self._load_artifact()
+                if self.config.debug:
+                    print("* Serving old model while training in background")
+            except Exception as e:
+                if self.config.debug:
+                    print(f"Error loading old model: {e}")
+
+        thread: threading.Thread = threading.Thread(target=self._train_in_background, args=(future, started),
+                                                    name="IntentRecognizerTraining", daemon=True)
+        thread.start()
+        return future
+
+    def _train_in_background(self, future: Future, started: float) -> None:
+        """
+        Trains a shadow recognizer with the same configuration and adopts its model.
+        """
+        try:
+            shadow: IntentRecognizer = IntentRecognizer(self.config)
+            if not shadow.is_trained:
+                raise RuntimeError("Background training failed.")
+
+            self._adopt_model(shadow)
+
+            self.training_duration = time.perf_counter() - started
+            self.ready_event.set()
+            future.set_result(True)
+
+            if self.config.debug:
+                print(f"--> Background Training Finished ({self.training_duration:.2f}s)")
+
+        except Exception as e:
+            self.training_error = e
+            future.set_exception(e)
+
+            if self.config.debug:
+                print(f"Background training failed: {e}")
+
+    def _adopt_model(self, other: "IntentRecognizer") -> None:
+        """
+        Takes over the trained model of another recognizer in one step (readers hold the model lock).
+        """
+        with self._model_lock:
+            for field in _MODEL_STATE_FIELDS:
+                setattr(self, field, getattr(other, field))
+
+    def _artifact_scalars(self) -> dict:
+        """
+        Returns the scalar model fields by artifact key (see _SCALAR_ARTIFACT_FIELDS).
+        """
+        return {key: getattr(self, attribute) for key, (attribute, _) in _SCALAR_ARTIFACT_FIELDS.items()}
+
+    def _set_artifact_scalars(self, values: dict) -> None:
+        """
+        Sets the scalar model fields from an artifact, using the defaults for fields older models lack.
+        """
+        for key, (attribute, default) in _SCALAR_ARTIFACT_FIELDS.items():
+            setattr(self, attribute, values.get(key, default))
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        True once the current model is loaded or trained (not serving the old model or the fallback).
+        """
+        return self.ready_event.is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until the model is ready.
+
+        Args:
+            timeout (Optional[float]): Maximum number of seconds to wait.
+
+        Returns:
+            bool: True if the model is ready.
+        """
+        return self.ready_event.wait(timeout)
+
+    def readiness(self) -> dict:
+        """
+        Returns the readiness state for callers and monitoring.
+
+        Returns:
+            dict: ready, serving ("model", "old_model" or "fallback"), training_duration and error.
+        """
+        if self.is_ready:
+            serving: str = "model"
+        elif self.is_trained:
+            serving = "old_model"
+        else:
+            serving = "fallback"
+
+        return {
+            "ready": self.is_ready,
+            "serving": serving,
+            "training_duration": self.training_duration,
+            "error": str(self.training_error) if self.training_error is not None else None
+        }
+
+    def _training_in_progress(self) -> bool:
+        return self.training_future is not None and not self.training_future.done()
+
+    def _ensure_trained(self) -> bool:
+        """
+        Makes sure a model can answer predictions.
+
+        Returns:
+            bool: True if a model is loaded, False if the rule-based fallback has to answer
+                (background training still running).
+        """
+        if self.is_trained:
+            return True
+        if self._training_in_progress():
+            return False
+        if not self.load_model():
+            raise RuntimeError("Model is not trained and no file found.")
+        return True
+
+    @staticmethod
+    def _fallback_predict(user_input: str) -> tuple[Optional[str], float]:
+        """
+        Keyword-based intent guess used while no model is available.
+
+        Returns the intent with a score of 0.0 if no rule matches, otherwise a fixed score of 0.5.
+        """
+        text: str = user_input.lower()
+
+        for intent, pattern in _FALLBACK_RULES:
+            if pattern.search(text):
+                return intent, 0.5
+        return None, 0.0
+
+    def _tokenize_batch(self, texts: list[str], batch_size: int = 256, n_process: int = 1) -> list[list[str]]:
+        """
+        Preprocesses and tokenizes many texts at once with the configured tokenizer mode.
+        """
+        preprocessor = self.vectorizer.build_preprocessor()
+        return self.tokenizer.tokenize_batch([preprocessor(text) for text in texts], batch_size=batch_size,
+                                             n_process=n_process)
+
+    def _build_scorer(self) -> None:
+        """
+        Builds the scoring index (centroids or inverted index) for the current training matrix.
+        """
+        self.scorer = IntentScorer(self.tfidf_matrix, self.training_labels, mode=self.config.scoring_mode)
+
+    @property
+    def lemma_lookup(self) -> Optional[dict]:
+        """
+        The lemma lookup table of the model (None for models trained before the "lookup" mode).
+        """
+        return self.tokenizer.lemma_lookup
+
+    @staticmethod
+    def token_cache_info() -> dict:
+        """
+        Returns the statistics of the token cache used by the "cached" tokenizer mode.
+
+        Returns:
+            dict: hits, misses, hit_rate, size and maxsize of the cache.
+        """
+        return IntentTokenizer.cache_info()
+
+    def token_cache_info() -> dict:
+        """
+        Returns the statistics of the token cache used by the "cached" tokenizer mode.
+
+        Returns:
+            dict: hits, misses, hit_rate, size and maxsize of the cache.
+        """
+        return _token_cache.info()
+
+    def _training_fingerprint(self, csv_path: str, test_size: float) -> str:
+        """
+        Hashes everything a training run depends on: the CSV content, the vectorizer and split
+        settings and the relevant POS tags.
+
+        The spaCy model version is stored next to the fingerprint instead (see _needs_training), so
+        hosts without de_core_news_sm can still match it.
+        """
+        digest = hashlib.sha256()
+
+        with open(csv_path, "rb") as training_data_file:
+            for chunk in iter(lambda: training_data_file.read(1 << 16), b""):
+                digest.update(chunk)
+
+        settings: dict = {
+            "ngram_range": list(self.vectorizer.ngram_range),
+            "lowercase": self.vectorizer.lowercase,
+            "use_idf": self.vectorizer.use_idf,
+            "smooth_idf": self.vectorizer.smooth_idf,
+            "sublinear_tf": self.vectorizer.sublinear_tf,
+            "norm": self.vectorizer.norm,
+            "test_size": test_size,
+            "compaction": [self.config.compact_matrix, self.config.prune_min_df, self.config.prune_min_weight],
+            "pos": sorted(INTENT_RELEVANT_POS)
+        }
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _analyze_corpus(self, sentences: list[str]) -> list[list[tuple[str, Optional[str]]]]:
+        """
+        Preprocesses training sentences and analyzes them (re-using the token store, see IntentTokenizer).
+        """
+        preprocessor = self.vectorizer.build_preprocessor()
+        return self.tokenizer.analyze_corpus([preprocessor(sentence) for sentence in sentences])
 
     def _load_data_from_csv(self, csv_path: str, delimiter: str = ',') -> tuple[list[str], list[str]]:
         """
@@ -112,35 +416,32 @@ class IntentRecognizer:
         """
         Saves the current model state to disk.
         """
-        if self.debug:
-            print(f"* Saving Model to {self.model_path}")
-
-        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-
-        data = {
+        self.store.save({
             "vectorizer": self.vectorizer,
             "tfidf_matrix": self.tfidf_matrix,
             "labels": self.training_labels,
-            "threshold": self.threshold
-        }
-        joblib.dump(data, self.model_path)
-
-        if self.debug:
-            print(f"--> Model Saved Successfully")
+            "lemma_lookup": self.lemma_lookup,
+            **self._artifact_scalars()
+        })
 
-    def train_and_save(self, csv_path: str = os.path.join('src', 'nlp_assistant', 'data', 'trainingData',
-                                                          'training_data.csv'), delimiter: str = ",",
-                       test_size: float = 0.2):
+    def train_and_save(self, csv_path: Optional[str] = None, delimiter: str = ",",
+                       test_size: float = 0.2, cv_folds: int = 0, n_jobs: Optional[int] = None) -> dict:
         """
         Trains the model on a split, evaluates it, and saves the result.
 
         Args:
-            csv_path (str): Path to training data.
+            csv_path (Optional[str]): Path to training data (default: training_data_path).
             delimiter (str): CSV delimiter.
             test_size (float): Percentage of data used for evaluation (0.0-1.0).
+            cv_folds (int): If > 1, additionally runs a k-fold cross-validation with this many folds.
+            n_jobs (Optional[int]): Number of worker processes for the cross-validation (default: one per fold).
+
+        Returns:
+            dict: Evaluation results (accuracy, split sizes and the per-fold accuracies if requested).
         """
+        csv_path = csv_path or self.config.training_data_path
 
-        if self.debug:
+        if self.config.debug:
             print(f"~~~~~~ Start Training With: {csv_path} ~~~~~~")
             print(f"* Loading Data")
 
@@ -149,70 +450,321 @@ class IntentRecognizer:
         if not data_tuple[0]:
             raise ValueError("CSV is empty.")
 
+        # Examples from add_examples that are not in the CSV always go into the training split
+        added_sentences, added_labels = self._added_examples(data_tuple)
+
+        if self.config.debug and added_sentences:
+            print(f"* Including {len(added_sentences)} Added Examples")
+
+        self.fingerprint = self._training_fingerprint(csv_path, test_size)
+        self.spacy_model_version = spacy_model_version()
+
+        # --- Tokenization (only sentences missing from the token store go through spaCy) ---
+        # The whole corpus is analyzed once, the split and the cross-validation index into it
+        analyses: list = self._analyze_corpus(data_tuple[0] + added_sentences)
+        added_analyses: list = analyses[len(data_tuple[0]):]
+        analyses = analyses[:len(data_tuple[0])]
+
         # --- Data Splitting ---
-        if self.debug:
+        if self.config.debug:
             print(f"* Splitting Data (Test Size: {test_size})")
 
+        indices: list[int] = list(range(len(data_tuple[0])))
+
         try:
-            result: tuple = sklearn.model_selection.train_test_split(
-                data_tuple[0],
-                data_tuple[1],
+            train_indices, test_indices = sklearn.model_selection.train_test_split(
+                indices,
                 test_size=test_size,
                 random_state=42,
                 stratify=data_tuple[1]
             )
         except ValueError:
-            result: tuple = sklearn.model_selection.train_test_split(
-                data_tuple[0],
-                data_tuple[1],
+            train_indices, test_indices = sklearn.model_selection.train_test_split(
+                indices,
                 test_size=test_size,
                 random_state=42
             )
 
-        x_train_sub: list[str] = result[0]
-        x_test_sub: list[str] = result[1]
-        y_train_sub: list[str] = result[2]
-        y_test_sub: list[str] = result[3]
+        x_train_sub: list[str] = [data_tuple[0][i] for i in train_indices]
+        x_test_sub: list[str] = [data_tuple[0][i] for i in test_indices]
+        y_train_sub: list[str] = [data_tuple[1][i] for i in train_indices]
+        y_test_sub: list[str] = [data_tuple[1][i] for i in test_indices]
+        train_analyses: list = [analyses[i] for i in train_indices]
+        test_analyses: list = [analyses[i] for i in test_indices]
+
+        x_train_sub += added_sentences
+        y_train_sub += added_labels
+        train_analyses += added_analyses
 
         # --- Training ---
-        if self.debug:
+        if self.config.debug:
             print(f"* Training Model on Training Split ({len(x_train_sub)} items)")
 
-        # Fit vectorizer only on training data
-        self.tfidf_matrix = self.vectorizer.fit_transform(x_train_sub)
+        # Fit vectorizer only on training data (on the already tokenized sentences)
+        fitted_vectorizer: TfidfVectorizer = pretokenized_vectorizer(self.vectorizer.get_params())
+        self.tfidf_matrix = fitted_vectorizer.fit_transform([tokens_from_analysis(a) for a in train_analyses])
+        self.vectorizer.vocabulary_ = fitted_vectorizer.vocabulary_
+        self.vectorizer.idf_ = fitted_vectorizer.idf_
+        self.prenormalized = False
         self.training_labels = y_train_sub
+        self._build_scorer()
         self.is_trained = True
 
+        # --- Lemma Lookup Export ---
+        if self.config.debug:
+            print(f"* Exporting Lemma Lookup Table")
+
+        self.tokenizer.set_lemma_lookup(build_lemma_lookup(train_analyses))
+
         # --- Evaluation ---
-        if self.debug:
+        if self.config.debug:
             print(f"* Evaluating on Test Split ({len(x_test_sub)} items)")
 
-        correct_predictions: int = 0
-        text: str
-        true_label: str
+        # One tokenization pass for the whole test split
+        if self.config.tokenizer_mode == "lookup":
+            test_tokens: list[list[str]] = self._tokenize_batch(x_test_sub)
+        else:
+            test_tokens: list[list[str]] = [tokens_from_analysis(a) for a in test_analyses]
+
+        accuracy: float = self._evaluate_split(test_tokens, x_test_sub, y_test_sub)
+
+        evaluation: dict = {
+            "accuracy": accuracy,
+            "train_size": len(x_train_sub),
+            "test_size": len(x_test_sub)
+        }
 
-        for text, true_label in zip(x_test_sub, y_test_sub):
-            vec = self.vectorizer.transform([text])
-            similarities = cosine_similarity(vec, self.tfidf_matrix)
+        # --- Compaction ---
+        if self.config.compact_matrix:
+            if self.config.debug:
+                print(f"* Compacting Matrix (min_df={self.config.prune_min_df}, min_weight={self.config.prune_min_weight})")
+
+            evaluation.update(self._compact(self.config.prune_min_df, self.config.prune_min_weight))
+            evaluation["accuracy_unpruned"] = accuracy
+            evaluation["accuracy"] = self._evaluate_split(test_tokens, x_test_sub, y_test_sub)
+            evaluation["accuracy_change"] = evaluation["accuracy"] - accuracy
+
+            if self.config.debug:
+                print(f"--> Features: {evaluation['features_before']} -> {evaluation['features_after']}, "
+                      f"Matrix: {evaluation['matrix_bytes_before']} -> {evaluation['matrix_bytes_after']} Bytes")
+                print(f"--> Accuracy Change By Compaction: {evaluation['accuracy_change']:+.2%}")
+
+        if self.config.debug:
+            print(f"--> Evaluation Results: {len(x_train_sub)} Train, {len(x_test_sub)} Test")
+            print(f"--> Saved Model Accuracy: {evaluation['accuracy']:.2%}")
 
-            best_index: int = int(np.argmax(similarities))
+        # --- Cross-Validation ---
+        if cv_folds > 1:
+            fold_accuracies: list[float] = self.cross_validate(data_tuple[0], data_tuple[1], folds=cv_folds,
+                                                               n_jobs=n_jobs, analyses=analyses)
+            evaluation["cv_accuracies"] = fold_accuracies
+            evaluation["cv_mean_accuracy"] = float(np.mean(fold_accuracies))
+
+        # --- Save ---
+        self._save_to_disk()
+
+        return evaluation
+
+    def _evaluate_split(self, test_tokens: list[list[str]], x_test: list[str], y_test: list[str]) -> float:
+        """
+        Scores the tokenized test split with one matrix product and returns the accuracy.
+        """
+        if not x_test:
+            return 0.0
+
+        similarities = self._similarities(self._vectorize_tokens(test_tokens))
+        best_indices = np.argmax(similarities, axis=1)
+        correct_predictions: int = 0
+
+        for row, (text, true_label) in enumerate(zip(x_test, y_test)):
+            best_index: int = int(best_indices[row])
             predicted_label: str = self.training_labels[best_index]
-            score: float = similarities[0][best_index]
+            score: float = similarities[row][best_index]
 
             if predicted_label == true_label:
                 correct_predictions += 1
             else:
-                if self.debug:
+                if self.config.debug:
                     print(f"  [MISS] '{text}' -> Pred: {predicted_label} ({score:.2f}) | True: {true_label}")
 
-        accuracy: float = correct_predictions / len(x_test_sub) if len(x_test_sub) > 0 else 0.0
+        return correct_predictions / len(x_test)
 
-        if self.debug:
-            print(f"--> Evaluation Results: {len(x_train_sub)} Train, {len(x_test_sub)} Test")
-            print(f"--> Saved Model Accuracy: {accuracy:.2%}")
+    def _similarities(self, user_matrix) -> np.ndarray:
+        """
+        Cosine similarities of the given vectors to every training row.
 
-        # --- Save ---
-        self._save_to_disk()
+        A compacted matrix already has unit-length rows, so a plain sparse dot product is enough.
+        """
+        if self.prenormalized:
+            return (user_matrix.astype(self.tfidf_matrix.dtype) @ self.tfidf_matrix.T).toarray().astype(np.float64)
+        return cosine_similarity(user_matrix, self.tfidf_matrix)
+
+    def _compact(self, min_df: int = 1, min_weight: float = 0.0) -> dict:
+        """
+        Prunes the training matrix, casts it to float32 and normalizes its rows.
+
+        Entries whose (normalized) weight is below min_weight are dropped first, then every feature that
+        occurs in fewer than min_df rows is removed from the matrix and the vocabulary.
+
+        Args:
+            min_df (int): Minimum number of training rows a feature must occur in.
+            min_weight (float): Minimum TF-IDF weight of a matrix entry (rows have unit length).
+
+        Returns:
+            dict: Number of features and matrix size in bytes before and after the compaction.
+
+        Raises:
+            ValueError: If the thresholds would remove every feature (the model is left unchanged).
+        """
+        matrix = scipy.sparse.csr_matrix(self.tfidf_matrix, dtype=np.float64, copy=True)
+        features_before: int = matrix.shape[1]
+        bytes_before: int = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+        if min_weight > 0:
+            matrix.data[matrix.data < min_weight] = 0.0
+            matrix.eliminate_zeros()
+
+        document_frequency = np.bincount(matrix.indices, minlength=features_before)
+        kept_features = np.flatnonzero(document_frequency >= max(min_df, 1))
+        if len(kept_features) == 0:
+            raise ValueError(f"Compaction with min_df={min_df} and min_weight={min_weight} removes every feature.")
+
+        matrix = normalize(matrix[:, kept_features]).astype(np.float32)
+        matrix.sort_indices()
+
+        new_index = np.full(features_before, -1, dtype=np.int64)
+        new_index[kept_features] = np.arange(len(kept_features))
+        vocabulary: dict[str, int] = {term: int(new_index[index])
+                                      for term, index in self.vectorizer.vocabulary_.items() if new_index[index] >= 0}
+        idf = np.asarray(self.vectorizer.idf_)[kept_features]
+
+        self.vectorizer.vocabulary_ = vocabulary
+        self.vectorizer.idf_ = idf
+        self.tfidf_matrix = matrix
+        self.prenormalized = True
+        self._build_scorer()
+
+        return {
+            "features_before": features_before,
+            "features_after": len(kept_features),
+            "matrix_bytes_before": bytes_before,
+            "matrix_bytes_after": matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        }
+
+    def cross_validate(self, sentences: list[str], labels: list[str], folds: int = 5,
+                       n_jobs: Optional[int] = None,
+                       analyses: Optional[list[list[tuple[str, Optional[str]]]]] = None) -> list[float]:
+        """
+        Runs a k-fold cross-validation with the current vectorizer settings.
+
+        The corpus is tokenized once and shared by all folds, which are evaluated in a process pool.
+
+        Args:
+            sentences (list[str]): All training sentences.
+            labels (list[str]): The intent label of every sentence.
+            folds (int): Number of folds.
+            n_jobs (Optional[int]): Number of worker processes (default: one per fold, at most one per CPU).
+            analyses (Optional[list]): The analysis of every sentence if already available (e.g. from
+                train_and_save), otherwise the sentences are analyzed via the token store.
+
+        Returns:
+            list[float]: The accuracy of every fold.
+        """
+        if self.config.debug:
+            print(f"* Cross-Validating ({folds} Folds)")
+
+        try:
+            splits: list = list(sklearn.model_selection.StratifiedKFold(
+                n_splits=folds, shuffle=True, random_state=42).split(sentences, labels))
+        except ValueError:
+            splits: list = list(sklearn.model_selection.KFold(
+                n_splits=folds, shuffle=True, random_state=42).split(sentences))
+
+        if analyses is None:
+            analyses = self._analyze_corpus(sentences)
+        token_lists: list[list[str]] = [tokens_from_analysis(a) for a in analyses]
+
+        workers: int = n_jobs or min(folds, os.cpu_count() or 1)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_fold_worker,
+                                 initargs=(token_lists, list(labels), self.vectorizer.get_params())) as executor:
+            fold_accuracies: list[float] = list(executor.map(
+                _evaluate_fold,
+                [train_indices.tolist() for train_indices, _ in splits],
+                [test_indices.tolist() for _, test_indices in splits]
+            ))
+
+        if self.config.debug:
+            for fold, fold_accuracy in enumerate(fold_accuracies, start=1):
+                print(f"  Fold {fold}: {fold_accuracy:.2%}")
+            print(f"--> Cross-Validation Accuracy: {np.mean(fold_accuracies):.2%}")
+
+        return fold_accuracies
+
+    def _needs_training(self) -> bool:
+        """
+        Decides whether load_model has to train instead of loading the model on disk.
+
+        A model whose fingerprint matches the current training data and settings is loaded even if
+        force_train is set. Models without a fingerprint are only retrained if force_train is set.
+        Unreadable models and, in "lookup" mode, models without a lemma lookup table are always retrained.
+        A different spaCy model version only triggers a training if both versions are known.
+        """
+        if not self.store.exists():
+            return True
+
+        try:
+            metadata: dict = self.store.metadata()
+        except Exception as e:
+            # Unreadable model -> retrain instead of failing to load it
+            if self.config.debug:
+                print(f"! Model unreadable ({e}). Triggering training...")
+            return True
+
+        if self.config.tokenizer_mode == "lookup" and not metadata["lemma_lookup"]:
+            if self.config.debug:
+                print("! Model has no lemma lookup table. Triggering training...")
+            return True
+
+        if metadata["fingerprint"] is None:
+            return self.config.force_train
+
+        try:
+            current_fingerprint: str = self._training_fingerprint(self.config.training_data_path, test_size=0.2)
+        except OSError:
+            return self.config.force_train
+
+        spacy_model: Optional[str] = spacy_model_version()
+        if spacy_model is not None and metadata["spacy_model"] not in (None, spacy_model):
+            if self.config.debug:
+                print("! spaCy model changed. Triggering training...")
+            return True
+
+        if metadata["fingerprint"] == current_fingerprint:
+            if self.config.debug and self.config.force_train:
+                print("! Training data unchanged. Skipping forced training.")
+            return False
+
+        if self.config.debug:
+            print("! Training data changed. Triggering training...")
+        return True
+
+    def _load_artifact(self) -> None:
+        """
+        Loads the model on disk (including added examples) without any training fallback.
+        """
+        data: dict = self.store.load(self.vectorizer)
+        self.vectorizer = data["vectorizer"]
+        # Tokens are identical in all modes, so the configured mode also applies to loaded models
+        self.vectorizer.set_params(tokenizer=self.tokenizer.tokenizer_function())
+        self.tfidf_matrix = data["tfidf_matrix"]
+        self.training_labels = data["labels"]
+        self.tokenizer.set_lemma_lookup(data.get("lemma_lookup"))
+        self._set_artifact_scalars(data)
+
+        self._load_delta()
+        self._build_scorer()
+        self.is_trained = True
 
     def load_model(self) -> bool:
         """
@@ -221,30 +773,25 @@ class IntentRecognizer:
         Returns:
             bool: True if model is ready (loaded or trained), False if loading/training failed.
         """
-        # Case 1: Force train or file missing -> Train
-        if self.force_train or not os.path.exists(self.model_path):
-            if self.debug and self.force_train:
+        # Case 1: File missing or training data changed -> Train
+        if self._needs_training():
+            if self.config.debug and self.config.force_train:
                 print("! Force train enabled. Triggering training...")
 
             try:
                 self.train_and_save()
                 return True  # Successfully trained
             except Exception as e:
-                if self.debug:
+                if self.config.debug:
                     print(f"Error during enforced training: {e}")
                 return False
 
         # Case 2: Load existing model
         try:
-            data = joblib.load(self.model_path)
-            self.vectorizer = data["vectorizer"]
-            self.tfidf_matrix = data["tfidf_matrix"]
-            self.training_labels = data["labels"]
-            self.threshold = data.get("threshold", 0.4)
-            self.is_trained = True
+            self._load_artifact()
             return True
         except Exception as e:
-            if self.debug:
+            if self.config.debug:
                 print(f"Error loading model: {e}")
                 print("! Attempting to retrain due to load error...")
 
@@ -253,26 +800,153 @@ class IntentRecognizer:
                 self.train_and_save()
                 return True
             except Exception as train_e:
-                if self.debug:
+                if self.config.debug:
                     print(f"Retraining failed: {train_e}")
                 return False
 
-    def predict(self, user_input: str) -> tuple[Optional[str], float]:
+    def add_examples(self, sentences: list[str], labels: list[str], csv_path: Optional[str] = None,
+                     delimiter: str = ",") -> int:
+        """
+        Adds example sentences to the trained model without a full refit.
+
+        The sentences are vectorized with the frozen vocabulary and IDF weights and appended to the
+        training matrix. Only the new rows are written to disk (as one delta file next to the model).
+        Words that are not in the vocabulary are ignored until the next full training.
+
+        Args:
+            sentences (list[str]): The new example sentences.
+            labels (list[str]): The intent of every sentence.
+            csv_path (Optional[str]): If set, the examples are also appended to this training CSV.
+                Either way they are kept next to the model and included in every later full training.
+            delimiter (str): CSV delimiter.
+
+        Returns:
+            int: Number of added examples.
+        """
+        if len(sentences) != len(labels):
+            raise ValueError("sentences and labels must have the same length.")
+
+        if not sentences:
+            return 0
+
+        if not self._ensure_trained():
+            raise RuntimeError("Model is still training in the background.")
+
+        new_rows = self._vectorize_tokens(self._tokenize_batch(sentences))
+
+        with self._model_lock:
+            new_rows = new_rows.astype(self.tfidf_matrix.dtype)
+            self.tfidf_matrix = scipy.sparse.vstack([self.tfidf_matrix, new_rows], format="csr")
+            self.training_labels = list(self.training_labels) + list(labels)
+            self._examples_since_refresh += len(sentences)
+
+            if csv_path is not None:
+                with open(csv_path, mode="a", encoding="utf-8", newline="") as training_data_file:
+                    csv.writer(training_data_file, delimiter=delimiter).writerows(zip(sentences, labels))
+
+            if 0 < self.config.idf_refresh_interval <= self._examples_since_refresh:
+                # Vollständiges Speichern ersetzt alle Deltas
+                self.refresh_idf()
+            else:
+                self.store.save_delta(new_rows, sentences, labels)
+                self._build_scorer()
+
+        if self.config.debug:
+            print(f"--> Added {len(sentences)} Examples ({self.tfidf_matrix.shape[0]} Rows)")
+
+        return len(sentences)
+
+    def refresh_idf(self) -> None:
+        """
+        Recomputes the IDF weights from all rows (including added examples) and saves the full model.
+
+        The rows are rescaled instead of re-tokenized: dividing by the old IDF, multiplying with the new
+        IDF and re-normalizing gives the same vectors as a refit with the frozen vocabulary.
+        """
+        matrix = scipy.sparse.csr_matrix(self.tfidf_matrix, dtype=np.float64, copy=True)
+        n_documents: int = matrix.shape[0]
+        document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+
+        if self.vectorizer.smooth_idf:
+            new_idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1.0
+        else:
+            new_idf = np.log(n_documents / np.maximum(document_frequency, 1)) + 1.0
+
+        old_idf = np.asarray(self.vectorizer.idf_)
+        matrix.data = matrix.data / old_idf[matrix.indices] * new_idf[matrix.indices]
+        if self.vectorizer.norm is not None:
+            matrix = normalize(matrix, norm=self.vectorizer.norm, copy=False)
+
+        self.vectorizer.idf_ = new_idf
+        self.tfidf_matrix = matrix.astype(self.tfidf_matrix.dtype)
+        self._examples_since_refresh = 0
+        self._build_scorer()
+        self._save_to_disk()
+
+    def _load_delta(self) -> None:
+        """
+        Appends all rows stored in the delta directory to the loaded model.
+        """
+        rows, labels = self.store.load_delta()
+
+        if rows:
+            self.tfidf_matrix = scipy.sparse.vstack([self.tfidf_matrix] + rows, format="csr")
+            self.training_labels = list(self.training_labels) + labels
+            self._examples_since_refresh = len(labels)
+
+    def _added_examples(self, data_tuple: tuple[list[str], list[str]]) -> tuple[list[str], list[str]]:
+        """
+        Returns the added examples that are missing from the given training data (without duplicates).
+        """
+        known: set[tuple[str, str]] = set(zip(*data_tuple))
+        sentences: list[str] = []
+        labels: list[str] = []
+
+        for sentence, label in zip(*self.store.stored_examples()):
+            if (sentence, label) not in known:
+                known.add((sentence, label))
+                sentences.append(sentence)
+                labels.append(label)
+
+        return sentences, labels
+
+    def tokenize(self, user_input: str) -> list[str]:
+        """
+        Returns the tokens predict uses for a given input string (one tokenizer pass).
+
+        The result can be passed to predict(tokens=...) so a caller that needs the tokens as well
+        does not analyze the same command twice.
+        """
+        with self._model_lock:
+            return self._tokenize_batch([user_input])[0]
+
+    def predict(self, user_input: str, tokens: Optional[list[str]] = None) -> tuple[Optional[str], float]:
         """
         Predicts the intent for a given input string.
 
         Args:
             user_input (str): The user's command.
+            tokens (Optional[list[str]]): Tokens of user_input from tokenize; skips the tokenizer if given.
 
         Returns:
             tuple[Optional[str], float]: The predicted intent (or None) and the confidence score.
         """
-        if not self.is_trained:
-            if not self.load_model():
-                raise RuntimeError("Model is not trained and no file found.")
+        if not self._ensure_trained():
+            return self._fallback_predict(user_input)
 
-        user_vec = self.vectorizer.transform([user_input])
-        similarities = cosine_similarity(user_vec, self.tfidf_matrix)
+        with self._model_lock:
+            if tokens is not None:
+                user_vec = self._vectorize_tokens([tokens])
+            elif self.config.tokenizer_mode == "lookup":
+                user_vec = self._vectorize_tokens(self._tokenize_batch([user_input]))
+            else:
+                user_vec = self.vectorizer.transform([user_input])
+
+            if self.config.scoring_mode != "full_scan":
+                return self._apply_threshold(self.scorer.top_k(user_vec, k=1)[0])
+
+            similarities = self._similarities(user_vec)
+            training_labels: list[str] = self.training_labels
 
         best_index: int = int(np.argmax(similarities))
         best_score: float = similarities[0][best_index]
@@ -280,7 +954,117 @@ class IntentRecognizer:
         if best_score < self.threshold:
             return None, best_score
 
-        return self.training_labels[best_index], best_score
+        return training_labels[best_index], best_score
+
+    def predict_top_k(self, user_input: str, k: int = 3) -> list[tuple[str, float]]:
+        """
+        Returns the k most similar intents for a given input string, best first.
+
+        Args:
+            user_input (str): The user's command.
+            k (int): Maximum number of intents.
+
+        Returns:
+            list[tuple[str, float]]: (intent, score) pairs, not filtered by the threshold.
+        """
+        if not self._ensure_trained():
+            intent, score = self._fallback_predict(user_input)
+            return [(intent, score)] if intent is not None else []
+
+        with self._model_lock:
+            return self.scorer.top_k(self._vectorize_tokens(self._tokenize_batch([user_input])), k=k)[0]
+
+    def _apply_threshold(self, ranking: list[tuple[str, float]]) -> tuple[Optional[str], float]:
+        """
+        Turns a top-k ranking into the (intent, score) result of predict.
+        """
+        if not ranking:
+            return None, 0.0
+
+        intent, best_score = ranking[0]
+        if best_score < self.threshold:
+            return None, best_score
+        return intent, best_score
+
+    def _vectorize_tokens(self, token_lists: list[list[str]]) -> scipy.sparse.csr_matrix:
+        """
+        Turns already tokenized texts into TF-IDF vectors using the fitted vocabulary.
+
+        Produces the same matrix as vectorizer.transform, without calling the tokenizer again.
+
+        Args:
+            token_lists (list[list[str]]): One token list per text.
+
+        Returns:
+            scipy.sparse.csr_matrix: The TF-IDF matrix (one row per text).
+        """
+        return self._token_vectorizer().transform(token_lists)
+
+    def _token_vectorizer(self) -> TfidfVectorizer:
+        """
+        Returns a vectorizer for token lists that shares the vocabulary and IDF weights of the fitted one.
+
+        It is rebuilt whenever training, compaction or refresh_idf replace the vocabulary or the IDF weights.
+        """
+        vocabulary: dict = self.vectorizer.vocabulary_
+        idf: np.ndarray = self.vectorizer.idf_
+
+        source: Optional[tuple] = self._pretokenized_source
+        if source is None or source[0] is not vocabulary or source[1] is not idf:
+            vectorizer: TfidfVectorizer = pretokenized_vectorizer(self.vectorizer.get_params())
+            vectorizer.vocabulary_ = vocabulary
+            vectorizer.idf_ = idf
+            self._pretokenized = vectorizer
+            self._pretokenized_source = (vocabulary, idf)
+        return self._pretokenized
+
+    def predict_batch(self, user_inputs: list[str], batch_size: int = 256,
+                      n_process: int = 1) -> list[tuple[Optional[str], float]]:
+        """
+        Predicts the intents for many input strings at once.
+
+        All inputs are tokenized in one nlp.pipe pass and scored chunk-wise against the
+        training matrix, which is much faster than calling predict in a loop.
+
+        Args:
+            user_inputs (list[str]): The user commands.
+            batch_size (int): Number of inputs tokenized and scored per chunk.
+            n_process (int): Number of processes spaCy uses for tokenization.
+
+        Returns:
+            list[tuple[Optional[str], float]]: One (intent, score) tuple per input, same as predict.
+        """
+        if not user_inputs:
+            return []
+
+        if not self._ensure_trained():
+            return [self._fallback_predict(user_input) for user_input in user_inputs]
+
+        with self._model_lock:
+            token_lists: list[list[str]] = self._tokenize_batch(user_inputs, batch_size=batch_size,
+                                                                n_process=n_process)
+
+            results: list[tuple[Optional[str], float]] = []
+
+            for start in range(0, len(token_lists), batch_size):
+                user_matrix = self._vectorize_tokens(token_lists[start: start + batch_size])
+
+                if self.config.scoring_mode != "full_scan":
+                    results.extend(self._apply_threshold(ranking) for ranking in self.scorer.top_k(user_matrix, k=1))
+                    continue
+
+                similarities = self._similarities(user_matrix)
+                best_indices = np.argmax(similarities, axis=1)
+
+                for row, best_index in enumerate(best_indices):
+                    best_score: float = similarities[row][best_index]
+
+                    if best_score < self.threshold:
+                        results.append((None, best_score))
+                    else:
+                        results.append((self.training_labels[best_index], best_score))
+
+        return results
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+import hashlib
+import os
+from typing import Optional
+
+from nlp_assistant.backend.core.cacheDirectory import cache_dir
+from nlp_assistant.backend.core.IntentModelStore import MODEL_FORMATS, IntentModelStore
+from nlp_assistant.backend.core.IntentScorer import SCORING_MODES
+from nlp_assistant.backend.core.IntentTokenizer import TOKENIZER_MODES, IntentTokenizer
+
+DEFAULT_MODEL_PATH: str = os.path.join('src', 'nlp_assistant', 'data', 'models', 'intent_model.joblib')
+DEFAULT_TRAINING_DATA_PATH: str = os.path.join('src', 'nlp_assistant', 'data', 'trainingData', 'training_data.csv')
+
+
+def _default_token_store_path(model_path: str) -> str:
+    """
+    Returns the token store of a model in the cache directory (one file per model path).
+    """
+    model_key: str = hashlib.sha1(os.path.abspath(model_path).encode("utf-8")).hexdigest()[:12]
+    return cache_dir("token_store", f"{os.path.basename(model_path)}-{model_key}.tokens.json")
+
+
+class IntentRecognizerConfig:
+    """
+    Settings of an IntentRecognizer, grouped by the component that uses them.
+
+    The same config creates the tokenizer and the model store of every recognizer built from it
+    (e.g. the shadow recognizer of a background training).
+    """
+
+    def __init__(self, model_path: str = DEFAULT_MODEL_PATH,
+                 debug: bool = False,
+                 force_train: bool = False,
+                 # --- Tokenizer ---
+                 tokenizer_mode: str = "spacy",
+                 token_cache_size: int = 4096,
+                 spacy_fallback: bool = True,
+                 token_store_path: Optional[str] = "",
+                 # --- Model store ---
+                 model_format: str = "joblib",
+                 mmap_mode: Optional[str] = "r",
+                 # --- Scoring and training ---
+                 scoring_mode: str = "full_scan",
+                 idf_refresh_interval: int = 0,
+                 training_data_path: str = DEFAULT_TRAINING_DATA_PATH,
+                 compact_matrix: bool = False,
+                 prune_min_df: int = 1,
+                 prune_min_weight: float = 0.0):
+        """
+        Initializes the config.
+
+        Args:
+            model_path (str): Path to save/load the trained model.
+            debug (bool): If True, enables print statements.
+            force_train (bool): If True, prevents loading an existing model to enforce retraining.
+            tokenizer_mode (str): "spacy" runs the full spaCy pipeline on every call, "cached" uses a
+                pipeline without parser/NER and an LRU cache of token lists, "lookup" uses the lemma
+                lookup table exported by train_and_save and a regex splitter.
+            token_cache_size (int): Maximum number of cached token lists (shared by the whole process).
+            spacy_fallback (bool): In "lookup" mode, tokenize unknown words with spaCy (word by word).
+                If False, unknown words are dropped and spaCy is never imported for inference.
+            token_store_path (Optional[str]): JSON file caching the spaCy analysis of every training sentence
+                across trainings ("" = per model in the cache directory, see cacheDirectory; None = disabled).
+            model_format (str): "joblib" stores one pickle, "npy" stores a versioned directory of .npy files
+                that can be memory-mapped (a ".joblib" extension of model_path is dropped for the directory).
+            mmap_mode (Optional[str]): numpy mmap_mode used to open the "npy" format (None loads into memory).
+            scoring_mode (str): "full_scan" compares with every training row (reference), "centroid" with one
+                centroid per intent, "inverted_index" only with rows sharing a feature with the input.
+            idf_refresh_interval (int): If > 0, add_examples recomputes the IDF weights (and saves the full
+                model) after this many added examples.
+            training_data_path (str): Training CSV used when load_model has to (re)train.
+            compact_matrix (bool): If True, training stores the matrix as float32 with unit-length rows (scored
+                with a plain dot product) and prunes it with prune_min_df and prune_min_weight.
+            prune_min_df (int): Features occurring in fewer training rows are dropped by the compaction.
+            prune_min_weight (float): Matrix entries with a smaller weight are dropped by the compaction.
+        """
+        if tokenizer_mode not in TOKENIZER_MODES:
+            raise ValueError(f"Unknown tokenizer mode: {tokenizer_mode}")
+        if model_format not in MODEL_FORMATS:
+            raise ValueError(f"Unknown model format: {model_format}")
+        if scoring_mode not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {scoring_mode}")
+
+        if model_format == "npy" and model_path.endswith(".joblib"):
+            model_path = os.path.splitext(model_path)[0]
+
+        self.model_path: str = model_path
+        self.debug: bool = debug
+        self.force_train: bool = force_train
+
+        self.tokenizer_mode: str = tokenizer_mode
+        self.token_cache_size: int = token_cache_size
+        self.spacy_fallback: bool = spacy_fallback
+        self.token_store_path: Optional[str] = _default_token_store_path(model_path) if token_store_path == "" \
+            else token_store_path
+
+        self.model_format: str = model_format
+        self.mmap_mode: Optional[str] = mmap_mode
+
+        self.scoring_mode: str = scoring_mode
+        self.idf_refresh_interval: int = idf_refresh_interval
+        self.training_data_path: str = training_data_path
+        self.compact_matrix: bool = compact_matrix
+        self.prune_min_df: int = prune_min_df
+        self.prune_min_weight: float = prune_min_weight
+
+    def create_tokenizer(self) -> IntentTokenizer:
+        """
+        Creates a tokenizer (without lemma lookup table) with the tokenizer settings.
+        """
+        return IntentTokenizer(mode=self.tokenizer_mode, cache_size=self.token_cache_size,
+                               spacy_fallback=self.spacy_fallback, token_store_path=self.token_store_path,
+                               debug=self.debug)
+
+    def create_store(self) -> IntentModelStore:
+        """
+        Creates the model store with the model store settings.
+        """
+        return IntentModelStore(self.model_path, model_format=self.model_format, mmap_mode=self.mmap_mode,
+                                debug=self.debug)
@@ -0,0 +1,126 @@
+import numpy as np
+import scipy.sparse
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+# Scoring modes: compare with every training row (reference), with one centroid per intent,
+# or only with the rows sharing at least one feature with the query (inverted index)
+SCORING_MODES: tuple[str, ...] = ("full_scan", "centroid", "inverted_index")
+
+
+class IntentScorer:
+    """
+    Scores TF-IDF query vectors against the training data and returns the top-k intents.
+
+    The score of an intent is the highest cosine similarity of any of its training rows
+    ("full_scan", "inverted_index") or the cosine similarity to its centroid ("centroid").
+    """
+
+    def __init__(self, tfidf_matrix, labels: list[str], mode: str = "full_scan"):
+        """
+        Builds the index structures for the given training matrix.
+
+        Args:
+            tfidf_matrix: The TF-IDF matrix of the training sentences (one row per sentence).
+            labels (list[str]): The intent label of every row.
+            mode (str): One of SCORING_MODES.
+        """
+        if mode not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {mode}")
+
+        self.mode: str = mode
+        self.intents: list[str] = sorted(set(labels))
+
+        intent_index: dict[str, int] = {intent: code for code, intent in enumerate(self.intents)}
+        self.label_codes: np.ndarray = np.array([intent_index[label] for label in labels], dtype=np.int32)
+
+        if mode == "full_scan":
+            self.tfidf_matrix = tfidf_matrix
+            self.intent_rows: list[np.ndarray] = [np.flatnonzero(self.label_codes == code)
+                                                  for code in range(len(self.intents))]
+
+        elif mode == "centroid":
+            # Mittelwert der normalisierten Zeilen pro Intent, wieder auf Länge 1 normalisiert
+            membership = scipy.sparse.csr_matrix(
+                (np.ones(len(labels)), (self.label_codes, np.arange(len(labels)))),
+                shape=(len(self.intents), len(labels))
+            )
+            self.centroids = normalize(membership @ normalize(tfidf_matrix))
+
+        else:
+            # Posting-Listen: Feature -> (Trainingszeile, Gewicht)
+            self.postings: scipy.sparse.csr_matrix = scipy.sparse.csr_matrix(normalize(tfidf_matrix).T)
+
+    def top_k(self, query_matrix, k: int = 1) -> list[list[tuple[str, float]]]:
+        """
+        Returns the k best intents for every query row, best first.
+
+        Ties are resolved in favour of the intent whose best row comes first, like an argmax over all rows.
+        In "inverted_index" mode, intents that share no feature with the query (score 0) are omitted.
+
+        Args:
+            query_matrix: TF-IDF vectors of the queries (one row per query).
+            k (int): Maximum number of intents per query.
+
+        Returns:
+            list[list[tuple[str, float]]]: (intent, score) pairs for every query.
+        """
+        if self.mode == "full_scan":
+            return self._top_k_full_scan(query_matrix, k)
+        if self.mode == "centroid":
+            return self._top_k_centroid(query_matrix, k)
+        return self._top_k_inverted_index(query_matrix, k)
+
+    def _top_k_full_scan(self, query_matrix, k: int) -> list[list[tuple[str, float]]]:
+        similarities = cosine_similarity(query_matrix, self.tfidf_matrix)
+        row_range = np.arange(similarities.shape[0])
+
+        scores = np.zeros((similarities.shape[0], len(self.intents)))
+        best_rows = np.zeros((similarities.shape[0], len(self.intents)), dtype=np.int64)
+
+        for code, rows in enumerate(self.intent_rows):
+            intent_similarities = similarities[:, rows]
+            best = np.argmax(intent_similarities, axis=1)
+            scores[:, code] = intent_similarities[row_range, best]
+            best_rows[:, code] = rows[best]
+
+        results: list[list[tuple[str, float]]] = []
+        for scores_row, best_rows_row in zip(scores, best_rows):
+            order = np.lexsort((best_rows_row, -scores_row))[:k]
+            results.append([(self.intents[code], scores_row[code]) for code in order])
+        return results
+
+    def _top_k_centroid(self, query_matrix, k: int) -> list[list[tuple[str, float]]]:
+        similarities = cosine_similarity(query_matrix, self.centroids)
+
+        results: list[list[tuple[str, float]]] = []
+        for scores_row in similarities:
+            order = np.lexsort((np.arange(len(self.intents)), -scores_row))[:k]
+            results.append([(self.intents[code], scores_row[code]) for code in order])
+        return results
+
+    def _top_k_inverted_index(self, query_matrix, k: int) -> list[list[tuple[str, float]]]:
+        query_matrix = normalize(scipy.sparse.csr_matrix(query_matrix))
+
+        results: list[list[tuple[str, float]]] = []
+        for row in range(query_matrix.shape[0]):
+            start, end = query_matrix.indptr[row], query_matrix.indptr[row + 1]
+            features = query_matrix.indices[start:end]
+
+            if len(features) == 0:
+                results.append([])
+                continue
+
+            # Nur die Posting-Listen der Query-Features werden angefasst
+            weights = scipy.sparse.csr_matrix(query_matrix.data[start:end][np.newaxis, :])
+            row_scores = (weights @ self.postings[features]).tocsr()
+            touched_rows, scores = row_scores.indices, row_scores.data
+
+            # Beste Zeile pro Intent (bei Gleichstand die erste Zeile)
+            codes = self.label_codes[touched_rows]
+            order = np.lexsort((touched_rows, -scores, codes))
+            first_per_intent = order[np.r_[True, codes[order][1:] != codes[order][:-1]]]
+
+            ranked = first_per_intent[np.lexsort((touched_rows[first_per_intent], -scores[first_per_intent]))][:k]
+            results.append([(self.intents[codes[i]], scores[i]) for i in ranked if scores[i] > 0])
+        return results
@@ -0,0 +1,377 @@
+import hashlib
+import importlib.metadata
+import json
+import os
+import re
+import warnings
+from collections import Counter
+from typing import Optional
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from nlp_assistant.backend.core.LRUCache import LRUCache
+from nlp_assistant.backend.core.SpacyModelRegistry import spacy_models
+
+# Globaler NLP-Cache für die Tokenizer-Funktion (notwendig für joblib pickling)
+_nlp_model = None
+
+# Relevant POS tags for intent (verbs, adverbs, particles)
+INTENT_RELEVANT_POS: set[str] = {'CCONJ', 'VERB', 'ADP', 'PROPN', 'AUX'}
+
+# Komponenten, die für POS-Tags und Lemmata nicht benötigt werden (pro Aufruf deaktiviert, nicht ausgeschlossen,
+# damit alle Komponenten dieselbe geladene Instanz von de_core_news_sm teilen)
+_TRIMMED_DISABLE: list[str] = ["parser", "ner", "senter"]
+
+# Tokenizer modes: full pipeline (legacy), pipeline without parser/NER with LRU cache, or lemma lookup table
+TOKENIZER_MODES: tuple[str, ...] = ("spacy", "cached", "lookup")
+
+# Wort- und Satzzeichen-Splitter für den Lookup-Modus (Bindestrich-Komposita bleiben wie bei spaCy ein Token)
+_WORD_SPLIT_PATTERN: re.Pattern = re.compile(r"\w+(?:-\w+)*|[^\w\s]")
+
+# Prozessweiter LRU-Cache: normalisierter Text -> Token-Tupel
+_token_cache: LRUCache = LRUCache(maxsize=4096)
+
+
+def _load_spacy_model():
+    """
+    Returns the shared de_core_news_sm instance from the process-wide model registry.
+
+    spaCy is only imported by the registry on first load, so the "lookup" tokenizer mode never needs it.
+    """
+    return spacy_models.get("de_core_news_sm")
+
+
+def _get_nlp_model():
+    """
+    Loads the spaCy model used by the tokenizer on first use.
+    """
+    global _nlp_model
+    if _nlp_model is None:
+        _nlp_model = _load_spacy_model()
+    return _nlp_model
+
+
+def _normalize_text(text: str) -> str:
+    """
+    Normalizes a text to the key used by the token cache (lowercase, collapsed whitespace).
+    """
+    return " ".join(text.lower().split())
+
+
+def _tokens_from_doc(doc) -> list[str]:
+    """
+    Keeps the lowercased lemmas of all intent relevant tokens of a parsed Doc.
+    """
+    tokens: list[str] = []
+
+    for token in doc:
+        if token.pos_ in INTENT_RELEVANT_POS:
+            tokens.append(token.lemma_.lower())
+    return tokens
+
+
+def _global_spacy_tokenizer(text: str) -> list[str]:
+    """
+    Standalone tokenizer function to allow pickling of the TfidfVectorizer.
+    """
+    return _tokens_from_doc(_get_nlp_model()(text))
+
+
+def _cached_spacy_tokenizer(text: str) -> list[str]:
+    """
+    Tokenizer skipping parser and NER, backed by the process-wide LRU cache (picklable as well).
+    """
+    key: str = _normalize_text(text)
+    tokens: tuple[str, ...] | None = _token_cache.get(key)
+
+    if tokens is None:
+        tokens = tuple(_tokens_from_doc(_get_nlp_model()(key, disable=_TRIMMED_DISABLE)))
+        _token_cache.put(key, tokens)
+    return list(tokens)
+
+
+def _spacy_tokenize_batch(texts: list[str], batch_size: int = 256, n_process: int = 1,
+                          use_cache: bool = False) -> list[list[str]]:
+    """
+    Tokenizes many texts in a single nlp.pipe pass.
+
+    Args:
+        texts (list[str]): Already preprocessed (lowercased) texts.
+        batch_size (int): Number of texts spaCy processes per batch.
+        n_process (int): Number of worker processes used by spaCy.
+        use_cache (bool): If True, skips parser and NER and only pipes texts missing from the token cache.
+
+    Returns:
+        list[list[str]]: The token list for every text, in input order.
+    """
+    if not use_cache:
+        nlp = _get_nlp_model()
+        return [_tokens_from_doc(doc) for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process)]
+
+    keys: list[str] = [_normalize_text(text) for text in texts]
+    results: dict[str, tuple[str, ...]] = {}
+
+    for key in keys:
+        if key not in results:
+            tokens: tuple[str, ...] | None = _token_cache.get(key)
+            if tokens is not None:
+                results[key] = tokens
+
+    missing_keys: list[str] = [key for key in dict.fromkeys(keys) if key not in results]
+
+    if missing_keys:
+        nlp = _get_nlp_model()
+        for key, doc in zip(missing_keys, nlp.pipe(missing_keys, batch_size=batch_size, n_process=n_process,
+                                                   disable=_TRIMMED_DISABLE)):
+            results[key] = tuple(_tokens_from_doc(doc))
+            _token_cache.put(key, results[key])
+
+    return [list(results[key]) for key in keys]
+
+
+def spacy_model_version() -> Optional[str]:
+    """
+    Returns the installed version of de_core_news_sm without loading spaCy (None if not installed).
+    """
+    try:
+        return importlib.metadata.version("de_core_news_sm")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _spacy_analyze_batch(texts: list[str], batch_size: int = 256) -> list[list[tuple[str, Optional[str]]]]:
+    """
+    Analyzes texts without parser and NER, keeping every token as (form, lemma or None).
+
+    The lemma is only kept for intent relevant tokens, so the token list of a text is the list of all
+    lemmas that are not None.
+
+    Args:
+        texts (list[str]): Already preprocessed (lowercased) texts.
+        batch_size (int): Number of texts spaCy processes per batch.
+
+    Returns:
+        list[list[tuple[str, Optional[str]]]]: The analysis of every text, in input order.
+    """
+    analyses: list[list[tuple[str, Optional[str]]]] = []
+
+    for doc in _get_nlp_model().pipe(texts, batch_size=batch_size, disable=_TRIMMED_DISABLE):
+        analyses.append([
+            (token.text.lower(), token.lemma_.lower() if token.pos_ in INTENT_RELEVANT_POS else None)
+            for token in doc if not token.is_space
+        ])
+    return analyses
+
+
+def tokens_from_analysis(analysis: list[tuple[str, Optional[str]]]) -> list[str]:
+    """
+    Returns the intent relevant lemmas of an analysis created by IntentTokenizer.analyze_corpus.
+    """
+    return [lemma for _, lemma in analysis if lemma is not None]
+
+
+def build_lemma_lookup(analyses: list[list[tuple[str, Optional[str]]]]) -> dict:
+    """
+    Builds the lemma lookup table used by the "lookup" tokenizer mode.
+
+    Every surface form seen in the analyses is either mapped to its lemma (POS in INTENT_RELEVANT_POS)
+    or recorded as ignored. Forms tagged both ways are decided by majority vote.
+
+    Args:
+        analyses (list[list[tuple[str, Optional[str]]]]): Analyses created by IntentTokenizer.analyze_corpus.
+
+    Returns:
+        dict: {"lemmas": {form: lemma}, "ignored": [form, ...]}
+    """
+    outcomes: dict[str, Counter] = {}
+
+    for analysis in analyses:
+        for form, outcome in analysis:
+            outcomes.setdefault(form, Counter())[outcome] += 1
+
+    lemmas: dict[str, str] = {}
+    ignored: list[str] = []
+
+    for form, counter in outcomes.items():
+        outcome = counter.most_common(1)[0][0]
+        if outcome is None:
+            ignored.append(form)
+        else:
+            lemmas[form] = outcome
+
+    return {"lemmas": lemmas, "ignored": sorted(ignored)}
+
+
+def _lookup_tokenize(text: str, lemmas: dict[str, str], ignored: set[str], spacy_fallback: bool = True) -> list[str]:
+    """
+    Tokenizes a text with the lemma lookup table and a regex splitter instead of spaCy.
+
+    Unknown words are resolved one by one: each word is tagged on its own (cached like any other text),
+    the known words of the sentence never go through spaCy. Tagging a word without its sentence can
+    pick a different POS tag than the full pipeline, which only matters for words the training data
+    never contained.
+
+    Args:
+        text (str): Already preprocessed (lowercased) text.
+        lemmas (dict[str, str]): Surface form -> lemma for intent relevant forms.
+        ignored (set[str]): Known forms that are not intent relevant.
+        spacy_fallback (bool): If True, unknown words are tokenized with spaCy.
+            If False, unknown words are dropped and spaCy is never loaded.
+
+    Returns:
+        list[str]: The intent relevant lemmas.
+    """
+    tokens: list[str] = []
+
+    for word in _WORD_SPLIT_PATTERN.findall(text):
+        lemma: str | None = lemmas.get(word)
+
+        if lemma is not None:
+            tokens.append(lemma)
+        elif word not in ignored and spacy_fallback:
+            tokens.extend(_cached_spacy_tokenizer(word))
+
+    return tokens
+
+
+def _identity(value):
+    """
+    Pass-through used as tokenizer/preprocessor for already tokenized texts (picklable).
+    """
+    return value
+
+
+def pretokenized_vectorizer(params: dict) -> TfidfVectorizer:
+    """
+    Creates a TfidfVectorizer with the given settings that accepts token lists instead of raw strings.
+    """
+    params = {key: value for key, value in params.items()
+              if key not in ("tokenizer", "preprocessor", "lowercase", "token_pattern")}
+    return TfidfVectorizer(tokenizer=_identity, preprocessor=_identity, lowercase=False, token_pattern=None, **params)
+
+
+class IntentTokenizer:
+    """
+    Turns preprocessed texts into the intent relevant lemmas used as TF-IDF features.
+
+    In "lookup" mode the lemma lookup table exported by a training replaces spaCy, so a tokenizer
+    belongs to one trained model and is swapped together with it.
+    """
+
+    def __init__(self, mode: str = "spacy", cache_size: int = 4096, spacy_fallback: bool = True,
+                 token_store_path: Optional[str] = None, debug: bool = False):
+        """
+        Initializes the tokenizer.
+
+        Args:
+            mode (str): One of TOKENIZER_MODES.
+            cache_size (int): Maximum number of cached token lists (shared by the whole process).
+            spacy_fallback (bool): In "lookup" mode, tokenize unknown words with spaCy (word by word).
+            token_store_path (Optional[str]): JSON file caching the analysis of every training sentence
+                across trainings (None = disabled).
+            debug (bool): If True, enables print statements.
+        """
+        if mode not in TOKENIZER_MODES:
+            raise ValueError(f"Unknown tokenizer mode: {mode}")
+
+        self.mode: str = mode
+        self.spacy_fallback: bool = spacy_fallback
+        self.token_store_path: Optional[str] = token_store_path
+        self.debug: bool = debug
+        self.lemma_lookup: Optional[dict] = None
+        self._ignored_forms: set[str] = set()
+
+        if mode != "spacy":
+            _token_cache.resize(cache_size)
+
+    def tokenizer_function(self):
+        """
+        Returns the module-level tokenizer function for the configured mode (picklable with the vectorizer).
+        """
+        if self.mode in ("cached", "lookup"):
+            return _cached_spacy_tokenizer
+        return _global_spacy_tokenizer
+
+    def set_lemma_lookup(self, lemma_lookup: Optional[dict]) -> None:
+        """
+        Sets the lemma lookup table (and the set of ignored forms derived from it).
+        """
+        self.lemma_lookup = lemma_lookup
+        self._ignored_forms = set(lemma_lookup["ignored"]) if lemma_lookup else set()
+
+    def tokenize_batch(self, texts: list[str], batch_size: int = 256, n_process: int = 1) -> list[list[str]]:
+        """
+        Tokenizes many already preprocessed texts at once.
+
+        Args:
+            texts (list[str]): Already preprocessed (lowercased) texts.
+            batch_size (int): Number of texts spaCy processes per batch.
+            n_process (int): Number of worker processes used by spaCy.
+
+        Returns:
+            list[list[str]]: The token list for every text, in input order.
+        """
+        if self.mode == "lookup":
+            if self.lemma_lookup is None:
+                # Model from before the lookup mode (e.g. served while it is retrained)
+                warnings.warn("Model has no lemma lookup table, tokenizing with the cached spaCy pipeline.",
+                              RuntimeWarning, stacklevel=4)
+                return _spacy_tokenize_batch(texts, batch_size=batch_size, n_process=n_process, use_cache=True)
+            return [_lookup_tokenize(text, self.lemma_lookup["lemmas"], self._ignored_forms, self.spacy_fallback)
+                    for text in texts]
+
+        return _spacy_tokenize_batch(texts, batch_size=batch_size, n_process=n_process,
+                                     use_cache=self.mode == "cached")
+
+    def analyze_corpus(self, texts: list[str]) -> list[list[tuple[str, Optional[str]]]]:
+        """
+        Analyzes training sentences, re-using the analyses stored in the token store.
+
+        Only sentences whose hash is not in the store are run through spaCy. The store is rewritten
+        with the entries of the current corpus afterwards.
+
+        Args:
+            texts (list[str]): The preprocessed training sentences.
+
+        Returns:
+            list[list[tuple[str, Optional[str]]]]: The analysis of every sentence.
+        """
+        keys: list[str] = [hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts]
+        header: dict = {"spacy_model": spacy_model_version(), "pos": sorted(INTENT_RELEVANT_POS)}
+
+        entries: dict = {}
+        if self.token_store_path and os.path.exists(self.token_store_path):
+            try:
+                with open(self.token_store_path, "r", encoding="utf-8") as store_file:
+                    store: dict = json.load(store_file)
+                if store.get("header") == header:
+                    entries = store.get("entries", {})
+            except (OSError, ValueError) as e:
+                if self.debug:
+                    print(f"! Ignoring unreadable token store: {e}")
+
+        missing: dict[str, str] = {key: text for key, text in zip(keys, texts) if key not in entries}
+
+        if self.debug:
+            print(f"* Analyzing {len(missing)} of {len(texts)} Sentences (Rest From Token Store)")
+
+        if missing:
+            for key, analysis in zip(missing.keys(), _spacy_analyze_batch(list(missing.values()))):
+                entries[key] = analysis
+
+        if self.token_store_path and missing:
+            os.makedirs(os.path.dirname(self.token_store_path) or ".", exist_ok=True)
+            with open(self.token_store_path, "w", encoding="utf-8") as store_file:
+                json.dump({"header": header, "entries": {key: entries[key] for key in keys}}, store_file,
+                          ensure_ascii=False)
+
+        return [[(form, lemma) for form, lemma in entries[key]] for key in keys]
+
+    @staticmethod
+    def cache_info() -> dict:
+        """
+        Returns the statistics of the token cache used by the "cached" tokenizer mode.
+
+        Returns:
+            dict: hits, misses, hit_rate, size and maxsize of the cache.
+        """
+        return _token_cache.info()
@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded least-recently-used cache with hit/miss counters.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initializes the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries. The least recently used entry is evicted first.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value for key (and marks it as recently used) or default on a miss.
+        """
+        with self._lock:
+            try:
+                value: Any = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value and evicts the least recently used entries if the cache is full.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Changes the maximum size, evicting the oldest entries if necessary.
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+
+        with self._lock:
+            self.maxsize = maxsize
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Removes all entries and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        """
+        Returns the cache statistics (hits, misses, hit_rate, size, maxsize).
+        """
+        with self._lock:
+            lookups: int = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups > 0 else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import time
+from typing import Any, Iterable
+
+
+def _current_rss_bytes() -> int | None:
+    """
+    Returns the resident set size of the process (None if the platform offers no cheap way to read it).
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages: int = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class SpacyModelRegistry:
+    """
+    Process-wide registry that loads every spaCy model configuration at most once.
+
+    A configuration is a model name plus the set of excluded components. Loading is lazy and
+    thread-safe: concurrent callers of the same configuration wait for a single load, different
+    configurations load in parallel. Missing models are downloaded once.
+    """
+
+    def __init__(self):
+        self._models: dict[tuple[str, tuple[str, ...]], Any] = {}
+        self._stats: dict[tuple[str, tuple[str, ...]], dict] = {}
+        self._key_locks: dict[tuple[str, tuple[str, ...]], threading.Lock] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def load(name: str, exclude: Iterable[str] | None = None):
+        """
+        Loads a spaCy model without caching it (downloading it if necessary).
+
+        Args:
+            name (str): The model package, e.g. "de_core_news_sm".
+            exclude (Iterable[str] | None): Components that are not loaded at all.
+        """
+        import spacy
+
+        exclude_list: list[str] = list(exclude or [])
+        try:
+            return spacy.load(name, exclude=exclude_list)
+        except OSError:
+            from spacy.cli import download
+            download(name)
+            return spacy.load(name, exclude=exclude_list)
+
+    def get(self, name: str, exclude: Iterable[str] | None = None):
+        """
+        Returns the shared model for the given configuration and loads it on first use.
+
+        Callers that need fewer components for a single call should pass disable=[...] to
+        nlp(...) / nlp.pipe(...) instead of requesting another configuration.
+
+        Args:
+            name (str): The model package, e.g. "de_core_news_sm".
+            exclude (Iterable[str] | None): Components that are not loaded at all.
+        """
+        key: tuple[str, tuple[str, ...]] = (name, tuple(sorted(set(exclude or []))))
+
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock: threading.Lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            rss_before: int | None = _current_rss_bytes()
+            started: float = time.perf_counter()
+            model = self.load(name, exclude=key[1])
+            load_seconds: float = time.perf_counter() - started
+            rss_after: int | None = _current_rss_bytes()
+
+            vectors = model.vocab.vectors
+            self._stats[key] = {
+                "model": name,
+                "excluded": list(key[1]),
+                "components": list(model.pipe_names),
+                "load_seconds": load_seconds,
+                "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+                "vectors_bytes": int(getattr(vectors.data, "nbytes", 0)),
+            }
+            self._models[key] = model
+
+        return model
+
+    def is_loaded(self, name: str, exclude: Iterable[str] | None = None) -> bool:
+        """
+        Returns True if the given configuration has already been loaded.
+        """
+        return (name, tuple(sorted(set(exclude or [])))) in self._models
+
+    def stats(self) -> list[dict]:
+        """
+        Returns load time, RSS growth during the load and vector table size for every loaded configuration.
+        """
+        with self._lock:
+            return [dict(stats) for stats in self._stats.values()]
+
+    def clear(self) -> None:
+        """
+        Forgets all loaded models (they are freed once no component references them anymore).
+        """
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+            self._key_locks.clear()
+
+
+# Shared instance for the whole process
+spacy_models: SpacyModelRegistry = SpacyModelRegistry()
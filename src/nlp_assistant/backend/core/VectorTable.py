@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Dateien einer exportierten Vektortabelle
+_KEYS_FILE: str = "keys.npy"
+_ROWS_FILE: str = "rows.npy"
+_VECTORS_FILE: str = "vectors.npy"
+_META_FILE: str = "meta.json"
+
+
+class VectorTable:
+    """
+    Memory-gemappte Wortvektortabelle eines spaCy-Modells, ohne dass eine Pipeline geladen werden muss.
+
+    Die Tabelle besteht aus den sortierten String-Hashes der Wörter (wie in spaCy), der zugehörigen Zeile
+    und der Vektormatrix. Die Dateien werden per np.load(mmap_mode="r") eingebunden, sodass mehrere
+    Prozesse sich die Seiten im Page-Cache teilen und nur die tatsächlich gelesenen Zeilen Speicher belegen.
+    """
+
+    def __init__(self, path: str, mmap_mode: str | None = "r") -> None:
+        """
+        Lädt eine mit VectorTable.export erzeugte Tabelle.
+
+        Args:
+            path (str): Verzeichnis der exportierten Tabelle.
+            mmap_mode (str | None): Modus für np.load, None lädt die Tabelle vollständig in den Speicher.
+        """
+        # spaCy wird nur für die Hash-Funktion und den Tokenizer benötigt, nicht für eine Pipeline
+        import spacy
+        from spacy.strings import hash_string
+
+        with open(os.path.join(path, _META_FILE), "r", encoding="utf-8") as f:
+            self.meta: dict = json.load(f)
+
+        self.path: str = path
+        self.keys: np.ndarray = np.load(os.path.join(path, _KEYS_FILE), mmap_mode=mmap_mode)
+        self.rows: np.ndarray = np.load(os.path.join(path, _ROWS_FILE), mmap_mode=mmap_mode)
+        self.vectors: np.ndarray = np.load(os.path.join(path, _VECTORS_FILE), mmap_mode=mmap_mode)
+        self._hash = hash_string
+
+        # Leere Sprach-Pipeline: nur die Tokenizer-Regeln, keine Gewichte
+        self.tokenizer = spacy.blank(self.meta.get("lang", "de")).tokenizer
+
+    @property
+    def vectors_length(self) -> int:
+        return int(self.vectors.shape[1])
+
+    def get_vector(self, word: str) -> np.ndarray:
+        """
+        Gibt den Vektor eines Wortes zurück (Nullvektor, wenn das Wort nicht in der Tabelle ist).
+        """
+        key: int = self._hash(word)
+        position: int = int(np.searchsorted(self.keys, key))
+
+        if position < len(self.keys) and self.keys[position] == key:
+            return np.asarray(self.vectors[self.rows[position]], dtype=np.float32)
+        return np.zeros(self.vectors_length, dtype=np.float32)
+
+    def text_vector(self, text: str) -> np.ndarray:
+        """
+        Mittelwert der Token-Vektoren eines Textes, entspricht Doc.vector von spaCy.
+        """
+        words: list[str] = [token.text for token in self.tokenizer(text)]
+
+        if not words:
+            return np.zeros(self.vectors_length, dtype=np.float32)
+
+        return np.mean([self.get_vector(word) for word in words], axis=0).astype(np.float32)
+
+    @staticmethod
+    def export(nlp, path: str) -> str:
+        """
+        Exportiert die Vektortabelle eines geladenen spaCy-Modells in ein Verzeichnis.
+
+        Args:
+            nlp: Das geladene spaCy-Modell (z.B. de_core_news_lg).
+            path (str): Zielverzeichnis.
+
+        Returns:
+            str: Das Zielverzeichnis.
+        """
+        vectors = nlp.vocab.vectors
+        if getattr(vectors, "mode", "default") != "default":
+            raise ValueError(f"Vektormodus '{vectors.mode}' wird nicht unterstützt.")
+
+        keys: np.ndarray = np.fromiter(vectors.key2row.keys(), dtype=np.uint64, count=len(vectors.key2row))
+        rows: np.ndarray = np.fromiter(vectors.key2row.values(), dtype=np.int64, count=len(vectors.key2row))
+        order: np.ndarray = np.argsort(keys)
+
+        # Erst in ein temporäres Verzeichnis schreiben, damit nie eine halbe Tabelle geladen wird
+        tmp_path: str = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        np.save(os.path.join(tmp_path, _KEYS_FILE), keys[order])
+        np.save(os.path.join(tmp_path, _ROWS_FILE), rows[order])
+        np.save(os.path.join(tmp_path, _VECTORS_FILE), np.asarray(vectors.data, dtype=np.float32))
+
+        with open(os.path.join(tmp_path, _META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"lang": nlp.lang, "model": f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}",
+                       "version": nlp.meta.get("version")}, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return path
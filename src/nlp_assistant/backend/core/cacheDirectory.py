@@ -0,0 +1,22 @@
+import os
+
+# Umgebungsvariable für das Verzeichnis abgeleiteter Dateien (Token-Store, Vektortabelle, Geräte-Snapshot)
+CACHE_DIR_ENV: str = "NLP_ASSISTANT_CACHE_DIR"
+
+
+def cache_dir(*parts: str) -> str:
+    """
+    Verzeichnis für abgeleitete Dateien, die nicht ins Paket gehören.
+
+    Reihenfolge: $NLP_ASSISTANT_CACHE_DIR, $XDG_CACHE_HOME/nlp_assistant, ~/.cache/nlp_assistant.
+    Wird bei jedem Aufruf ausgewertet, damit später geladene Umgebungsvariablen (z.B. aus .env) greifen.
+
+    Args:
+        *parts (str): Pfadbestandteile, die an das Verzeichnis angehängt werden.
+
+    Returns:
+        str: Der Pfad (das Verzeichnis wird nicht angelegt).
+    """
+    base: str = os.environ.get(CACHE_DIR_ENV) or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "nlp_assistant")
+    return os.path.join(base, *parts)
@@ -1,18 +1,77 @@
+import os
+import threading
+import time
+
+import numpy as np
 import spacy
-from nltk.metrics import edit_distance
+
+from nlp_assistant.backend.core.cacheDirectory import cache_dir
+from nlp_assistant.backend.core.DeviceVectorIndex import DeviceVectorIndex
+from nlp_assistant.backend.core.FuzzyNameIndex import FuzzyNameIndex
+from nlp_assistant.backend.core.LRUCache import LRUCache
+from nlp_assistant.backend.core.SpacyModelRegistry import spacy_models
+from nlp_assistant.backend.core.VectorTable import VectorTable
+
+# Exportierte Vektortabelle von de_core_news_lg für den speicherschonenden Modus (mehrere hundert MB).
+# Sie liegt im Cache-Verzeichnis statt im Paket, VECTOR_TABLE_PATH_ENV setzt den Pfad direkt.
+VECTOR_TABLE_PATH_ENV: str = "NLP_ASSISTANT_VECTOR_TABLE_PATH"
+
+
+def defaultVectorTablePath() -> str:
+    """Pfad der Vektortabelle, wenn DeviceMatcher kein vectorTablePath übergeben wird."""
+    return os.environ.get(VECTOR_TABLE_PATH_ENV) or cache_dir("de_core_news_lg_vectors")
+
+
+# Wörter, mit denen ein Befehl mehrere Geräte gleichzeitig adressiert
+GROUP_QUANTIFIERS: frozenset[str] = frozenset({"alle", "allen", "aller", "sämtliche", "sämtlichen", "beide", "beiden"})
+
 
 class DeviceMatcher:
 
-    def __init__(self, SIMILARITY_THRESHOLD=0.5) -> None:
+    def __init__(self, SIMILARITY_THRESHOLD=0.5, lowMemory: bool = False,
+                 vectorTablePath: str | None = None, cacheSize: int = 1024) -> None:
+        """
+        Args:
+            SIMILARITY_THRESHOLD (float): Mindestähnlichkeit für einen Treffer.
+            lowMemory (bool): Wenn True, wird de_core_news_lg nicht geladen. Der Abgleich nutzt die
+                memory-gemappte Vektortabelle (wird beim ersten Start einmalig exportiert) und die
+                Extraktion den Parser von de_core_news_sm.
+            vectorTablePath (str | None): Verzeichnis der exportierten Vektortabelle
+                (None: defaultVectorTablePath(), beim Erzeugen ausgewertet).
+            cacheSize (int): Maximale Anzahl zwischengespeicherter Suchergebnisse.
+        """
         
         self.SIMILARITY_THRESHOLD = SIMILARITY_THRESHOLD
+        self.lowMemory: bool = lowMemory
+        self.vectorTable: VectorTable | None = None
+
+        if lowMemory:
+            vectorTablePath = vectorTablePath or defaultVectorTablePath()
+            if not os.path.exists(vectorTablePath):
+                print(f"Exportiere Vektortabelle nach '{vectorTablePath}' ...")
+                # Einmaliger Export: das große Modell wird dafür nur kurz und ohne Registry geladen
+                VectorTable.export(spacy_models.load("de_core_news_lg", exclude=["tagger", "morphologizer", "parser",
+                                                                                 "lemmatizer", "ner", "senter",
+                                                                                 "attribute_ruler", "tok2vec"]),
+                                   vectorTablePath)
+
+            self.vectorTable = VectorTable(vectorTablePath)
+            # Für die Extraktion genügen Parser und Wortarten des kleinen Modells (geteilt mit den anderen Komponenten)
+            self.nlp = spacy_models.get("de_core_news_sm")
+        else:
+            # NER wird weder für den Abgleich noch für die Extraktion benötigt
+            self.nlp = spacy_models.get("de_core_news_lg", exclude=["ner"])
 
-        try:
-            self.nlp = spacy.load("de_core_news_lg")
-        except OSError:
-            from spacy.cli import download
-            download("de_core_news_lg")
-            self.nlp= spacy.load("de_core_news_lg")
+        # Vektor-Index der Gerätenamen, wird nur bei einer geänderten Geräteliste neu aufgebaut
+        self.vectorIndex: DeviceVectorIndex | None = None
+        self.fuzzyIndex: FuzzyNameIndex | None = None
+        self.deviceListVersion: int = 0
+        self._deviceListSource: object | None = None
+
+        # Ergebnis-Cache (Schlüssel enthält die Version der Geräteliste) und Latenz-Statistik
+        self.matchCache: LRUCache = LRUCache(maxsize=cacheSize)
+        self._lookupStats: dict[str, dict] = {kind: {"count": 0, "total": 0.0, "max": 0.0} for kind in ("hit", "miss")}
+        self._statsLock: threading.Lock = threading.Lock()
         
     @staticmethod
     def cleanString(s: str) -> str:
@@ -20,81 +79,278 @@ class DeviceMatcher:
         return s.lower().replace("-", " ").replace("_", " ").strip()
     
 
-    def findBestDeviceMatch(self, targetDeviceName: str, deviceList: list) -> dict | None:
+    def vectorizeNames(self, names: list[str]) -> np.ndarray:
+        """
+        Berechnet die Wortvektoren (Mittelwert der Token-Vektoren) für mehrere Namen.
+        Es wird nur der Tokenizer ausgeführt, die restliche Pipeline verändert die statischen Vektoren nicht.
+        Im speicherschonenden Modus stammen die Vektoren aus der memory-gemappten Vektortabelle.
+
+        Args:
+            names (list[str]): Die bereinigten Namen.
+
+        Returns:
+            np.ndarray: Ein Vektor pro Name, Form (Anzahl Namen, Dimension).
+        """
+        if self.vectorTable is not None:
+            vectors: list[np.ndarray] = [self.vectorTable.text_vector(name) for name in names]
+            vectors_length: int = self.vectorTable.vectors_length
+        else:
+            vectors: list[np.ndarray] = [doc.vector for doc in self.nlp.tokenizer.pipe(names)]
+            vectors_length: int = self.nlp.vocab.vectors_length
+
+        if not vectors:
+            return np.zeros((0, vectors_length), dtype=np.float32)
+
+        return np.vstack(vectors)
+
+    def setDeviceList(self, deviceList: list) -> DeviceVectorIndex:
+        """
+        Setzt die Geräteliste und baut den Vektor-Index auf, falls sich die Gerätenamen geändert haben.
+
+        Args:
+            deviceList (list): Liste der verfügbaren Geräte oder ein DeviceIndex.
+
+        Returns:
+            DeviceVectorIndex: Der (ggf. neu aufgebaute) Index.
+        """
+        # Ein DeviceIndex ist unveränderlich: wird derselbe erneut übergeben, ist nichts zu prüfen
+        if self.vectorIndex is not None and deviceList is self._deviceListSource and hasattr(deviceList, "by_entity_id"):
+            return self.vectorIndex
+
+        clean_names: list[str] = [self.cleanString(device['name']) for device in deviceList]
+
+        if self.vectorIndex is None or self.vectorIndex.names != tuple(clean_names):
+            self.vectorIndex = DeviceVectorIndex(devices=deviceList, names=clean_names,
+                                                 vectors=self.vectorizeNames(clean_names))
+            self.fuzzyIndex = FuzzyNameIndex(clean_names)
+            # Neue Version: alle Cache-Einträge der alten Liste werden nicht mehr getroffen und zuerst verdrängt
+            self.deviceListVersion += 1
+        else:
+            # Gleiche Namen: nur die Geräteobjekte übernehmen (z.B. geänderter Typ), keine neuen Vektoren
+            self.vectorIndex.devices = list(deviceList)
+
+        self._deviceListSource = deviceList
+        return self.vectorIndex
+
+    def findTopDeviceMatches(self, targetDeviceName: str, deviceList: list | None = None, k: int = 5) -> list[tuple[dict, float]]:
+        """
+        Findet die k Geräte mit der höchsten Vektor-Ähnlichkeit zum Gerätenamen.
+
+        Args:
+            targetDeviceName (str): Name des Geräts, das abgeglichen werden soll.
+            deviceList (list | None): Liste der verfügbaren Geräte, None verwendet die zuletzt gesetzte Liste.
+            k (int): Anzahl der zurückgegebenen Geräte.
+
+        Returns:
+            list[tuple[dict, float]]: Paare aus Gerät und Vektor-Ähnlichkeit, das beste zuerst.
+        """
+        index: DeviceVectorIndex | None = self.setDeviceList(deviceList) if deviceList is not None else self.vectorIndex
+        clean_targetDeviceName: str = self.cleanString(targetDeviceName)
+
+        if index is None or clean_targetDeviceName == "":
+            return []
+
+        return index.top_k(self.vectorizeNames([clean_targetDeviceName])[0], k=k)
+
+    def findDeviceMatches(self, targetDeviceName: str, deviceList: list | None = None, k: int | None = None,
+                          threshold: float | None = None, qualifiers: list[str] | None = None) -> list[dict]:
+        """
+        Findet alle Geräte, deren Vektor-Ähnlichkeit zum Gerätenamen den Schwellenwert erreicht (z.B. für "alle Lichter").
+        Erreicht kein Gerät den Schwellenwert, wird wie bei findBestDeviceMatch auf Levenshtein zurückgegriffen.
+
+        Args:
+            targetDeviceName (str): Name des Geräts bzw. der Gerätegruppe.
+            deviceList (list | None): Liste der verfügbaren Geräte, None verwendet die zuletzt gesetzte Liste.
+            k (int | None): Höchstens so viele Geräte zurückgeben, None für alle über dem Schwellenwert.
+            threshold (float | None): Mindestähnlichkeit, None verwendet SIMILARITY_THRESHOLD.
+            qualifiers (list[str] | None): Ortsangaben aus dem Befehl (siehe extractLocationQualifiers). Jede muss
+                im Namen (oder im Bereich "area") des Geräts vorkommen, sonst wird das Gerät nicht zurückgegeben.
+
+        Returns:
+            list[dict]: Die passenden Geräte, das ähnlichste zuerst.
+        """
+        index: DeviceVectorIndex | None = self.setDeviceList(deviceList) if deviceList is not None else self.vectorIndex
+        clean_targetDeviceName: str = self.cleanString(targetDeviceName)
+
+        if clean_targetDeviceName == "" or index is None or len(index) == 0:
+            print("Kein Gerätename zum Abgleichen angegeben.")
+            return []
+
+        if threshold is None:
+            threshold = self.SIMILARITY_THRESHOLD
+
+        matches: list[tuple[dict, float]] = index.above_threshold(self.vectorizeNames([clean_targetDeviceName])[0],
+                                                                  threshold=threshold)
+        if matches:
+            devices: list[dict] = [device for device, _ in matches if self.matchesQualifiers(device, qualifiers)]
+            if k is not None:
+                devices = devices[:k]
+            print(f"{len(devices)} Matches für: '{targetDeviceName}' {qualifiers or ''} = "
+                  f"{[device['name'] for device in devices]}")
+            return devices
+
+        best_match: dict | None = self.findBestDeviceMatch(targetDeviceName)
+        return [best_match] if best_match is not None and self.matchesQualifiers(best_match, qualifiers) else []
+
+    @staticmethod
+    def matchesQualifiers(device: dict, qualifiers: list[str] | None) -> bool:
+        """
+        Prüft, ob jede Ortsangabe im Namen oder im Bereich ("area") des Geräts vorkommt (ohne Groß-/Kleinschreibung).
+        "wohnzimmer" passt z.B. zu "Wohnzimmer Stehlampe" und "Wohnzimmerlicht".
+        """
+        if not qualifiers:
+            return True
+        text: str = f"{device.get('name', '')} {device.get('area') or ''}".lower()
+        return all(qualifier.lower() in text for qualifier in qualifiers)
+
+    @staticmethod
+    def extractLocationQualifiers(doc: spacy.tokens.Doc) -> list[str]:
+        """
+        Extrahiert die Ortsangaben eines Befehls: Nomen, die von einer Präposition abhängen
+        ("alle Lichter im Wohnzimmer aus" -> ["wohnzimmer"]). Abtrennbare Verbpartikel ("aus", "an") zählen nicht.
+
+        Args:
+            doc (spacy.tokens.Doc): Der geparste Befehl.
+
+        Returns:
+            list[str]: Die Ortsangaben in Kleinbuchstaben.
+        """
+        return [token.lower_ for token in doc
+                if token.pos_ in ("NOUN", "PROPN") and token.head is not token
+                and token.head.pos_ == "ADP" and token.head.tag_ != "PTKVZ"]
+
+    @staticmethod
+    def isGroupCommand(doc: spacy.tokens.Doc) -> bool:
+        """
+        Prüft, ob sich ein Befehl auf mehrere Geräte bezieht ("alle Lichter", "sämtliche Steckdosen").
+
+        Args:
+            doc (spacy.tokens.Doc): Der geparste Befehl.
+
+        Returns:
+            bool: True, wenn ein Quantor für mehrere Geräte enthalten ist.
+        """
+        return any(token.lower_ in GROUP_QUANTIFIERS for token in doc)
+
+    def _matchDevice(self, clean_targetDeviceName: str, index: DeviceVectorIndex) -> tuple[int | None, str, float, float]:
+        """
+        Berechnet das beste Gerät für einen bereinigten Namen (ohne Cache).
+
+        Returns:
+            tuple: Position des Geräts (oder None), Art des Treffers ("vector" / "levenshtein" / ""),
+                dessen Ähnlichkeit und die höchste Vektor-Ähnlichkeit.
+        """
+        # 1. Vektor Similarity (ein Matrix-Vektor-Produkt über alle Geräte)
+        scores: np.ndarray = index.similarities(self.vectorizeNames([clean_targetDeviceName])[0])
+        best_position: int = int(np.argmax(scores))
+        highest_Vector_similarity: float = max(float(scores[best_position]), 0.0)
+
+        if highest_Vector_similarity >= self.SIMILARITY_THRESHOLD:
+            return best_position, "vector", highest_Vector_similarity, highest_Vector_similarity
+
+        # 2. Normalisierte Levenshtein-Distanz (nur nötig, wenn die Vektor Similarity nicht ausreicht)
+        fuzzy_match: tuple[int, float] | None = self.fuzzyIndex.best_match(clean_targetDeviceName,
+                                                                           min_ratio=self.SIMILARITY_THRESHOLD)
+        if fuzzy_match is not None:
+            return fuzzy_match[0], "levenshtein", fuzzy_match[1], highest_Vector_similarity
+
+        return None, "", 0.0, highest_Vector_similarity
+
+    def findBestDeviceMatch(self, targetDeviceName: str, deviceList: list | None = None) -> dict | None:
         """
         Findet das beste passende Gerät aus der Geräteliste basierend auf dem Gerätenamen.
+        Ergebnisse werden pro bereinigtem Namen und Version der Geräteliste im LRU-Cache gehalten.
 
         Args:
             device_name (str): Name des Geräts, das abgeglichen werden soll.
-            deviceList (list): Liste der verfügbaren Geräte.
+            deviceList (list | None): Liste der verfügbaren Geräte, None verwendet die zuletzt gesetzte Liste.
 
         Returns:
             dict | None: Das beste passende Gerät oder None, wenn kein passendes Gerät gefunden wurde.
         """
+        start: float = time.perf_counter()
 
-        # Initialisierung
-        best_match_Vector: dict | None = None
-        best_match_Levenshtein: dict | None = None
-        highest_Vector_similarity: float = 0.0
-        highest_Levenshtein_Similarity: float = 0.0
-
+        index: DeviceVectorIndex | None = self.setDeviceList(deviceList) if deviceList is not None else self.vectorIndex
         clean_targetDeviceName: str = self.cleanString(targetDeviceName)
-        targetDeviceName_doc: spacy.tokens.Doc = self.nlp(clean_targetDeviceName)
 
-        if  clean_targetDeviceName == "" or len(deviceList) == 0:
+        if  clean_targetDeviceName == "" or index is None or len(index) == 0:
             print("Kein Gerätename zum Abgleichen angegeben.")
             return None
-        
-        for device in deviceList:
-            clean_device_name: str = self.cleanString(device['name'])
-
-            # 1. Vektor Similarity
-            device_doc: spacy.tokens.Doc = self.nlp(clean_device_name)
-            similarity_Vector: float = targetDeviceName_doc.similarity(device_doc)
 
-            if similarity_Vector > highest_Vector_similarity:
-                highest_Vector_similarity = similarity_Vector
-                best_match_Vector = device
+        # Cache-Schlüssel: bereinigter Name, Version der Geräteliste und Schwellenwert
+        cache_key: tuple = (clean_targetDeviceName, self.deviceListVersion, self.SIMILARITY_THRESHOLD)
+        match: tuple[int | None, str, float, float] | None = self.matchCache.get(cache_key)
+        cache_hit: bool = match is not None
 
-            # 2. Normalisierte Levenshtein-Distanz
-            distanz = edit_distance(clean_device_name, clean_targetDeviceName)
-            max_len = max(len(clean_device_name), len(clean_targetDeviceName))
-            
-            similarity_Ratio_Levenshtein: float = 1.0 - (distanz / max_len)  
-            
-            if similarity_Ratio_Levenshtein > highest_Levenshtein_Similarity:
-                highest_Levenshtein_Similarity = similarity_Ratio_Levenshtein
-                best_match_Levenshtein = device
+        if not cache_hit:
+            match = self._matchDevice(clean_targetDeviceName, index)
+            self.matchCache.put(cache_key, match)
 
+        position, match_type, similarity, highest_Vector_similarity = match
+        self._recordLookup(cache_hit, time.perf_counter() - start)
 
         # Überprüfung, ob die höchste Ähnlichkeit über dem Schwellenwert liegt 
         # 1. Vektor Similarity 
         # 2. Levenshtein Similarity
-        if highest_Vector_similarity >= self.SIMILARITY_THRESHOLD:
-            print(f"Bestes Match für: '{targetDeviceName}' =  '{best_match_Vector['name']}' mit einer Similartiy von {highest_Vector_similarity:.2f}")
-            return best_match_Vector
+        if match_type == "vector":
+            print(f"Bestes Match für: '{targetDeviceName}' =  '{index.devices[position]['name']}' mit einer Similartiy von {similarity:.2f}")
+            return index.devices[position]
         
-        elif highest_Levenshtein_Similarity >= self.SIMILARITY_THRESHOLD:
-            print(f"Bestes Match für: '{targetDeviceName}' =  '{best_match_Levenshtein['name']}' mit einer Levinshtein-Similarity von {highest_Levenshtein_Similarity:.2f}")
-            return best_match_Levenshtein
+        elif match_type == "levenshtein":
+            print(f"Bestes Match für: '{targetDeviceName}' =  '{index.devices[position]['name']}' mit einer Levinshtein-Similarity von {similarity:.2f}")
+            return index.devices[position]
         
         else:
             print(f"Es wurde kein Match für das Gerät '{targetDeviceName}' gefunden.")
-            print(f"Levenshtein-Similarity: {highest_Levenshtein_Similarity:.2f}, Vector-Similarity: {highest_Vector_similarity:.2f}")
+            print(f"Levenshtein-Similarity: < {self.SIMILARITY_THRESHOLD:.2f}, Vector-Similarity: {highest_Vector_similarity:.2f}")
             return None
-            
 
-    def extractDeviceNamesFromCommands(self, command: str) -> str:
+    def _recordLookup(self, cache_hit: bool, duration: float) -> None:
+        """Erfasst die Dauer einer Suche getrennt nach Cache-Treffer und -Fehlschlag."""
+        with self._statsLock:
+            stats: dict = self._lookupStats["hit" if cache_hit else "miss"]
+            stats["count"] += 1
+            stats["total"] += duration
+            stats["max"] = max(stats["max"], duration)
+
+    def matchStats(self) -> dict:
+        """
+        Kennzahlen für das Monitoring: Cache-Trefferquote und Dauer der Suchen (in Millisekunden).
+
+        Returns:
+            dict: Cache-Info des LRU-Caches sowie Anzahl, mittlere und maximale Dauer für Treffer und Fehlschläge.
+        """
+        with self._statsLock:
+            latency: dict = {
+                kind: {
+                    "count": stats["count"],
+                    "mean_ms": 1000 * stats["total"] / stats["count"] if stats["count"] else 0.0,
+                    "max_ms": 1000 * stats["max"]
+                }
+                for kind, stats in self._lookupStats.items()
+            }
+
+        return {"cache": self.matchCache.info(), "latency": latency, "device_list_version": self.deviceListVersion}
+
+    def parse(self, command: str) -> spacy.tokens.Doc:
+        """
+        Parst einen Befehl für die Extraktion. NER wird nicht benötigt und für diesen Aufruf deaktiviert.
+        """
+        return self.nlp(command, disable=[name for name in ("ner",) if name in self.nlp.pipe_names])
+
+    def extractDeviceNamesFromCommands(self, command: str, doc: spacy.tokens.Doc | None = None) -> str:
         """
         Extrahiert den DeviceName aus dem Sprachbefehl.
         Strategie: Finde den grammatikalischen Kern des Objekts (egal ob NOUN oder X) und sammle alle dazugehörigen Wörter ein.
         Args:
             command (str): Der Sprachbefehl.
+            doc (spacy.tokens.Doc | None): Bereits mit parse geparster Befehl, wird sonst hier geparst.
         Returns:
             str: Der extrahierte DeviceName.
             
         """
-        doc = self.nlp(command)
+        if doc is None:
+            doc = self.parse(command)
         
         # Definiere relevante Abhängigkeitsbeziehungen
         target_deps: list[str] = ["oa", "obj", "dobj", "sb", "nsubj", "pd"]
@@ -0,0 +1,16 @@
+import os
+
+from src.nlp_assistant.backend.core.cacheDirectory import CACHE_DIR_ENV, cache_dir
+
+
+def test_cache_dir_prefers_env_then_xdg_then_home(monkeypatch, tmp_path):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "eigener_cache"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert cache_dir("a", "b.json") == str(tmp_path / "eigener_cache" / "a" / "b.json")
+
+    monkeypatch.delenv(CACHE_DIR_ENV)
+    assert cache_dir() == str(tmp_path / "xdg" / "nlp_assistant")
+
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    assert cache_dir() == os.path.join(str(tmp_path / "home"), ".cache", "nlp_assistant")
@@ -0,0 +1,25 @@
+from unittest.mock import MagicMock
+
+from src.nlp_assistant.backend.core.CommandAnalysis import CommandAnalysis
+
+
+def test_each_pipeline_runs_once_per_command():
+    recognizer = MagicMock()
+    recognizer.tokenize.return_value = ["schalten", "licht"]
+    recognizer.predict.return_value = ("turn_on", 0.9)
+    matcher = MagicMock()
+    matcher.extractDeviceNamesFromCommands.return_value = "Licht"
+    matcher.findBestDeviceMatch.return_value = {"name": "Licht"}
+
+    analysis = CommandAnalysis("Schalte das Licht an", recognizer, matcher, deviceList=[{"name": "Licht"}])
+
+    for _ in range(2):
+        assert analysis.intent() == ("turn_on", 0.9)
+        assert analysis.device() == {"name": "Licht"}
+
+    recognizer.tokenize.assert_called_once_with("Schalte das Licht an")
+    recognizer.predict.assert_called_once_with("Schalte das Licht an", tokens=["schalten", "licht"])
+    matcher.parse.assert_called_once_with("Schalte das Licht an")
+    matcher.extractDeviceNamesFromCommands.assert_called_once_with("Schalte das Licht an",
+                                                                   doc=matcher.parse.return_value)
+    assert set(analysis.timings) == {"intent_tokens", "intent", "device_doc", "raw_device_name", "device"}
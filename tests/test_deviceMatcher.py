@@ -1,5 +1,12 @@
+from unittest.mock import MagicMock
+
+import numpy as np
 import pytest
+import spacy
+from spacy.tokens import Doc
 
+from src.nlp_assistant.backend.core import deviceMatcher
+from src.nlp_assistant.backend.core.CommandAnalysis import CommandAnalysis
 from src.nlp_assistant.backend.core.deviceMatcher import DeviceMatcher
 
 class TestDeviceMatcher:
@@ -43,3 +50,62 @@ class TestDeviceMatcher:
         assert result is not None, f"FEHLER: Kein Match gefunden für '{target}'"
         assert result['name'] == expected_name, \
             f"FEHLER: Target: '{target}' | Gefunden: '{result['name']}' | Erwartet: '{expected_name}'"
+
+
+ROOM_DEVICES = [
+    {"name": "Wohnzimmer Licht", "entity_id": "light.wohnzimmer", "type": "light"},
+    {"name": "Küche Licht", "entity_id": "light.kueche", "type": "light"},
+    {"name": "Flur Licht", "entity_id": "light.flur", "type": "light"},
+    {"name": "Steckdose", "entity_id": "switch.steckdose", "type": "switch"},
+]
+
+
+@pytest.fixture
+def room_matcher(monkeypatch, tmp_path):
+    """Speicherschonender DeviceMatcher mit kleiner Vektortabelle statt de_core_news_lg."""
+    nlp = spacy.blank("de")
+    for word, vector in [("licht", [1, 0, 0]), ("lichter", [1, 0, 0]), ("wohnzimmer", [0, 1, 0]),
+                         ("küche", [0, 1, 0]), ("flur", [0, 1, 0]), ("steckdose", [0, 0, 1])]:
+        nlp.vocab.set_vector(word, np.array(vector, dtype=np.float32))
+
+    registry = deviceMatcher.spacy_models
+    monkeypatch.setattr(type(registry), "load", staticmethod(lambda name, exclude=None: nlp))
+    monkeypatch.setenv(deviceMatcher.VECTOR_TABLE_PATH_ENV, str(tmp_path / "vectors"))
+    registry.clear()
+    yield deviceMatcher.DeviceMatcher(lowMemory=True)
+    registry.clear()
+
+
+def command_doc(matcher, with_room: bool) -> Doc:
+    # Parse wie von de_core_news_sm: "Schalte alle Lichter (im Wohnzimmer) aus"
+    if with_room:
+        return Doc(matcher.nlp.vocab, words=["Schalte", "alle", "Lichter", "im", "Wohnzimmer", "aus"],
+                   pos=["VERB", "DET", "NOUN", "ADP", "NOUN", "ADP"],
+                   tags=["VVIMP", "PIAT", "NN", "APPRART", "NN", "PTKVZ"],
+                   heads=[0, 2, 0, 2, 3, 0], deps=["ROOT", "nk", "oa", "mnr", "nk", "svp"])
+    return Doc(matcher.nlp.vocab, words=["Schalte", "alle", "Lichter", "aus"], pos=["VERB", "DET", "NOUN", "ADP"],
+               tags=["VVIMP", "PIAT", "NN", "PTKVZ"], heads=[0, 2, 0, 0], deps=["ROOT", "nk", "oa", "svp"])
+
+
+def test_location_qualifiers_come_from_prepositional_objects(room_matcher):
+    assert room_matcher.extractLocationQualifiers(command_doc(room_matcher, with_room=True)) == ["wohnzimmer"]
+    assert room_matcher.extractLocationQualifiers(command_doc(room_matcher, with_room=False)) == []
+
+
+def test_group_command_keeps_room_qualifier(room_matcher):
+    with_room = CommandAnalysis("Schalte alle Lichter im Wohnzimmer aus", MagicMock(), room_matcher,
+                                deviceList=ROOM_DEVICES)
+    with_room.deviceDoc = lambda: command_doc(room_matcher, with_room=True)
+    without_room = CommandAnalysis("Schalte alle Lichter aus", MagicMock(), room_matcher, deviceList=ROOM_DEVICES)
+    without_room.deviceDoc = lambda: command_doc(room_matcher, with_room=False)
+
+    assert with_room.rawDeviceName() == without_room.rawDeviceName() == "Lichter"
+    assert with_room.isGroupCommand() and without_room.isGroupCommand()
+    assert [device["name"] for device in with_room.devices()] == ["Wohnzimmer Licht"]
+    assert [device["name"] for device in without_room.devices()] == ["Wohnzimmer Licht", "Küche Licht", "Flur Licht"]
+
+
+def test_unknown_room_matches_no_device(room_matcher):
+    assert room_matcher.findDeviceMatches("Lichter", ROOM_DEVICES, qualifiers=["keller"]) == []
+    assert room_matcher.findDeviceMatches("Lichter", ROOM_DEVICES, qualifiers=["flur"], k=1) == [ROOM_DEVICES[2]]
+    assert room_matcher.matchesQualifiers({"name": "Stehlampe", "area": "Wohnzimmer"}, ["wohnzimmer"])
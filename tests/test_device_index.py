@@ -0,0 +1,54 @@
+from src.nlp_assistant.backend.connection.DeviceIndex import DeviceIndex
+from src.nlp_assistant.backend.connection.HomeAssistantApiBase import HomeAssistantApiBase
+
+
+DEVICES = [
+    {"name": "Stehlampe", "entity_id": "light.stehlampe_wohnzimmer", "type": "light"},
+    {"name": "Deckenlampe", "entity_id": "light.deckenlampe", "type": "light"},
+    {"name": "Stehlampe", "entity_id": "light.stehlampe_buero", "type": "light"},
+    {"name": "TV Steckdose", "entity_id": "switch.tv_steckdose", "type": "switch"},
+]
+
+
+def test_lookup_by_name_entity_id_and_domain():
+    index = DeviceIndex(DEVICES)
+
+    assert index.by_name("Deckenlampe")["entity_id"] == "light.deckenlampe"
+    assert index.get("switch.tv_steckdose")["name"] == "TV Steckdose"
+    assert [device["entity_id"] for device in index.domain("switch")] == ["switch.tv_steckdose"]
+    assert len(index.domain("light")) == 3
+    assert index.by_name("Gibt es nicht") is None
+    assert index.get("light.gibt_es_nicht") is None
+
+
+def test_normalized_name_lookup():
+    index = DeviceIndex(DEVICES)
+
+    assert index.by_name("tv-steckdose") is None
+    assert index.resolve_entity_id("tv-steckdose") == "switch.tv_steckdose"
+    assert index.resolve_entity_id("  TV   Steckdose ") == "switch.tv_steckdose"
+
+
+def test_duplicate_names_resolve_independent_of_order():
+    # Bei doppelten Namen gewinnt immer die kleinste entity_id
+    assert DeviceIndex(DEVICES).resolve_entity_id("Stehlampe") == "light.stehlampe_buero"
+    assert DeviceIndex(list(reversed(DEVICES))).resolve_entity_id("Stehlampe") == "light.stehlampe_buero"
+    assert [device["entity_id"] for device in DeviceIndex(DEVICES).find_all("stehlampe")] == [
+        "light.stehlampe_buero", "light.stehlampe_wohnzimmer"
+    ]
+
+
+def test_index_behaves_like_the_device_list():
+    index = DeviceIndex(DEVICES)
+
+    assert len(index) == len(DEVICES)
+    assert list(index) == DEVICES
+    assert index[1] == DEVICES[1]
+
+
+def test_resolve_entity_id_accepts_list_and_index(real_device_list):
+    index = DeviceIndex(real_device_list)
+
+    assert HomeAssistantApiBase._resolve_entity_id("Deckenlampe", index) == "light.deckenlampe"
+    assert HomeAssistantApiBase._resolve_entity_id("Deckenlampe", real_device_list) == "light.deckenlampe"
+    assert HomeAssistantApiBase._resolve_entity_id("Gibt es nicht", index) is None
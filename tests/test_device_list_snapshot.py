@@ -0,0 +1,118 @@
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.nlp_assistant.backend.connection.DeviceListSnapshotCache import DeviceListSnapshotCache
+from src.nlp_assistant.backend.core.cacheDirectory import CACHE_DIR_ENV
+from src.nlp_assistant.backend.connection.HomeAssistantController import HomeAssistantController
+
+
+DEVICES = [{"name": "Deckenlampe", "entity_id": "light.deckenlampe", "type": "light"}]
+FRESH_DEVICES = DEVICES + [{"name": "Stehlampe", "entity_id": "light.stehlampe", "type": "light"}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DeviceListSnapshotCache("http://mock-ha:8123", path=str(tmp_path / "snapshot.json"), ttl=60.0)
+
+
+def make_manager(devices=FRESH_DEVICES):
+    manager = MagicMock()
+    manager.get_device_list.return_value = devices
+    manager._load_dummy_device_list.return_value = DEVICES
+    return manager
+
+
+def test_snapshot_roundtrip(cache):
+    assert cache.load() is None
+
+    cache.save(DEVICES)
+    devices, saved_at = cache.load()
+
+    assert devices == DEVICES
+    assert cache.is_fresh(saved_at)
+    assert not cache.is_fresh(saved_at - 120)
+
+
+def test_snapshot_of_other_instance_is_ignored(cache):
+    cache.save(DEVICES)
+
+    assert DeviceListSnapshotCache("http://other-ha:8123", path=cache.path).load() is None
+
+
+def test_corrupt_snapshot_is_ignored(cache):
+    with open(cache.path, "w", encoding="utf-8") as f:
+        f.write("{kaputt")
+
+    assert cache.load() is None
+
+
+def test_cold_start_fetches_once_and_saves(cache):
+    manager = make_manager()
+
+    controller = HomeAssistantController(manager, snapshot_cache=cache)
+
+    manager.get_device_list.assert_called_once_with(fallback=False)
+    assert controller.device_list == FRESH_DEVICES
+    assert cache.load()[0] == FRESH_DEVICES
+
+
+def test_fresh_snapshot_is_served_without_fetch(cache):
+    cache.save(DEVICES)
+    manager = make_manager()
+
+    controller = HomeAssistantController(manager, snapshot_cache=cache)
+
+    manager.get_device_list.assert_not_called()
+    assert controller.device_list == DEVICES
+    assert controller.refresh_if_stale() is False
+
+
+def test_stale_snapshot_is_served_and_refreshed_in_background(cache):
+    with open(cache.path, "w", encoding="utf-8") as f:
+        json.dump({"ha_base_url": cache.ha_base_url, "saved_at": time.time() - 3600, "devices": DEVICES}, f)
+
+    manager = make_manager()
+    fetched = []
+
+    def slow_fetch(fallback=True):
+        fetched.append(fallback)
+        time.sleep(0.05)
+        return FRESH_DEVICES
+
+    manager.get_device_list.side_effect = slow_fetch
+
+    controller = HomeAssistantController(manager, snapshot_cache=cache)
+
+    # Start sofort aus dem Snapshot, die Aktualisierung läuft im Hintergrund
+    assert controller.device_list == DEVICES
+    controller.refresh_if_stale()
+    controller._refresh_thread.join(timeout=2)
+
+    assert fetched == [False]
+    assert controller.device_list == FRESH_DEVICES
+    assert cache.load()[0] == FRESH_DEVICES
+
+
+def test_failed_refresh_keeps_list_and_snapshot(cache):
+    manager = make_manager()
+    manager.get_device_list.side_effect = ConnectionError("offline")
+
+    controller = HomeAssistantController(manager, snapshot_cache=cache)
+
+    # Ohne Verbindung: Dummy-Liste, aber kein Snapshot aus der Dummy-Liste
+    assert controller.device_list == DEVICES
+    assert cache.load() is None
+    assert controller.refresh_device_list() is False
+
+
+def test_default_path_lives_in_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+
+    cache = DeviceListSnapshotCache("http://mock-ha:8123")
+
+    assert cache.path == str(tmp_path / "deviceListSnapshot.json")
+    cache.save(DEVICES)
+    assert cache.load()[0] == DEVICES
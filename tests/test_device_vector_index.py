@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from src.nlp_assistant.backend.core.DeviceVectorIndex import DeviceVectorIndex
+
+DEVICES = [{"name": "Deckenlampe"}, {"name": "Standlampe"}, {"name": "Steckdose"}, {"name": "Leer"}]
+
+
+@pytest.fixture
+def index() -> DeviceVectorIndex:
+    vectors = np.array([
+        [1.0, 0.0, 0.0],
+        [2.0, 2.0, 0.0],
+        [0.0, 0.0, 3.0],
+        [0.0, 0.0, 0.0],
+    ])
+    return DeviceVectorIndex(DEVICES, [d["name"].lower() for d in DEVICES], vectors)
+
+
+def test_similarities_are_cosine(index):
+    scores = index.similarities(np.array([3.0, 0.0, 0.0]))
+
+    assert scores == pytest.approx([1.0, np.sqrt(0.5), 0.0, 0.0], abs=1e-6)
+
+
+def test_top_k_sorted_and_ties_keep_list_order(index):
+    ranking = index.top_k(np.array([0.0, 1.0, 0.0]), k=3)
+
+    assert [device["name"] for device, _ in ranking] == ["Standlampe", "Deckenlampe", "Steckdose"]
+    assert ranking[1][1] == pytest.approx(0.0)
+
+
+def test_zero_query_vector_scores_zero(index):
+    assert index.top_k(np.zeros(3), k=1)[0] == (DEVICES[0], 0.0)
+
+
+def test_above_threshold_returns_all_matches(index):
+    matches = index.above_threshold(np.array([1.0, 0.2, 0.0]), threshold=0.5)
+
+    assert [device["name"] for device, _ in matches] == ["Deckenlampe", "Standlampe"]
+    assert index.above_threshold(np.array([1.0, 0.2, 0.0]), threshold=0.5, k=1)[0][0] is DEVICES[0]
@@ -0,0 +1,31 @@
+import pytest
+from nltk.metrics import edit_distance
+
+from src.nlp_assistant.backend.core.FuzzyNameIndex import FuzzyNameIndex, bounded_edit_distance
+
+NAMES = ["deckenlampe", "standlampe", "fernseher steckdose", "playstation steckdose", "tv"]
+
+
+@pytest.mark.parametrize("a, b", [
+    ("deckenlampe", "deckenleuchte"),
+    ("standlampe", "stehlampe"),
+    ("tv", "fernseher"),
+    ("", "bad"),
+])
+def test_bounded_edit_distance_matches_levenshtein(a: str, b: str) -> None:
+    distance = edit_distance(a, b)
+
+    assert bounded_edit_distance(a, b, distance) == distance
+    assert bounded_edit_distance(a, b, distance - 1) == distance
+
+
+@pytest.mark.parametrize("query", ["deckenleuchte", "stehlampe", "playstation", "tv steckdose", "xyz"])
+def test_best_match_equals_full_scan(query: str) -> None:
+    # Referenz: vollständiger Durchlauf wie im ursprünglichen DeviceMatcher
+    expected = None
+    for position, name in enumerate(NAMES):
+        ratio = 1.0 - edit_distance(name, query) / max(len(name), len(query))
+        if ratio >= 0.5 and (expected is None or ratio > expected[1]):
+            expected = (position, ratio)
+
+    assert FuzzyNameIndex(NAMES).best_match(query, min_ratio=0.5) == expected
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from src.nlp_assistant.backend.connection.HomeAssistantAsyncClient import HomeAssistantAsyncClient
+
+SERVICES = [{"domain": "light", "services": {"turn_on": {}, "turn_off": {}}},
+            {"domain": "switch", "services": {"turn_on": {}}}]
+STATES = [{"entity_id": "light.deckenlampe", "attributes": {"friendly_name": "Deckenlampe"}},
+          {"entity_id": "switch.tv", "attributes": {"friendly_name": "TV"}},
+          {"entity_id": "sensor.temperatur", "attributes": {}}]
+
+
+async def start_stand_in(delay: float = 0.0):
+    """Minimaler HomeAssistant-Ersatz auf einem freien lokalen Port."""
+    calls: list = []
+
+    async def api(request):
+        return web.json_response({"message": "API running."})
+
+    async def services(request):
+        await asyncio.sleep(delay)
+        return web.json_response(SERVICES)
+
+    async def states(request):
+        await asyncio.sleep(delay)
+        return web.json_response(STATES)
+
+    async def call_service(request):
+        calls.append((request.match_info["domain"], request.match_info["service"], await request.json()))
+        await asyncio.sleep(delay)
+        return web.json_response([])
+
+    app = web.Application()
+    app.add_routes([web.get("/api/", api), web.get("/api/services", services), web.get("/api/states", states),
+                    web.post("/api/services/{domain}/{service}", call_service)])
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", calls
+
+
+def test_device_list_fetches_services_and_states_concurrently():
+    async def scenario():
+        runner, url, _ = await start_stand_in(delay=0.3)
+        try:
+            async with HomeAssistantAsyncClient(url, "token") as client:
+                assert await client.check_connection()
+                start = time.perf_counter()
+                devices = await client.get_device_list()
+                return devices, time.perf_counter() - start
+        finally:
+            await runner.cleanup()
+
+    devices, duration = asyncio.run(scenario())
+
+    assert [device["entity_id"] for device in devices] == ["light.deckenlampe", "switch.tv"]
+    assert devices[0]["actions"] == ["turn_on", "turn_off"]
+    assert duration < 0.55
+
+
+def test_many_service_calls_in_flight():
+    async def scenario():
+        runner, url, calls = await start_stand_in(delay=0.3)
+        devices = [{"name": f"Lampe {i}", "entity_id": f"light.lampe_{i}"} for i in range(20)]
+        try:
+            async with HomeAssistantAsyncClient(url, "token") as client:
+                start = time.perf_counter()
+                results = await asyncio.gather(*(
+                    client.post_action({"domain": "light", "service": "turn_on", "name": device["name"]}, devices)
+                    for device in devices
+                ))
+                return results, calls, time.perf_counter() - start
+        finally:
+            await runner.cleanup()
+
+    results, calls, duration = asyncio.run(scenario())
+
+    assert results == [[]] * 20
+    assert sorted(call[2]["entity_id"] for call in calls) == sorted(f"light.lampe_{i}" for i in range(20))
+    assert duration < 1.5
+
+
+def test_unreachable_server_falls_back_to_simulation():
+    async def scenario():
+        async with HomeAssistantAsyncClient("http://127.0.0.1:9", "token", dummy_file_path="does-not-exist.json") as client:
+            return await client.post_action({"domain": "light", "service": "turn_on", "name": "x"}, []), \
+                await client.get_device_list()
+
+    assert asyncio.run(scenario()) == ({"success": True, "simulation": True}, [])
+
+
+def test_streamed_device_list_matches_full_parse():
+    async def scenario(stream_states):
+        runner, url, _ = await start_stand_in()
+        try:
+            async with HomeAssistantAsyncClient(url, "token", stream_states=stream_states, stream_chunk_size=7) as client:
+                return await client.get_device_list()
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(scenario(True)) == asyncio.run(scenario(False))
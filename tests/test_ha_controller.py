@@ -28,8 +28,9 @@ def test_post_action_delegates(real_device_list):
     # Act
     controller.post_action(action_request)
 
-    # Assert: Prüfen, ob post_action, mit der gespeicherten Liste aufgerufen wurde
+    # Assert: Prüfen, ob post_action, mit dem gespeicherten Geräteindex aufgerufen wurde
     mock_manager.post_action.assert_called_once_with(
         action_data=action_request,
-        device_list=real_device_list
-    )
\ No newline at end of file
+        device_list=controller.device_index
+    )
+    assert list(controller.device_index) == real_device_list
\ No newline at end of file
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from src.nlp_assistant.backend.connection.HomeAssistantDeviceRegistry import HomeAssistantDeviceRegistry
+
+SERVICES = {"light": {"turn_on": {}, "turn_off": {}}, "switch": {"turn_on": {}}, "sensor": {}}
+STATES = [{"entity_id": "light.deckenlampe", "state": "off", "attributes": {"friendly_name": "Deckenlampe"}},
+          {"entity_id": "sensor.temperatur", "state": "21", "attributes": {}}]
+
+
+def state_changed(entity_id: str, new_state: dict | None) -> dict:
+    return {"event_type": "state_changed", "data": {"entity_id": entity_id, "new_state": new_state}}
+
+
+async def start_fake_websocket(events: list[dict]):
+    """Fake HomeAssistant WebSocket-API: Auth, get_states/get_services, danach die übergebenen Events."""
+
+    async def websocket(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "auth_required"})
+        auth = await ws.receive_json()
+        if auth.get("access_token") != "token":
+            await ws.send_json({"type": "auth_invalid"})
+            return ws
+        await ws.send_json({"type": "auth_ok"})
+
+        subscription_id = None
+        async for message in ws:
+            request_data = message.json()
+            if request_data["type"] == "subscribe_events" and request_data["event_type"] == "state_changed":
+                subscription_id = request_data["id"]
+            result = {"get_states": STATES, "get_services": SERVICES}.get(request_data["type"])
+            await ws.send_json({"id": request_data["id"], "type": "result", "success": True, "result": result})
+
+            if request_data["type"] == "get_services":
+                for event in events:
+                    await ws.send_json({"id": subscription_id, "type": "event", "event": event})
+        return ws
+
+    app = web.Application()
+    app.add_routes([web.get("/api/websocket", websocket)])
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+def test_registry_syncs_and_applies_events_incrementally():
+    events = [
+        # Reiner Zustandswechsel: keine neue Version
+        state_changed("light.deckenlampe", {"entity_id": "light.deckenlampe", "state": "on",
+                                            "attributes": {"friendly_name": "Deckenlampe"}}),
+        # Neues Gerät
+        state_changed("switch.tv", {"entity_id": "switch.tv", "state": "off", "attributes": {"friendly_name": "TV"}}),
+        # Umbenennung über den friendly_name
+        state_changed("light.deckenlampe", {"entity_id": "light.deckenlampe", "state": "on",
+                                            "attributes": {"friendly_name": "Wohnzimmerlampe"}}),
+        # Entfernen über die Entity-Registry
+        {"event_type": "entity_registry_updated", "data": {"action": "remove", "entity_id": "switch.tv"}},
+    ]
+
+    async def scenario():
+        runner, url = await start_fake_websocket(events)
+        registry = HomeAssistantDeviceRegistry(url, "token")
+        versions: list[int] = []
+        registry.add_listener(versions.append)
+        task = asyncio.create_task(registry.run())
+        try:
+            for _ in range(100):
+                if registry.version >= 4:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            registry.stop()
+            await asyncio.wait_for(task, timeout=2)
+            await runner.cleanup()
+        return registry, versions
+
+    registry, versions = asyncio.run(scenario())
+
+    assert versions == [1, 2, 3, 4]
+    assert registry.synced.is_set()
+    assert [(device["entity_id"], device["name"]) for device in registry.get_device_list()] == [
+        ("light.deckenlampe", "Wohnzimmerlampe")
+    ]
+    assert registry.get_device_list()[0]["actions"] == ["turn_on", "turn_off"]
+
+
+def test_device_list_snapshot_is_reused_between_changes():
+    registry = HomeAssistantDeviceRegistry("http://localhost:8123", "token")
+    registry.apply_snapshot(STATES, SERVICES)
+
+    first = registry.get_device_list()
+    assert registry.get_device_list() is first
+
+    registry.apply_event(state_changed("light.deckenlampe", None))
+    assert registry.get_device_list() == [] and registry.version == 2
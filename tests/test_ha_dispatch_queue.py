@@ -0,0 +1,134 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src.nlp_assistant.backend.connection.HomeAssistantDispatchQueue import HomeAssistantDispatchQueue
+from src.nlp_assistant.backend.connection.HomeAssistantRestManager import HomeAssistantRestManager
+
+DEVICES = [{"name": f"Lampe {i}", "entity_id": f"light.lampe_{i}", "type": "light"} for i in range(5)]
+
+
+class RecordingService:
+    """Ersetzt _send_service: protokolliert Aufrufe (mit Start und Ende) und kann Fehler auslösen."""
+
+    def __init__(self, delay: float = 0.0, errors: list | None = None):
+        self.delay = delay
+        self.errors = list(errors or [])
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, domain, service, payload):
+        started = time.monotonic()
+        with self.lock:
+            error = self.errors.pop(0) if self.errors else None
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls.append((domain, service, payload, started, time.monotonic()))
+        if error is not None:
+            raise error
+        return [{"entity_id": payload["entity_id"]}]
+
+
+@pytest.fixture
+def manager():
+    manager = HomeAssistantRestManager("http://mock-ha:8123", "mock-token")
+    manager._set_health(True)
+    return manager
+
+
+def make_queue(manager, service, **kwargs):
+    manager._send_service = service
+    options = {"workers": 4, "coalesce_window": 0.05, "backoff": 0.01}
+    options.update(kwargs)
+    return HomeAssistantDispatchQueue(manager, **options)
+
+
+def test_submit_returns_immediately_and_coalesces(manager):
+    service = RecordingService(delay=0.1)
+    dispatch = make_queue(manager, service)
+
+    start = time.perf_counter()
+    handles = [dispatch.submit({"domain": "light", "service": "turn_on", "name": device["name"]}, DEVICES)
+               for device in DEVICES]
+    assert time.perf_counter() - start < 0.05
+    assert dispatch.stats()["queue_depth"] == 5
+
+    results = [handle.result(timeout=2) for handle in handles]
+    dispatch.stop()
+
+    assert len(service.calls) == 1
+    assert service.calls[0][2] == {"entity_id": [device["entity_id"] for device in DEVICES]}
+    assert all(result["entity_id"] == service.calls[0][2]["entity_id"] for result in results)
+
+    stats = dispatch.stats()
+    assert (stats["submitted"], stats["calls"], stats["coalesced"], stats["queue_depth"]) == (5, 1, 4, 0)
+    assert stats["latency_ms"]["p50"] >= 100
+
+
+def test_repeated_actions_on_one_device_stay_separate_and_ordered(manager):
+    service = RecordingService(delay=0.05)
+    dispatch = make_queue(manager, service)
+
+    handles = [
+        dispatch.submit({"domain": "light", "service": "toggle", "entity_id": "light.lampe_0"}, DEVICES),
+        dispatch.submit({"domain": "light", "service": "toggle", "entity_id": "light.lampe_0"}, DEVICES),
+        dispatch.submit({"domain": "light", "service": "turn_off", "entity_id": "light.lampe_0"}, DEVICES),
+    ]
+    for handle in handles:
+        handle.result(timeout=2)
+    dispatch.stop()
+
+    # Zweimal toggle bleibt zweimal toggle, und turn_off läuft erst nach beiden
+    assert [call[1] for call in sorted(service.calls, key=lambda call: call[3])] == ["toggle", "toggle", "turn_off"]
+    ordered = sorted(service.calls, key=lambda call: call[3])
+    assert all(earlier[4] <= later[3] for earlier, later in zip(ordered, ordered[1:]))
+
+
+def test_transient_errors_are_retried(manager):
+    service = RecordingService(errors=[requests.exceptions.ConnectionError("weg"), requests.exceptions.Timeout("langsam")])
+    dispatch = make_queue(manager, service)
+
+    with patch.object(manager, "_check_connection", return_value=True):
+        result = dispatch.submit({"domain": "light", "service": "turn_on", "name": "Lampe 1"}, DEVICES).result(timeout=2)
+    dispatch.stop()
+
+    assert result["response"] == [{"entity_id": "light.lampe_1"}]
+    assert len(service.calls) == 3
+    assert (dispatch.stats()["retries"], dispatch.stats()["failures"]) == (2, 0)
+
+
+def test_client_errors_are_not_retried(manager):
+    error = requests.exceptions.HTTPError("400", response=MagicMock(status_code=400))
+    service = RecordingService(errors=[error])
+    dispatch = make_queue(manager, service)
+
+    result = dispatch.submit({"domain": "light", "service": "turn_on", "name": "Lampe 1"}, DEVICES).result(timeout=2)
+    dispatch.stop()
+
+    assert result["response"] is None
+    assert len(service.calls) == 1
+    assert dispatch.stats()["failures"] == 1
+
+
+def test_unknown_device_resolves_to_none(manager):
+    service = RecordingService()
+    dispatch = make_queue(manager, service)
+
+    assert dispatch.submit({"domain": "light", "service": "turn_on", "name": "Gibt es nicht"}, DEVICES).result() is None
+    dispatch.stop()
+    assert service.calls == []
+
+
+def test_stop_sends_pending_actions(manager):
+    service = RecordingService()
+    dispatch = make_queue(manager, service, coalesce_window=10.0)
+
+    handle = dispatch.submit({"domain": "light", "service": "turn_on", "name": "Lampe 2"}, DEVICES)
+    dispatch.stop(timeout=2)
+
+    assert handle.result(timeout=0)["entity_id"] == "light.lampe_2"
+    with pytest.raises(RuntimeError):
+        dispatch.submit({"domain": "light", "service": "turn_on", "name": "Lampe 2"}, DEVICES)
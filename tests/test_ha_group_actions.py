@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.nlp_assistant.backend.connection.HomeAssistantRestManager import HomeAssistantRestManager
+
+
+@pytest.fixture
+def manager():
+    return HomeAssistantRestManager("http://mock-ha:8123", "mock-token")
+
+
+def test_actions_are_grouped_by_domain_and_service(manager, real_device_list):
+    actions = [
+        {"domain": "light", "service": "turn_off", "name": "Deckenlampe"},
+        {"domain": "light", "service": "turn_off", "entity_id": "light.wiz_tunable_white_c490a3"},
+        {"domain": "switch", "service": "turn_off", "name": "TV Steckdose Steckdose 1"},
+        {"domain": "light", "service": "turn_off", "name": "Deckenlampe"},
+    ]
+
+    with patch.object(manager, "_check_connection", return_value=True), patch.object(manager.session, "post") as mock_post:
+        mock_post.return_value.json.return_value = []
+
+        results = manager.post_actions(actions, real_device_list)
+
+    # Ein Service-Call pro domain.service, doppelte Geräte nur einmal
+    assert mock_post.call_count == 2
+    assert mock_post.call_args_list[0][0][0] == "http://mock-ha:8123/api/services/light/turn_off"
+    assert mock_post.call_args_list[0][1]["json"] == {
+        "entity_id": ["light.deckenlampe", "light.wiz_tunable_white_c490a3"]
+    }
+    assert [result["entity_id"] for result in results] == [
+        ["light.deckenlampe", "light.wiz_tunable_white_c490a3"], ["switch.tv_steckdose_steckdose_1"]
+    ]
+
+
+def test_unknown_names_are_skipped(manager, real_device_list):
+    with patch.object(manager, "_check_connection", return_value=True), patch.object(manager.session, "post") as mock_post:
+        results = manager.post_actions([{"domain": "light", "service": "turn_on", "name": "Gibt es nicht"}],
+                                       real_device_list)
+
+    assert results == []
+    mock_post.assert_not_called()
+
+
+def test_health_state_is_cached_until_ttl_expires(manager):
+    with patch.object(manager.session, "get") as mock_get:
+        mock_get.return_value.status_code = 200
+
+        assert manager._check_connection() and manager._check_connection()
+        assert mock_get.call_count == 1
+
+        manager.health_ttl = 0.0
+        manager._check_connection()
+        assert mock_get.call_count == 2
+
+
+def test_connection_error_opens_circuit(manager, real_device_list):
+    import requests
+
+    with patch.object(manager, "_check_connection", return_value=True), \
+            patch.object(manager.session, "post", side_effect=requests.exceptions.ConnectionError("down")):
+        manager.post_action({"domain": "light", "service": "turn_on", "name": "Deckenlampe"}, real_device_list)
+
+    with patch.object(manager.session, "get") as mock_get:
+        assert manager._check_connection() is False
+        mock_get.assert_not_called()
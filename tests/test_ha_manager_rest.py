@@ -6,7 +6,10 @@ from src.nlp_assistant.backend.connection import HomeAssistantRestManager
 
 @pytest.fixture
 def manager():
-    return HomeAssistantRestManager("http://mock-ha:8123", "mock-token")
+    manager = HomeAssistantRestManager("http://mock-ha:8123", "mock-token")
+    # Verbindung als erreichbar markieren (Status wird für health_ttl gecacht)
+    manager._set_health(True)
+    return manager
 
 
 def test_resolve_name_to_entity_id(manager, real_device_list):
@@ -20,7 +23,7 @@ def test_resolve_name_to_entity_id(manager, real_device_list):
     }
 
     # Wir fangen den HTTP Request ab
-    with patch("requests.post") as mock_post:
+    with patch.object(manager.session, "post") as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = {"success": True}
 
@@ -45,7 +48,7 @@ def test_resolve_switch_name(manager, real_device_list):
         "name": "TV Steckdose Steckdose 1"
     }
 
-    with patch("requests.post") as mock_post:
+    with patch.object(manager.session, "post") as mock_post:
         mock_post.return_value.status_code = 200
 
         manager.post_action(action_input, real_device_list)
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from src.nlp_assistant.backend.connection.HomeAssistantLoadTest import percentile, run_load, run_scenario
+from src.nlp_assistant.backend.connection.HomeAssistantRestManager import HomeAssistantRestManager
+from src.nlp_assistant.backend.connection.HomeAssistantStandIn import HomeAssistantStandIn
+
+
+@pytest.fixture
+def stand_in():
+    with HomeAssistantStandIn(entity_count=200, token="token") as server:
+        yield server
+
+
+def supported(server):
+    return sorted(entity_id for entity_id in server.states if entity_id.split(".")[0] in ("light", "switch"))
+
+
+def test_device_list_over_http(stand_in):
+    manager = HomeAssistantRestManager(stand_in.base_url, "token")
+
+    devices = manager.get_device_list(fallback=False)
+    streamed = HomeAssistantRestManager(stand_in.base_url, "token", stream_states=True).get_device_list(fallback=False)
+
+    assert sorted(device["entity_id"] for device in devices) == supported(stand_in)
+    assert streamed == devices
+    assert devices[0]["actions"] == ["turn_on", "turn_off", "toggle"]
+
+
+def test_service_call_changes_state(stand_in):
+    manager = HomeAssistantRestManager(stand_in.base_url, "token")
+    entity_id = supported(stand_in)[0]
+
+    result = manager.post_action({"domain": entity_id.split(".")[0], "service": "turn_on", "entity_id": entity_id}, [])
+
+    assert result[0]["entity_id"] == entity_id
+    assert stand_in.states[entity_id]["state"] == "on"
+    assert stand_in.service_calls[-1][2] == {"entity_id": entity_id}
+
+
+def test_injected_errors_and_latency(stand_in):
+    manager = HomeAssistantRestManager(stand_in.base_url, "token")
+    entity_id = supported(stand_in)[0]
+    action = {"domain": entity_id.split(".")[0], "service": "toggle", "entity_id": entity_id}
+
+    stand_in.fail_next(1, status=503)
+    assert manager.post_action(action, []) is None
+
+    stand_in.latency = 0.1
+    start = time.perf_counter()
+    assert manager.post_action(action, []) is not None
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_wrong_token_is_rejected(stand_in):
+    assert HomeAssistantRestManager(stand_in.base_url, "falsch")._check_connection() is False
+
+
+def test_run_load_reports_percentiles():
+    report = run_load(lambda number: time.sleep(0.01) or number, requests=20, concurrency=4,
+                      is_error=lambda result: result % 10 == 0)
+
+    assert report["requests"] == 20 and report["errors"] == 2
+    latency = report["latency_ms"]
+    assert 10 <= latency["p50"] <= latency["p95"] <= latency["p99"] <= latency["max"]
+    assert percentile([], 0.5) is None
+
+
+@pytest.mark.parametrize("scenario", ["manager", "queue"])
+def test_scenarios_against_stand_in(stand_in, scenario):
+    report = run_scenario(scenario, stand_in.base_url, token="token", requests=40, concurrency=4)
+
+    assert report["errors"] == 0
+    assert report["latency_ms"]["p99"] is not None
+    if scenario == "queue":
+        assert report["dispatch"]["submitted"] == 40
@@ -0,0 +1,468 @@
+import importlib
+import os
+import time
+
+import joblib
+import numpy as np
+import pytest
+import scipy.sparse
+import sklearn.model_selection
+import spacy
+from spacy.language import Language
+
+from src.nlp_assistant.backend.core import IntentRecognizer as intent_module
+from src.nlp_assistant.backend.core.IntentRecognizer import IntentRecognizer
+from src.nlp_assistant.backend.core.cacheDirectory import CACHE_DIR_ENV
+
+# Das Tokenizer-Modul, das der Recognizer tatsächlich verwendet (als "nlp_assistant..." importiert)
+tokenizer_module = importlib.import_module(intent_module.IntentTokenizer.__module__)
+
+# Wörter, die das Test-Modell als intent-relevant (VERB/ADP) markiert, mit ihrem Lemma
+LEMMAS = {
+    "schalte": "schalten", "mach": "machen", "aktiviere": "aktivieren", "deaktiviere": "deaktivieren",
+    "starte": "starten", "stoppe": "stoppen", "wechsle": "wechseln", "an": "an", "aus": "aus", "ein": "ein",
+    "um": "um", "einschalten": "einschalten", "ausschalten": "ausschalten", "umschalten": "umschalten",
+}
+
+DEVICES = ["das licht", "die lampe", "den fernseher", "das radio", "die heizung", "den ventilator"]
+TEMPLATES = {
+    "turn_on": ["schalte {} an", "mach {} an", "aktiviere {}", "{} einschalten", "starte {}"],
+    "turn_off": ["schalte {} aus", "mach {} aus", "deaktiviere {}", "{} ausschalten", "stoppe {}"],
+    "toggle": ["schalte {} um", "wechsle {}", "{} umschalten", "mach {} um", "wechsle {} um"],
+}
+
+
+@Language.component("fake_intent_tagger")
+def fake_intent_tagger(doc):
+    for token in doc:
+        lemma = LEMMAS.get(token.lower_)
+        token.pos_ = "VERB" if lemma is not None else "NOUN"
+        token.lemma_ = lemma if lemma is not None else token.lower_
+    return doc
+
+
+# Texte, die die (als "ner" eingehängte) Zählkomponente gesehen hat
+NER_CALLS: list[str] = []
+
+
+@Language.component("fake_ner_counter")
+def fake_ner_counter(doc):
+    NER_CALLS.append(doc.text)
+    return doc
+
+
+@pytest.fixture
+def spacy_loads(monkeypatch):
+    """
+    Replaces de_core_news_sm by a blank pipeline with a rule-based tagger and records every model load.
+    """
+    loads: list[tuple] = []
+
+    def fake_load(name, exclude=None):
+        loads.append((name, tuple(exclude or [])))
+        nlp = spacy.blank("de")
+        nlp.add_pipe("fake_intent_tagger")
+        if "ner" not in (exclude or []):
+            nlp.add_pipe("fake_ner_counter", name="ner")
+        return nlp
+
+    registry = tokenizer_module.spacy_models
+    monkeypatch.setattr(type(registry), "load", staticmethod(fake_load))
+    registry.clear()
+    tokenizer_module._token_cache.clear()
+    monkeypatch.setattr(tokenizer_module, "_nlp_model", None)
+    NER_CALLS.clear()
+    yield loads
+    registry.clear()
+    tokenizer_module._token_cache.clear()
+
+
+@pytest.fixture
+def training_csv(tmp_path):
+    path = tmp_path / "training_data.csv"
+    rows = [(template.format(device), intent) for intent, templates in TEMPLATES.items()
+            for template in templates for device in DEVICES]
+    path.write_text("sentence,intent\n" + "".join(f"{sentence},{intent}\n" for sentence, intent in rows),
+                    encoding="utf-8")
+    return str(path)
+
+
+def make_recognizer(tmp_path, training_csv, **kwargs):
+    options = {"model_path": str(tmp_path / "models" / "intent_model.joblib"), "training_data_path": training_csv,
+               "token_store_path": None}
+    options.update(kwargs)
+    return IntentRecognizer(**options)
+
+
+QUERIES = ["Schalte das Licht an", "mach die Heizung aus", "wechsle das Radio", "Lampe umschalten",
+           "bitte den Fernseher einschalten", "völlig unbekannter satz"]
+
+
+@pytest.mark.parametrize("tokenizer_mode", ["spacy", "cached", "lookup"])
+def test_predict_batch_matches_predict(spacy_loads, tmp_path, training_csv, tokenizer_mode):
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode=tokenizer_mode)
+    assert recognizer.is_trained
+
+    assert recognizer.predict_batch(QUERIES, batch_size=4) == [recognizer.predict(query) for query in QUERIES]
+    assert recognizer.predict("Schalte das Licht an")[0] == "turn_on"
+
+
+def test_pooled_cross_validation_matches_serial_run(spacy_loads, monkeypatch, tmp_path, training_csv):
+    monkeypatch.setattr(intent_module, "_fold_corpus", None)
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+    sentences, labels = recognizer._load_data_from_csv(training_csv)
+
+    pooled = recognizer.cross_validate(sentences, labels, folds=3, n_jobs=2)
+
+    # Dieselben Folds ohne Prozess-Pool im Testprozess auswerten
+    splits = sklearn.model_selection.StratifiedKFold(n_splits=3, shuffle=True, random_state=42).split(sentences, labels)
+    token_lists = [tokenizer_module.tokens_from_analysis(a) for a in recognizer._analyze_corpus(sentences)]
+    intent_module._init_fold_worker(token_lists, labels, recognizer.vectorizer.get_params())
+    serial = [intent_module._evaluate_fold(train.tolist(), test.tolist()) for train, test in splits]
+
+    assert pooled == serial
+    assert len(pooled) == 3 and all(0.0 <= accuracy <= 1.0 for accuracy in pooled)
+
+
+def test_lookup_mode_retrains_model_without_lemma_lookup(spacy_loads, tmp_path, training_csv):
+    model_path = str(tmp_path / "models" / "intent_model.joblib")
+    make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+
+    # Modell im Format vor dem Lookup-Modus: ohne Lemma-Tabelle und ohne Fingerprint
+    data = joblib.load(model_path)
+    del data["lemma_lookup"], data["fingerprint"]
+    joblib.dump(data, model_path)
+
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup")
+
+    assert recognizer.lemma_lookup is not None
+    assert joblib.load(model_path)["lemma_lookup"] is not None
+    assert recognizer.predict("Schalte das Licht aus")[0] == "turn_off"
+
+
+@pytest.mark.parametrize("remove_meta", [False, True])
+def test_startup_unpickles_joblib_model_once(spacy_loads, monkeypatch, tmp_path, training_csv, remove_meta):
+    trained = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup")
+    if remove_meta:
+        # Modell ohne Metadaten-Datei (vor ihrer Einführung gespeichert)
+        os.remove(trained.store.meta_path)
+    loads: list[str] = []
+    load = joblib.load
+    monkeypatch.setattr(joblib, "load", lambda path, *args, **kwargs: loads.append(path) or load(path, *args, **kwargs))
+
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup")
+
+    assert loads == [trained.store.model_path]
+    assert recognizer.fingerprint == trained.fingerprint
+    assert recognizer.predict_batch(QUERIES) == trained.predict_batch(QUERIES)
+
+
+def test_unknown_spacy_model_version_keeps_model(spacy_loads, monkeypatch, tmp_path, training_csv):
+    monkeypatch.setattr(intent_module, "spacy_model_version", lambda: "3.7.0")
+    make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup")
+
+    # Lookup-Worker ohne de_core_news_sm: Version unbekannt, das Modell bleibt gültig
+    monkeypatch.setattr(intent_module, "spacy_model_version", lambda: None)
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup")
+    assert not recognizer._needs_training()
+    assert recognizer.spacy_model_version == "3.7.0"
+
+    # Eine andere bekannte Version trainiert neu
+    monkeypatch.setattr(intent_module, "spacy_model_version", lambda: "3.8.0")
+    assert recognizer._needs_training()
+    assert make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup").spacy_model_version == "3.8.0"
+
+
+def test_lookup_mode_without_lemma_lookup_falls_back_to_spacy(spacy_loads, tmp_path, training_csv):
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup")
+    expected = recognizer.predict("Schalte das Licht aus")
+    recognizer.tokenizer.set_lemma_lookup(None)
+
+    with pytest.warns(RuntimeWarning, match="lemma lookup"):
+        assert recognizer.predict("Schalte das Licht aus") == expected
+
+
+def test_lookup_mode_tags_only_unknown_words_with_spacy(spacy_loads, monkeypatch, tmp_path, training_csv):
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup")
+    tagged: list[str] = []
+    tokenize = tokenizer_module._cached_spacy_tokenizer
+    monkeypatch.setattr(tokenizer_module, "_cached_spacy_tokenizer", lambda text: tagged.append(text) or tokenize(text))
+
+    assert recognizer.tokenize("Schalte den Staubsauger an") == ["schalten", "an"]
+    assert recognizer.tokenize("Schalte das Licht an") == ["schalten", "an"]
+    assert tagged == ["staubsauger"]
+
+
+def test_npy_model_is_memory_mapped_after_reload(spacy_loads, tmp_path, training_csv):
+    trained = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup", model_format="npy")
+    model_dir = tmp_path / "models" / "intent_model"
+    assert (model_dir / "meta.json").exists()
+    assert not (tmp_path / "models" / "intent_model.tmp").exists()
+
+    loaded = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup", model_format="npy")
+
+    for array in (loaded.tfidf_matrix.data, loaded.tfidf_matrix.indices, loaded.vectorizer.idf_):
+        mapped = array
+        while not isinstance(mapped, np.memmap):
+            mapped = mapped.base
+        assert np.shares_memory(array, mapped)
+        assert mapped.filename.startswith(str(model_dir))
+
+    assert loaded.lemma_lookup == trained.lemma_lookup
+    assert loaded.predict_batch(QUERIES) == trained.predict_batch(QUERIES)
+    assert [loaded.predict(query) for query in QUERIES] == [trained.predict(query) for query in QUERIES]
+
+
+@pytest.mark.parametrize("model_format", ["joblib", "npy"])
+def test_added_examples_survive_reload_through_delta(spacy_loads, tmp_path, training_csv, model_format):
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached", model_format=model_format)
+    rows = recognizer.tfidf_matrix.shape[0]
+
+    assert recognizer.add_examples(["schalte die lampe ein", "mach den ventilator um"], ["turn_on", "toggle"]) == 2
+    assert os.listdir(recognizer.store.delta_path) == ["delta_000000.npz"]
+
+    reloaded = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached", model_format=model_format)
+
+    assert reloaded.tfidf_matrix.shape[0] == rows + 2
+    assert reloaded.training_labels[-2:] == ["turn_on", "toggle"]
+    assert reloaded._examples_since_refresh == 2
+    assert (reloaded.tfidf_matrix != recognizer.tfidf_matrix).nnz == 0
+    assert reloaded.predict_batch(QUERIES) == recognizer.predict_batch(QUERIES)
+
+
+def test_refresh_idf_folds_delta_into_model(spacy_loads, tmp_path, training_csv):
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+    old_idf = recognizer.vectorizer.idf_.copy()
+    recognizer.add_examples(["schalte die lampe ein", "schalte das radio ein"], ["turn_on", "turn_on"])
+
+    recognizer.refresh_idf()
+
+    assert os.listdir(recognizer.store.delta_path) == ["added_examples.npz"]
+    assert recognizer._examples_since_refresh == 0
+    assert not np.array_equal(recognizer.vectorizer.idf_, old_idf)
+
+    reloaded = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+    assert reloaded.tfidf_matrix.shape == recognizer.tfidf_matrix.shape
+    assert reloaded._examples_since_refresh == 0
+    np.testing.assert_allclose(reloaded.vectorizer.idf_, recognizer.vectorizer.idf_)
+    assert reloaded.predict_batch(QUERIES) == recognizer.predict_batch(QUERIES)
+
+
+def test_retraining_keeps_added_examples(spacy_loads, tmp_path, training_csv):
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+    train_size = recognizer.train_and_save()["train_size"]
+    examples = (["schalte den staubsauger ein", "mach den staubsauger aus"], ["turn_on", "turn_off"])
+    recognizer.add_examples(*examples)
+
+    assert recognizer.train_and_save()["train_size"] == train_size + 2
+    assert os.listdir(recognizer.store.delta_path) == ["added_examples.npz"]
+    assert recognizer.training_labels[-2:] == ["turn_on", "turn_off"]
+
+    # Auch jedes weitere Training (z.B. nach einer Änderung der CSV) enthält die Beispiele
+    retrained = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+    assert retrained.tfidf_matrix.shape[0] == train_size + 2
+    assert retrained.train_and_save()["train_size"] == train_size + 2
+
+
+def test_retraining_skips_added_examples_already_in_csv(spacy_loads, tmp_path, training_csv):
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+    recognizer.add_examples(["schalte den staubsauger ein"], ["turn_on"], csv_path=training_csv)
+
+    evaluation = recognizer.train_and_save()
+
+    assert evaluation["train_size"] + evaluation["test_size"] == 91
+
+
+def test_second_training_reuses_token_store(spacy_loads, monkeypatch, tmp_path, training_csv):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    analyzed: list[int] = []
+    analyze = tokenizer_module._spacy_analyze_batch
+    monkeypatch.setattr(tokenizer_module, "_spacy_analyze_batch", lambda texts: analyzed.append(len(texts)) or analyze(texts))
+
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached", token_store_path="")
+    first_evaluation = recognizer.train_and_save()
+
+    assert recognizer.config.token_store_path.startswith(str(tmp_path / "cache"))
+    assert os.path.exists(recognizer.config.token_store_path)
+    assert sorted(os.listdir(tmp_path / "models")) == ["intent_model.joblib", "intent_model.joblib.meta.json"]
+    # Nur das erste Training analysiert die Sätze mit spaCy
+    assert analyzed == [90]
+
+    retrained = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached", token_store_path="", force_train=True)
+    assert retrained.train_and_save() == first_evaluation
+    assert analyzed == [90]
+
+
+def test_cross_validation_reuses_training_analyses(spacy_loads, monkeypatch, tmp_path, training_csv):
+    monkeypatch.setattr(intent_module, "_fold_corpus", None)
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+    analyzed: list[int] = []
+    analyze = tokenizer_module._spacy_analyze_batch
+    monkeypatch.setattr(tokenizer_module, "_spacy_analyze_batch", lambda texts: analyzed.append(len(texts)) or analyze(texts))
+
+    evaluation = recognizer.train_and_save(cv_folds=3, n_jobs=1)
+
+    # Ohne Token-Store nur ein spaCy-Durchlauf für Split und Cross-Validation
+    assert analyzed == [90]
+    sentences, labels = recognizer._load_data_from_csv(training_csv)
+    assert evaluation["cv_accuracies"] == recognizer.cross_validate(sentences, labels, folds=3, n_jobs=1)
+
+
+def corrupt_joblib(model_dir):
+    (model_dir / "intent_model.joblib").write_bytes(b"kein pickle")
+
+
+def corrupt_npy(model_dir):
+    # meta.json (mit passendem Fingerprint) bleibt lesbar, die Matrix fehlt
+    (model_dir / "intent_model" / "matrix_data.npy").unlink()
+
+
+@pytest.mark.parametrize("model_format, corrupt", [("joblib", corrupt_joblib), ("npy", corrupt_npy)])
+def test_background_training_does_not_block_on_broken_model(spacy_loads, monkeypatch, tmp_path, training_csv,
+                                                             model_format, corrupt):
+    make_recognizer(tmp_path, training_csv, tokenizer_mode="cached", model_format=model_format)
+    corrupt(tmp_path / "models")
+
+    train_and_save = IntentRecognizer.train_and_save
+
+    def slow_train_and_save(self, *args, **kwargs):
+        time.sleep(1.0)
+        return train_and_save(self, *args, **kwargs)
+
+    monkeypatch.setattr(IntentRecognizer, "train_and_save", slow_train_and_save)
+
+    started = time.perf_counter()
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached", model_format=model_format,
+                                 background_training=True)
+
+    assert time.perf_counter() - started < 0.5
+    assert recognizer.readiness()["ready"] is False
+    assert recognizer.readiness()["serving"] == "fallback"
+    assert recognizer.predict("Schalte das Licht aus") == ("turn_off", 0.5)
+
+    assert recognizer.wait_until_ready(timeout=10)
+    assert recognizer.training_future.result() is True
+    assert recognizer.readiness()["serving"] == "model"
+    assert recognizer.predict("Schalte das Licht aus")[0] == "turn_off"
+
+
+def test_adopted_model_matches_trained_model(spacy_loads, tmp_path, training_csv):
+    trained = make_recognizer(tmp_path, training_csv, tokenizer_mode="lookup", model_format="npy")
+    trained.add_examples(["schalte die lampe ein"], ["turn_on"])
+    recognizer = make_recognizer(tmp_path / "other", training_csv, tokenizer_mode="lookup", model_format="npy",
+                                 background_training=True)
+    assert recognizer.wait_until_ready(timeout=10)
+
+    recognizer._adopt_model(trained)
+
+    for field in intent_module._MODEL_STATE_FIELDS:
+        assert getattr(recognizer, field) is getattr(trained, field)
+    assert recognizer.predict_batch(QUERIES) == trained.predict_batch(QUERIES)
+
+
+def test_config_and_settings_build_the_same_recognizer(spacy_loads, tmp_path, training_csv):
+    from_settings = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached", model_format="npy")
+    config = intent_module.IntentRecognizerConfig(model_path=str(tmp_path / "models" / "intent_model.joblib"),
+                                                  training_data_path=training_csv, token_store_path=None,
+                                                  tokenizer_mode="cached", model_format="npy")
+    from_config = IntentRecognizer(config)
+
+    assert vars(from_config.config) == vars(from_settings.config)
+    assert from_config.store.model_path == str(tmp_path / "models" / "intent_model")
+    assert from_config.predict_batch(QUERIES) == from_settings.predict_batch(QUERIES)
+    with pytest.raises(ValueError):
+        IntentRecognizer(config, debug=True)
+
+
+def test_compaction_without_pruning_keeps_predictions(spacy_loads, tmp_path, training_csv):
+    recognizer = make_recognizer(tmp_path, training_csv, tokenizer_mode="cached")
+    before = recognizer.predict_batch(QUERIES)
+    matrix = recognizer.tfidf_matrix
+
+    result = recognizer._compact(min_df=1, min_weight=0.0)
+
+    assert result["features_after"] == result["features_before"] == matrix.shape[1]
+    assert recognizer.tfidf_matrix.nnz == matrix.nnz
+    assert recognizer.tfidf_matrix.dtype == np.float32 and recognizer.prenormalized
+    assert result["matrix_bytes_after"] < result["matrix_bytes_before"]
+
+    after = recognizer.predict_batch(QUERIES)
+    assert [intent for intent, _ in after] == [intent for intent, _ in before]
+    assert [score for _, score in after] == pytest.approx([score for _, score in before], abs=1e-6)
+    assert [recognizer.predict(query) for query in QUERIES] == after
+
+
+def compactable_recognizer(tmp_path):
+    # Ohne Trainingsdaten bleibt der Recognizer untrainiert, Matrix und Vokabular werden direkt gesetzt
+    recognizer = IntentRecognizer(model_path=str(tmp_path / "models" / "intent_model.joblib"),
+                                  training_data_path=str(tmp_path / "fehlt.csv"), token_store_path=None)
+    recognizer.tfidf_matrix = scipy.sparse.csr_matrix(np.array([
+        [0.6, 0.8, 0.0, 0.0],
+        [0.8, 0.0, 0.6, 0.0],
+        [0.0, 0.0, 0.0, 1.0],
+    ]))
+    recognizer.training_labels = ["turn_on", "turn_off", "toggle"]
+    recognizer.vectorizer.vocabulary_ = {"an": 0, "schalten": 1, "aus": 2, "um": 3}
+    recognizer.vectorizer.idf_ = np.array([1.5, 2.0, 2.5, 3.0])
+    return recognizer
+
+
+@pytest.mark.parametrize("min_df, min_weight, vocabulary, idf, rows", [
+    # Dokumentfrequenzen: an=2, schalten=1, aus=1, um=1
+    (1, 0.0, {"an": 0, "schalten": 1, "aus": 2, "um": 3}, [1.5, 2.0, 2.5, 3.0],
+     [[0.6, 0.8, 0.0, 0.0], [0.8, 0.0, 0.6, 0.0], [0.0, 0.0, 0.0, 1.0]]),
+    (2, 0.0, {"an": 0}, [1.5], [[1.0], [1.0], [0.0]]),
+    # Gewichte gleich min_weight bleiben erhalten, kleinere fallen weg
+    (1, 0.6, {"an": 0, "schalten": 1, "aus": 2, "um": 3}, [1.5, 2.0, 2.5, 3.0],
+     [[0.6, 0.8, 0.0, 0.0], [0.8, 0.0, 0.6, 0.0], [0.0, 0.0, 0.0, 1.0]]),
+    (1, 0.61, {"an": 0, "schalten": 1, "um": 2}, [1.5, 2.0, 3.0], [[0.0, 1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]]),
+])
+def test_compaction_prunes_at_boundaries(tmp_path, min_df, min_weight, vocabulary, idf, rows):
+    recognizer = compactable_recognizer(tmp_path)
+
+    result = recognizer._compact(min_df=min_df, min_weight=min_weight)
+    matrix = recognizer.tfidf_matrix
+
+    assert recognizer.vectorizer.vocabulary_ == vocabulary
+    np.testing.assert_array_equal(recognizer.vectorizer.idf_, idf)
+    np.testing.assert_allclose(matrix.toarray(), rows, atol=1e-7)
+    assert matrix.dtype == np.float32
+    assert result == {
+        "features_before": 4,
+        "features_after": len(vocabulary),
+        "matrix_bytes_before": 5 * 8 + 5 * 4 + 4 * 4,
+        "matrix_bytes_after": matrix.nnz * 4 + matrix.nnz * matrix.indices.itemsize + 4 * matrix.indptr.itemsize,
+    }
+
+
+@pytest.mark.parametrize("min_df, min_weight", [(3, 0.0), (2, 0.61), (1, 1.01)])
+def test_compaction_refuses_to_remove_every_feature(tmp_path, min_df, min_weight):
+    recognizer = compactable_recognizer(tmp_path)
+    matrix = recognizer.tfidf_matrix
+
+    with pytest.raises(ValueError, match="removes every feature"):
+        recognizer._compact(min_df=min_df, min_weight=min_weight)
+
+    assert recognizer.tfidf_matrix is matrix
+    assert len(recognizer.vectorizer.vocabulary_) == 4
+    assert recognizer.prenormalized is False
+
+
+def test_all_tokenizer_modes_share_one_spacy_model(spacy_loads, tmp_path, training_csv):
+    recognizers = [make_recognizer(tmp_path, training_csv, model_path=str(tmp_path / mode / "intent_model.joblib"),
+                                   tokenizer_mode=mode) for mode in ["spacy", "cached", "lookup"]]
+    NER_CALLS.clear()
+
+    for recognizer in recognizers[1:]:
+        recognizer.predict_batch(["schalte das radio ein"])
+        recognizer.predict("mach den fernseher um")
+    tokenizer_module._spacy_analyze_batch(["schalte das licht aus"])
+    # Parser und NER werden nur pro Aufruf übersprungen
+    assert NER_CALLS == []
+
+    recognizers[0].predict("schalte die lampe ein")
+    assert NER_CALLS == ["schalte die lampe ein"]
+
+    assert spacy_loads == [("de_core_news_sm", ())]
+    assert tokenizer_module.spacy_models.get("de_core_news_sm") is tokenizer_module._get_nlp_model()
+    assert spacy_loads == [("de_core_news_sm", ())]
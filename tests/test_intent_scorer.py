@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+import scipy.sparse
+
+from src.nlp_assistant.backend.core.IntentScorer import IntentScorer
+
+LABELS = ["turn_on", "turn_on", "turn_off", "toggle"]
+
+
+@pytest.fixture
+def tfidf_matrix():
+    # 4 Trainingssätze, 4 Features (bereits L2-normalisiert)
+    return scipy.sparse.csr_matrix(np.array([
+        [1.0, 0.0, 0.0, 0.0],
+        [0.6, 0.8, 0.0, 0.0],
+        [0.0, 0.0, 1.0, 0.0],
+        [0.0, 0.6, 0.0, 0.8],
+    ]))
+
+
+@pytest.mark.parametrize("mode", ["full_scan", "inverted_index", "centroid"])
+def test_best_intent_is_ranked_first(tfidf_matrix, mode):
+    scorer = IntentScorer(tfidf_matrix, LABELS, mode=mode)
+    query = scipy.sparse.csr_matrix(np.array([[0.0, 0.0, 1.0, 0.0]]))
+
+    ranking = scorer.top_k(query, k=2)[0]
+
+    assert ranking[0][0] == "turn_off"
+    assert ranking[0][1] == pytest.approx(1.0)
+
+
+def test_inverted_index_matches_full_scan(tfidf_matrix):
+    full_scan = IntentScorer(tfidf_matrix, LABELS, mode="full_scan")
+    inverted_index = IntentScorer(tfidf_matrix, LABELS, mode="inverted_index")
+    queries = scipy.sparse.csr_matrix(np.array([
+        [0.8, 0.6, 0.0, 0.0],
+        [0.0, 1.0, 0.0, 0.0],
+    ]))
+
+    for expected, actual in zip(full_scan.top_k(queries, k=3), inverted_index.top_k(queries, k=3)):
+        # Das Inverted Index lässt Intents ohne gemeinsames Feature (Score 0) weg
+        expected = [(intent, score) for intent, score in expected if score > 0]
+        assert [intent for intent, _ in actual] == [intent for intent, _ in expected]
+        assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+
+def test_inverted_index_without_shared_features_returns_nothing(tfidf_matrix):
+    scorer = IntentScorer(tfidf_matrix, LABELS, mode="inverted_index")
+    query = scipy.sparse.csr_matrix((1, 4))
+
+    assert scorer.top_k(query, k=3) == [[]]
+
+
+def test_unknown_mode_raises(tfidf_matrix):
+    with pytest.raises(ValueError):
+        IntentScorer(tfidf_matrix, LABELS, mode="brute_force")
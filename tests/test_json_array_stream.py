@@ -0,0 +1,58 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.nlp_assistant.backend.connection.HomeAssistantRestManager import HomeAssistantRestManager
+from src.nlp_assistant.backend.connection.JsonArrayStream import JsonArrayStream
+
+
+def parse_in_chunks(raw: bytes, chunk_size: int) -> list:
+    parser = JsonArrayStream(compact_threshold=16)
+    items = []
+    for position in range(0, len(raw), chunk_size):
+        items.extend(parser.feed(raw[position:position + chunk_size]))
+    items.extend(parser.close())
+    return items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 16])
+def test_chunked_parse_matches_json_loads(chunk_size):
+    data = [{"entity_id": "light.küche", "attributes": {"friendly_name": "Küche ]", "modes": ["hs", "xy"]}},
+            12345, -1.5e3, "a,b", None, True, [], {}]
+    raw = json.dumps(data, ensure_ascii=False, indent=1).encode("utf-8")
+
+    assert parse_in_chunks(raw, chunk_size) == data
+
+
+def test_elements_are_returned_as_soon_as_they_are_complete():
+    parser = JsonArrayStream()
+
+    assert parser.feed(b'[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(b': 2}, 3') == [{"b": 2}]
+    assert parser.feed(b"]") == [3]
+    assert parser.close() == []
+
+
+@pytest.mark.parametrize("raw", [b"[1,]", b"[1 2]", b'{"a": 1}', b"[1, 2", b"[] x", b"[,1]"])
+def test_invalid_arrays_raise(raw):
+    parser = JsonArrayStream()
+    with pytest.raises(ValueError):
+        parser.feed(raw)
+        parser.close()
+
+
+def test_rest_manager_streams_only_supported_states():
+    states = [{"entity_id": f"sensor.s{i}", "attributes": {"values": list(range(10))}} for i in range(50)]
+    states.insert(20, {"entity_id": "light.deckenlampe", "attributes": {"friendly_name": "Deckenlampe"}})
+    raw = json.dumps(states).encode("utf-8")
+
+    manager = HomeAssistantRestManager("http://mock-ha:8123", "mock-token", stream_states=True, stream_chunk_size=100)
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.side_effect = lambda chunk_size: (raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size))
+    manager.session = MagicMock()
+    manager.session.get.return_value = response
+
+    assert manager._get_states_streaming() == [states[20]]
+    assert manager.session.get.call_args[1]["stream"] is True
@@ -0,0 +1,46 @@
+import pytest
+
+from src.nlp_assistant.backend.core.LRUCache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    # Arrange
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    # Act: "a" wird benutzt, danach verdrängt "c" das älteste Element "b"
+    cache.get("a")
+    cache.put("c", 3)
+
+    # Assert
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_counts_hits_and_misses():
+    cache = LRUCache(maxsize=4)
+    cache.put("licht an", ("an",))
+
+    assert cache.get("licht an") == ("an",)
+    assert cache.get("licht aus") is None
+
+    info = cache.info()
+    assert info["hits"] == 1
+    assert info["misses"] == 1
+    assert info["hit_rate"] == 0.5
+
+
+def test_resize_trims_entries():
+    cache = LRUCache(maxsize=3)
+    for key in ["a", "b", "c"]:
+        cache.put(key, key)
+
+    cache.resize(1)
+
+    assert len(cache) == 1
+    assert "c" in cache
+
+    with pytest.raises(ValueError):
+        cache.resize(0)
@@ -0,0 +1,35 @@
+import threading
+import time
+
+import spacy
+
+from src.nlp_assistant.backend.core.SpacyModelRegistry import SpacyModelRegistry
+
+
+def test_concurrent_get_loads_each_configuration_once(monkeypatch):
+    calls: list[tuple] = []
+
+    def fake_load(name, exclude=None):
+        calls.append((name, tuple(exclude)))
+        time.sleep(0.05)
+        return spacy.blank("de")
+
+    monkeypatch.setattr(SpacyModelRegistry, "load", staticmethod(fake_load))
+    registry = SpacyModelRegistry()
+    results: list = []
+
+    threads = [threading.Thread(target=lambda: results.append(registry.get("de_core_news_sm"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    trimmed = registry.get("de_core_news_sm", exclude=["ner", "parser"])
+
+    assert calls == [("de_core_news_sm", ()), ("de_core_news_sm", ("ner", "parser"))]
+    assert all(model is results[0] for model in results)
+    assert registry.get("de_core_news_sm", exclude=["parser", "ner"]) is trimmed
+
+    stats = registry.stats()
+    assert [entry["excluded"] for entry in stats] == [[], ["ner", "parser"]]
+    assert all(entry["load_seconds"] >= 0.05 for entry in stats)
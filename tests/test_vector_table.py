@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import spacy
+
+from src.nlp_assistant.backend.core.VectorTable import VectorTable
+from src.nlp_assistant.backend.core.cacheDirectory import CACHE_DIR_ENV
+
+
+@pytest.fixture
+def nlp():
+    # Leere Pipeline mit einigen Wortvektoren als Ersatz für de_core_news_lg
+    nlp = spacy.blank("de")
+    rng = np.random.default_rng(0)
+    for word in ["decken", "lampe", "tv", "steckdose"]:
+        nlp.vocab.set_vector(word, rng.normal(size=8).astype(np.float32))
+    return nlp
+
+
+def test_exported_table_matches_doc_vectors(nlp, tmp_path):
+    table = VectorTable(VectorTable.export(nlp, str(tmp_path / "vectors")))
+
+    assert isinstance(table.vectors, np.memmap)
+    for text in ["decken lampe", "tv steckdose", "unbekannt tv", "unbekannt"]:
+        assert table.text_vector(text) == pytest.approx(nlp(text).vector, abs=1e-6)
+
+
+def test_low_memory_matcher_exports_table_to_cache_dir(nlp, monkeypatch, tmp_path):
+    from src.nlp_assistant.backend.core import deviceMatcher
+
+    registry = deviceMatcher.spacy_models
+    monkeypatch.setattr(type(registry), "load", staticmethod(lambda name, exclude=None: nlp))
+    monkeypatch.delenv(deviceMatcher.VECTOR_TABLE_PATH_ENV, raising=False)
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    registry.clear()
+
+    try:
+        matcher = deviceMatcher.DeviceMatcher(lowMemory=True)
+    finally:
+        registry.clear()
+
+    assert deviceMatcher.defaultVectorTablePath() == str(tmp_path / "cache" / "de_core_news_lg_vectors")
+    assert (tmp_path / "cache" / "de_core_news_lg_vectors").is_dir()
+    assert isinstance(matcher.vectorTable.vectors, np.memmap)
+
+    monkeypatch.setenv(deviceMatcher.VECTOR_TABLE_PATH_ENV, str(tmp_path / "tabelle"))
+    assert deviceMatcher.defaultVectorTablePath() == str(tmp_path / "tabelle")